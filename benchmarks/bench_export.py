@@ -0,0 +1,215 @@
+"""Export throughput against a local mock GraphQL server, written as JSON.
+
+    python benchmarks/bench_export.py --out results.json
+    python benchmarks/bench_export.py --latency 0.05 --throttle-rate 0.02 --concurrency 8,32 --max-rps 0,50
+    python benchmarks/bench_export.py --out new.json --baseline results.json --max-regression 0.1
+
+Runs ``batch_geocode`` and full ``export sweeps|tags|notes|all`` CLI runs across
+the concurrency x max-rps grid. Each scenario runs in a fresh process so its
+peak RSS is its own. Per scenario it records points/s and p50/p95/p99
+request latency as seen by the client. With ``--baseline`` the exit code is
+1 when any scenario's points/s drops by more than ``--max-regression``.
+"""
+from __future__ import annotations
+
+import argparse
+import contextlib
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import statistics
+import sys
+import time
+from dataclasses import asdict
+from datetime import datetime, timezone
+from typing import Any
+
+from mock_server import BenchServer, ServerConfig
+
+SCENARIOS = ("batch_geocode", "sweeps", "tags", "notes", "all")
+MODEL_ID = "BENCH"
+
+
+def _percentiles(latencies: list[float]) -> dict[str, float | None]:
+    if len(latencies) < 2:
+        only = latencies[0] * 1000 if latencies else None
+        return {"p50_ms": only, "p95_ms": only, "p99_ms": only}
+    cuts = statistics.quantiles(latencies, n=100, method="inclusive")
+    return {"p50_ms": cuts[49] * 1000, "p95_ms": cuts[94] * 1000, "p99_ms": cuts[98] * 1000}
+
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _run_scenario(url: str, spec: dict[str, Any], points_total: int) -> dict[str, Any]:
+    """Child-process body: run one scenario and report its measurements."""
+    # Credentials come from the environment; never touch the user's real keyring
+    os.environ.setdefault("PYTHON_KEYRING_BACKEND", "keyring.backends.null.Keyring")
+    os.environ.update({"MATTERPORT_API_URL": url, "MATTERPORT_API_KEY": "bench", "MATTERPORT_API_SECRET": "bench"})
+
+    import requests
+
+    from mp_geo_export.api import ApiClient
+    from mp_geo_export.exports import object_points
+
+    latencies: list[float] = []
+    post = requests.Session.post
+
+    def timed_post(self: requests.Session, *args: Any, **kwargs: Any) -> requests.Response:
+        start = time.perf_counter()
+        try:
+            return post(self, *args, **kwargs)
+        finally:
+            latencies.append(time.perf_counter() - start)
+
+    requests.Session.post = timed_post  # type: ignore[method-assign]
+
+    concurrency, max_rps, ppr = spec["concurrency"], spec["max_rps"], spec["points_per_request"]
+    if spec["scenario"] == "batch_geocode":
+        client = ApiClient(url, "Basic bench", max_rps=max_rps, retries=spec["retries"], pool_size=concurrency)
+        points = object_points("tags", client.fetch_tags(MODEL_ID))
+        latencies.clear()
+        start = time.perf_counter()
+        geos = client.batch_geocode(MODEL_ID, points, concurrency, points_per_request=ppr)
+        elapsed = time.perf_counter() - start
+        client.close()
+        failed = sum(g is None for g in geos)
+    else:
+        from mp_geo_export.cli import app
+
+        args = [
+            "export", spec["scenario"], "-m", MODEL_ID, "--out", "-", "--format", "geojson", "--no-pretty",
+            "--concurrency", str(concurrency), "--max-rps", str(max_rps), "--points-per-request", str(ppr),
+            "--retries", str(spec["retries"]), "--on-error", "null",
+        ]
+        failed = 0
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            start = time.perf_counter()
+            app(args, standalone_mode=False)
+            elapsed = time.perf_counter() - start
+    return {
+        **spec,
+        "points": points_total,
+        "failed_points": failed,
+        "elapsed_s": round(elapsed, 4),
+        "points_per_s": round(points_total / elapsed, 2) if elapsed > 0 else None,
+        "requests": len(latencies),
+        **{k: None if v is None else round(v, 3) for k, v in _percentiles(latencies).items()},
+        "peak_rss_mb": round(_peak_rss_mb(), 1),
+    }
+
+
+def _key(result: dict[str, Any]) -> tuple[Any, ...]:
+    return (result["scenario"], result["concurrency"], result["max_rps"], result["points_per_request"])
+
+
+def compare(results: list[dict[str, Any]], baseline: dict[str, Any], max_regression: float) -> list[str]:
+    """Scenarios whose points/s fell more than ``max_regression`` below the baseline run."""
+    before = {_key(r): r for r in baseline.get("results", [])}
+    regressions = []
+    for r in results:
+        old = before.get(_key(r))
+        if not old or not old.get("points_per_s") or r["points_per_s"] is None:
+            continue
+        change = r["points_per_s"] / old["points_per_s"] - 1
+        if change < -max_regression:
+            regressions.append(
+                f"{r['scenario']} c={r['concurrency']} rps={r['max_rps']} ppr={r['points_per_request']}: "
+                f"{old['points_per_s']} -> {r['points_per_s']} points/s ({change:+.0%})"
+            )
+    return regressions
+
+
+def _ints(value: str) -> list[int]:
+    return [int(v) for v in value.split(",") if v.strip()]
+
+
+def _floats(value: str) -> list[float]:
+    return [float(v) for v in value.split(",") if v.strip()]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS))
+    parser.add_argument("--concurrency", default="4,16", help="Comma list of worker counts")
+    parser.add_argument("--max-rps", default="0,200", help="Comma list of rate limits (0 = unlimited)")
+    parser.add_argument("--points-per-request", default="1", help="Comma list of points per GraphQL request")
+    parser.add_argument("--retries", type=int, default=3)
+    parser.add_argument("--latency", type=float, default=0.02, help="Server latency per request (s)")
+    parser.add_argument("--jitter", type=float, default=0.005, help="Uniform +/- jitter on the latency (s)")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Share of requests answered with 429")
+    parser.add_argument("--sweeps", type=int, default=500, help="Sweep locations in the mock model")
+    parser.add_argument("--tags", type=int, default=500, help="Tags in the mock model (also batch_geocode points)")
+    parser.add_argument("--notes", type=int, default=500, help="Notes in the mock model")
+    parser.add_argument("--out", default="-", help="Results JSON path or '-' for stdout")
+    parser.add_argument("--baseline", help="Earlier results JSON to compare points/s against")
+    parser.add_argument("--max-regression", type=float, default=0.1, help="Allowed points/s drop vs --baseline")
+    args = parser.parse_args()
+
+    scenarios = [s.strip() for s in args.scenarios.split(",") if s.strip()]
+    unknown = [s for s in scenarios if s not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(unknown)}; use {', '.join(SCENARIOS)}")
+    config = ServerConfig(
+        latency=args.latency, jitter=args.jitter, throttle_rate=args.throttle_rate,
+        sweeps=args.sweeps, tags=args.tags, notes=args.notes,
+    )
+    points = {
+        "batch_geocode": config.tags, "sweeps": config.sweeps, "tags": config.tags, "notes": config.notes,
+        "all": config.sweeps + config.tags + config.notes,
+    }
+    grid = [
+        {"scenario": s, "concurrency": c, "max_rps": r, "points_per_request": p, "retries": args.retries}
+        for s in scenarios
+        for c in _ints(args.concurrency)
+        for r in _floats(args.max_rps)
+        for p in _ints(args.points_per_request)
+    ]
+
+    results = []
+    ctx = multiprocessing.get_context("spawn")
+    with BenchServer(config) as server:
+        for spec in grid:
+            with ctx.Pool(1) as pool:
+                result = pool.apply(_run_scenario, (server.url, spec, points[spec["scenario"]]))
+            results.append(result)
+            print(
+                f"{spec['scenario']:>13} c={spec['concurrency']:<3} rps={spec['max_rps']:<6g} "
+                f"ppr={spec['points_per_request']:<3} {result['points_per_s']:>9} pts/s "
+                f"p95 {result['p95_ms']} ms  rss {result['peak_rss_mb']} MB",
+                file=sys.stderr,
+            )
+        throttled = server.throttled
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "server": {**asdict(config), "throttled": throttled},
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.out == "-":
+        print(text)
+    else:
+        with open(args.out, "w") as fh:
+            fh.write(text + "\n")
+
+    if args.baseline:
+        with open(args.baseline) as fh:
+            regressions = compare(results, json.load(fh), args.max_regression)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
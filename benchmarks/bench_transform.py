@@ -0,0 +1,67 @@
+"""Local geotransform throughput: per-point ``to_geo`` vs the batched paths.
+
+    python benchmarks/bench_transform.py [--sizes 1000,100000,1000000]
+
+Pure-Python paths are skipped above ``--max-per-point`` points (they are
+linear, so the rate at smaller sizes carries over).
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import time
+from typing import Any, Callable
+
+from mp_geo_export.transform import HAVE_NUMPY, GeoTransform
+
+TRANSFORM = GeoTransform.from_geocoordinates(
+    {
+        "latitude": 37.7749,
+        "longitude": -122.4194,
+        "altitude": 16.0,
+        "translation": {"x": 12.5, "y": -3.0, "z": 1.2},
+        "rotation": {"x": 0.0, "y": 0.0, "z": 0.3826834, "w": 0.9238795},
+    }
+)
+
+
+def _time(fn: Callable[[], Any]) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def _fmt(seconds: float) -> str:
+    return f"{seconds:>11.3f}s" if seconds == seconds else f"{'-':>12}"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="1000,100000,1000000")
+    parser.add_argument("--max-per-point", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    print(f"numpy: {'yes' if HAVE_NUMPY else 'no'}")
+    print(f"{'points':>10} {'per-point':>12} {'pure batch':>12} {'numpy':>12} {'speedup':>8}")
+    for n in (int(s) for s in args.sizes.split(",")):
+        xyz = [(rng.uniform(-500, 500), rng.uniform(-500, 500), rng.uniform(-20, 20)) for _ in range(n)]
+        dicts = [{"x": x, "y": y, "z": z} for x, y, z in xyz]
+        per_point = (
+            _time(lambda: [TRANSFORM.to_geo(p) for p in dicts]) if n <= args.max_per_point else float("nan")
+        )
+        pure = _time(lambda: TRANSFORM.transform_array(xyz, use_numpy=False)) if n <= args.max_per_point else float("nan")
+        if HAVE_NUMPY:
+            import numpy as np
+
+            arr = np.asarray(xyz)
+            vectorized = _time(lambda: TRANSFORM.transform_array(arr))
+        else:
+            vectorized = float("nan")
+        speedup = per_point / vectorized
+        shown = f"{speedup:>7.0f}x" if speedup == speedup else f"{'-':>8}"
+        print(f"{n:>10} {_fmt(per_point)} {_fmt(pure)} {_fmt(vectorized)} {shown}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""Configurable local stand-in for the Matterport GraphQL endpoint, for benchmarks.
+
+Unlike ``tests/mock_graphql.py`` it synthesizes a model of any size and can
+add per-request latency, jitter and a random share of 429 responses.
+"""
+from __future__ import annotations
+
+import json
+import random
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+
+
+@dataclass
+class ServerConfig:
+    latency: float = 0.02
+    jitter: float = 0.005
+    throttle_rate: float = 0.0
+    sweeps: int = 1000
+    tags: int = 1000
+    notes: int = 1000
+    seed: int = 0
+
+
+def synthetic_model(config: ServerConfig) -> dict[str, list[dict[str, Any]]]:
+    rng = random.Random(config.seed)
+
+    def pos() -> dict[str, float]:
+        return {"x": rng.uniform(-200, 200), "y": rng.uniform(-200, 200), "z": rng.uniform(-5, 5)}
+
+    locations = [
+        {
+            "id": f"loc{i}",
+            "position": pos(),
+            "panos": [{"skybox": {"children": [f"https://cdn.test/loc{i}/face{f}.jpg" for f in range(6)]}}],
+        }
+        for i in range(config.sweeps)
+    ]
+    tags = [{"id": f"tag{i}", "label": f"Tag {i}", "anchorPosition": pos()} for i in range(config.tags)]
+    notes = [{"id": f"note{i}", "label": f"Note {i}", "anchorPosition": pos()} for i in range(config.notes)]
+    return {"locations": locations, "mattertags": tags, "notes": notes}
+
+
+class BenchServer:
+    """Threaded HTTP server answering the queries in ``mp_geo_export.queries``.
+
+    ``geoLocationOf`` maps a point to ``{"lat": x / 1e5, "long": y / 1e5}``.
+    Each request sleeps ``latency`` +/- ``jitter`` seconds; a ``throttle_rate``
+    share of requests gets a 429 with ``Retry-After: 0`` instead.
+    """
+
+    GEOCOORDINATES = {
+        "source": "bench", "latitude": 0.0, "longitude": 0.0, "altitude": 0.0,
+        "translation": {"x": 0.0, "y": 0.0, "z": 0.0}, "rotation": {"x": 0.0, "y": 0.0, "z": 0.0, "w": 1.0},
+    }
+
+    def __init__(self, config: ServerConfig) -> None:
+        self.config = config
+        self.model = synthetic_model(config)
+        self.requests = 0
+        self.throttled = 0
+        self._lock = threading.Lock()
+        self._rng = random.Random(config.seed + 1)
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Headers and body go out in separate writes; don't let Nagle hold the body
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args: Any) -> None:
+                pass
+
+            def do_POST(self) -> None:
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                status, payload = server.handle(body)
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                if status == 429:
+                    self.send_header("Retry-After", "0")
+                self.end_headers()
+                self.wfile.write(data)
+
+        class Server(ThreadingHTTPServer):
+            daemon_threads = True
+            request_queue_size = 256
+
+        self._httpd = Server(("127.0.0.1", 0), Handler)
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/graphql"
+
+    def __enter__(self) -> "BenchServer":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    @staticmethod
+    def _geo(point: dict[str, float]) -> dict[str, float]:
+        return {"lat": float(point["x"]) / 1e5, "long": float(point["y"]) / 1e5}
+
+    def handle(self, body: dict[str, Any]) -> tuple[int, dict[str, Any]]:
+        with self._lock:
+            self.requests += 1
+            delay = max(0.0, self.config.latency + self._rng.uniform(-self.config.jitter, self.config.jitter))
+            throttle = self._rng.random() < self.config.throttle_rate
+            if throttle:
+                self.throttled += 1
+        if delay:
+            time.sleep(delay)
+        if throttle:
+            return 429, {"errors": [{"message": "rate limited"}]}
+        query: str = body["query"]
+        variables: dict[str, Any] = body["variables"]
+        if "getExport" in query:
+            model = {k: v for k, v in self.model.items() if f"    {k} {{" in query}
+            return 200, {"data": {"model": {"id": variables["modelId"], "geocoordinates": self.GEOCOORDINATES, **model}}}
+        if "getSweeps" in query:
+            return 200, {"data": {"model": {"locations": self.model["locations"]}}}
+        if "getTags" in query:
+            return 200, {"data": {"model": {"mattertags": self.model["mattertags"]}}}
+        if "getNotes" in query:
+            return 200, {"data": {"model": {"notes": self.model["notes"]}}}
+        if "getGeoCoordinates" in query:
+            return 200, {"data": {"model": {"id": variables["modelId"], "geocoordinates": self.GEOCOORDINATES}}}
+        if "getLatLongOfModelPoints" in query:
+            aliases = {k: self._geo(v) for k, v in variables.items() if k != "modelId"}
+            return 200, {"data": {"model": {"geocoordinates": aliases}}}
+        if "getLatLongOfModelPoint" in query:
+            return 200, {"data": {"model": {"geocoordinates": {"geoLocationOf": self._geo(variables["point"])}}}}
+        return 200, {"errors": [{"message": "unknown query"}]}
@@ -1,94 +1,68 @@
 from __future__ import annotations
 
-from typing import Any
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
 
-from .api import ApiClient
-from .auth import get_auth_header
-from .config import api_url
-from .models import LatLng, NoteExport, PanoExport, TagExport
+# Public names and the modules they live in. They are imported on first
+# access (PEP 562) so that ``import mp_geo_export`` and the CLI entry point
+# don't pay for requests, pydantic, keyring and friends up front.
+_EXPORTS = {
+    "export_panos": ".sdk",
+    "export_sweeps": ".sdk",
+    "export_tags": ".sdk",
+    "export_notes": ".sdk",
+    "export_table": ".sdk",
+    "export_all": ".sdk",
+    "Exporter": ".sdk",
+    "CombinedExport": ".exports",
+    "ExportTable": ".table",
+    "PanoExport": ".models",
+    "TagExport": ".models",
+    "NoteExport": ".models",
+    "LatLng": ".models",
+    "GeoTransform": ".transform",
+    "TokenBucket": ".ratelimit",
+    "GeocodeCache": ".cache",
+    "GeocodeFailedError": ".results",
+    "VerifyToleranceError": ".geocode",
+    "PointResult": ".results",
+    "MetricsRecorder": ".instrument",
+    "RequestEvent": ".instrument",
+    "TraceWriter": ".instrument",
+    "FIELDS": ".fields",
+    # Importable from the package since the first release
+    "ApiClient": ".api",
+    "get_auth_header": ".auth",
+    "api_url": ".config",
+}
 
-__all__ = [
-    "export_panos",
-    "export_sweeps", 
-    "export_tags",
-    "export_notes",
-    "PanoExport",
-    "TagExport",
-    "NoteExport",
-    "LatLng",
-]
+__all__ = list(_EXPORTS)
 
+if TYPE_CHECKING:
+    from .api import ApiClient
+    from .auth import get_auth_header
+    from .cache import GeocodeCache
+    from .config import api_url
+    from .exports import CombinedExport
+    from .fields import FIELDS
+    from .geocode import VerifyToleranceError
+    from .instrument import MetricsRecorder, RequestEvent, TraceWriter
+    from .models import LatLng, NoteExport, PanoExport, TagExport
+    from .ratelimit import TokenBucket
+    from .results import GeocodeFailedError, PointResult
+    from .sdk import Exporter, export_all, export_notes, export_panos, export_sweeps, export_table, export_tags
+    from .table import ExportTable
+    from .transform import GeoTransform
 
-def _client(**kwargs: Any) -> ApiClient:
-    auth = get_auth_header(
-        api_key=kwargs.pop("api_key", None),
-        api_secret=kwargs.pop("api_secret", None),
-        save_to_keyring=kwargs.pop("save_to_keyring", False),
-    )
-    url = api_url(kwargs.pop("url", None))
-    timeout = float(kwargs.pop("timeout", 30.0))
-    max_rps = float(kwargs.pop("max_rps", 5.0))
-    retries = int(kwargs.pop("retries", 3))
-    return ApiClient(url, auth, timeout=timeout, max_rps=max_rps, retries=retries)
 
-
-def export_panos(
-    model_id: str,
-    include_skybox: bool = False,
-    resolution: str = "2k",
-    **kwargs: Any,
-) -> list[PanoExport]:
-    client = _client(**kwargs)
-    locations = client.fetch_locations(model_id, resolution)
-    points = [loc["position"] for loc in locations]
-    geos = client.batch_geocode(model_id, points, concurrency=int(kwargs.get("concurrency", 8)))
-    exports: list[PanoExport] = []
-    for i, loc in enumerate(locations):
-        geo = geos[i]
-        panos = loc.get("panos") or []
-        for idx, pano in enumerate(panos):
-            sky = pano.get("skybox", {}).get("children") if include_skybox else None
-            if include_skybox and (not sky or len(sky) != 6):
-                continue
-            exports.append(
-                PanoExport(
-                    id=f"{loc['id']}_pano{idx+1}",
-                    local=loc["position"],
-                    geo=LatLng(**geo),
-                    skyboxImages=sky if include_skybox else None,
-                )
-            )
-    return exports
-
-
-def export_tags(model_id: str, **kwargs: Any) -> list[TagExport]:
-    client = _client(**kwargs)
-    tags = client.fetch_tags(model_id)
-    geos = client.batch_geocode(model_id, [t["anchorPosition"] for t in tags], concurrency=int(kwargs.get("concurrency", 8)))
-    return [
-        TagExport(id=t["id"], label=t.get("label"), local=t["anchorPosition"], geo=LatLng(**g))
-        for t, g in zip(tags, geos)
-    ]
-
-
-def export_notes(model_id: str, **kwargs: Any) -> list[NoteExport]:
-    client = _client(**kwargs)
-    notes = client.fetch_notes(model_id)
-    geos = client.batch_geocode(model_id, [n["anchorPosition"] for n in notes], concurrency=int(kwargs.get("concurrency", 8)))
-    return [
-        NoteExport(id=n["id"], text=n.get("label"), local=n["anchorPosition"], geo=LatLng(**g))
-        for n, g in zip(notes, geos)
-    ]
-
-
-# Alias for consistency with CLI command name
-def export_sweeps(
-    model_id: str,
-    include_skybox: bool = False,
-    resolution: str = "2k",
-    **kwargs: Any,
-) -> list[PanoExport]:
-    """Alias for export_panos to match CLI command name."""
-    return export_panos(model_id, include_skybox=include_skybox, resolution=resolution, **kwargs)
+def __getattr__(name: str) -> Any:
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module, __name__), name)
+    globals()[name] = value
+    return value
 
 
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
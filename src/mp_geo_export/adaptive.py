@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Iterator
+
+from .ratelimit import TokenBucket
+
+
+class ConcurrencyGate:
+    """Semaphore whose limit can be raised or lowered while threads wait on it."""
+
+    def __init__(self, limit: int) -> None:
+        self._cond = threading.Condition()
+        self._limit = max(1, limit)
+        self._in_flight = 0
+
+    @property
+    def limit(self) -> int:
+        return self._limit
+
+    @limit.setter
+    def limit(self, value: int) -> None:
+        with self._cond:
+            self._limit = max(1, value)
+            self._cond.notify_all()
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def acquire(self) -> None:
+        with self._cond:
+            while self._in_flight >= self._limit:
+                self._cond.wait()
+            self._in_flight += 1
+
+    def release(self) -> None:
+        with self._cond:
+            self._in_flight -= 1
+            self._cond.notify()
+
+
+@dataclass(frozen=True)
+class AdaptiveState:
+    rps: float
+    concurrency: int
+    latency_ewma: float | None
+    increases: int
+    decreases: int
+
+
+class AdaptiveController:
+    """AIMD control of request rate and concurrency from server feedback.
+
+    Every ``window`` healthy responses (no throttling, latency within
+    ``latency_factor`` of the best seen) the rate grows by ``rps_step`` and the
+    concurrency by one, up to the ceilings. A 429/5xx or transport error
+    multiplies both by ``backoff`` (at most once per ``cooldown`` seconds, so a
+    burst of failures from in-flight requests counts as one signal) and a
+    ``Retry-After`` pauses the shared limiter.
+    """
+
+    def __init__(
+        self,
+        limiter: TokenBucket,
+        concurrency: int = 8,
+        max_rps: float = 20.0,
+        max_concurrency: int = 32,
+        min_rps: float = 0.5,
+        min_concurrency: int = 1,
+        rps_step: float = 0.5,
+        backoff: float = 0.5,
+        window: int = 10,
+        latency_factor: float = 2.0,
+        cooldown: float = 1.0,
+    ) -> None:
+        self.limiter = limiter
+        self.max_rps = max_rps
+        self.max_concurrency = max(1, max_concurrency)
+        self.min_rps = min_rps
+        self.min_concurrency = max(1, min_concurrency)
+        self.rps_step = rps_step
+        self.backoff = backoff
+        self.window = window
+        self.latency_factor = latency_factor
+        self.cooldown = cooldown
+        self.gate = ConcurrencyGate(min(max(concurrency, self.min_concurrency), self.max_concurrency))
+        if limiter.rate <= 0 or limiter.rate > max_rps:
+            limiter.rate = max_rps
+        self._lock = threading.Lock()
+        self._healthy = 0
+        self._latency_ewma: float | None = None
+        self._latency_floor: float | None = None
+        self._last_decrease = float("-inf")
+        self._increases = 0
+        self._decreases = 0
+
+    @contextmanager
+    def slot(self) -> Iterator[None]:
+        self.gate.acquire()
+        try:
+            yield
+        finally:
+            self.gate.release()
+
+    def on_success(self, latency: float) -> None:
+        with self._lock:
+            self._latency_ewma = latency if self._latency_ewma is None else 0.8 * self._latency_ewma + 0.2 * latency
+            self._latency_floor = latency if self._latency_floor is None else min(self._latency_floor, latency)
+            if self._latency_ewma > self._latency_floor * self.latency_factor:
+                self._healthy = 0
+                return
+            self._healthy += 1
+            if self._healthy < self.window:
+                return
+            self._healthy = 0
+            self.limiter.rate = min(self.max_rps, self.limiter.rate + self.rps_step)
+            self.gate.limit = min(self.max_concurrency, self.gate.limit + 1)
+            self._increases += 1
+
+    def on_throttle(self, retry_after: float | None = None) -> None:
+        if retry_after:
+            self.limiter.defer(retry_after)
+        self._decrease()
+
+    def on_error(self) -> None:
+        self._decrease()
+
+    def _decrease(self) -> None:
+        with self._lock:
+            self._healthy = 0
+            now = time.monotonic()
+            if now - self._last_decrease < self.cooldown:
+                return
+            self._last_decrease = now
+            self.limiter.rate = max(self.min_rps, self.limiter.rate * self.backoff)
+            self.gate.limit = max(self.min_concurrency, int(self.gate.limit * self.backoff))
+            self._decreases += 1
+
+    def state(self) -> AdaptiveState:
+        with self._lock:
+            return AdaptiveState(
+                rps=self.limiter.rate,
+                concurrency=self.gate.limit,
+                latency_ewma=self._latency_ewma,
+                increases=self._increases,
+                decreases=self._decreases,
+            )
@@ -0,0 +1,629 @@
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import json
+import queue
+import threading
+import time
+from concurrent.futures import Executor
+from typing import Any, AsyncIterator, Callable, Coroutine, Iterator, TypeVar
+
+import aiohttp
+
+from .api import LISTING_CHUNK, AuthenticationError, GraphQLError, ThrottledError, parse_retry_after, retry_delay
+from .jsonstream import ArrayParser
+from .instrument import (
+    GRAPHQL_ERROR, REQUEST_END, REQUEST_START, RETRY, THROTTLE_WAIT, Observer, RequestEvent, notify, operation_name,
+)
+from .queries import (
+    DEFAULT_RESOLUTION, GET_GEO, GET_MODEL_GEOCOORDINATES, KIND_FIELDS, build_batch_geo_query, build_combined_query,
+    build_listing_query,
+)
+from .ratelimit import TokenBucket
+from .results import PointResult, describe_error
+
+T = TypeVar("T")
+
+_TRANSPORT_ERRORS = (aiohttp.ClientError, asyncio.TimeoutError)
+
+# HTTP attempts made by the current task, so geocodes can report attempts per point
+_ATTEMPTS: contextvars.ContextVar[int] = contextvars.ContextVar("mp_geo_export_attempts", default=0)
+
+
+class AsyncApiClient:
+    """``ApiClient`` counterpart on aiohttp with one keep-alive connection pool.
+
+    In-flight geocodes are coroutines rather than threads, so ``concurrency``
+    can run into the hundreds; ``pool_size`` caps open connections to the API.
+    Requires the ``async`` extra (``pip install mp-geo-export[async]``).
+    """
+
+    def __init__(
+        self,
+        url: str,
+        auth_header: str,
+        timeout: float = 30.0,
+        max_rps: float = 5.0,
+        retries: int = 3,
+        limiter: TokenBucket | None = None,
+        burst: float = 1.0,
+        pool_size: int = 100,
+        keepalive_timeout: float = 30.0,
+        observers: list[Observer] | None = None,
+        on_unauthorized: Callable[[str], str | None] | None = None,
+    ) -> None:
+        self.url = url
+        self.headers = {"Authorization": auth_header, "Content-Type": "application/json"}
+        self.timeout = timeout
+        self.retries = retries
+        self.limiter = limiter if limiter is not None else TokenBucket(max_rps, burst=burst)
+        self.pool_size = pool_size
+        self.keepalive_timeout = keepalive_timeout
+        self.observers: list[Observer] = list(observers or [])
+        self.on_unauthorized = on_unauthorized
+        self._session: aiohttp.ClientSession | None = None
+
+    @property
+    def max_rps(self) -> float:
+        return self.limiter.rate
+
+    @max_rps.setter
+    def max_rps(self, value: float) -> None:
+        self.limiter.rate = value
+
+    async def __aenter__(self) -> "AsyncApiClient":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:  # type: ignore[no-untyped-def]
+        await self.close()
+
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.pool_size, limit_per_host=self.pool_size, keepalive_timeout=self.keepalive_timeout
+            )
+            self._session = aiohttp.ClientSession(
+                headers=self.headers,
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+        return self._session
+
+    def add_observer(self, observer: Observer) -> None:
+        self.observers.append(observer)
+
+    def _unauthorized(self, resp: aiohttp.ClientResponse) -> AuthenticationError:
+        """``ApiClient._unauthorized`` for aiohttp: swap in fresh credentials if ``on_unauthorized`` has them."""
+        rejected = resp.request_info.headers.get("Authorization", "")
+        fresh = self.on_unauthorized(rejected) if self.on_unauthorized else None
+        if fresh:
+            self.headers["Authorization"] = fresh
+            if self._session is not None:
+                self._session.headers["Authorization"] = fresh
+        return AuthenticationError(f"401 from {self.url}: credentials rejected", refreshed=bool(fresh))
+
+    def _emit(self, type: str, operation: str, attempt: int, **fields: Any) -> None:
+        if self.observers:
+            notify(self.observers, RequestEvent(type=type, operation=operation, attempt=attempt, **fields))
+
+    async def _rate_limit(self) -> float:
+        wait = self.limiter.reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+    async def _post(self, query: str, variables: dict[str, Any], allow_partial: bool = False) -> dict[str, Any]:
+        session = self._get_session()
+        operation = operation_name(query)
+        for attempt in range(self.retries + 1):
+            _ATTEMPTS.set(_ATTEMPTS.get() + 1)
+            try:
+                waited = await self._rate_limit()
+                if waited > 0:
+                    self._emit(THROTTLE_WAIT, operation, attempt + 1, wait=waited)
+                self._emit(REQUEST_START, operation, attempt + 1)
+                start = time.monotonic()
+                try:
+                    async with session.post(self.url, json={"query": query, "variables": variables}) as resp:
+                        body = await resp.read()
+                except _TRANSPORT_ERRORS as exc:
+                    self._emit(
+                        REQUEST_END, operation, attempt + 1, latency=time.monotonic() - start,
+                        error=describe_error(exc),
+                    )
+                    raise
+                self._emit(
+                    REQUEST_END, operation, attempt + 1, status=resp.status, latency=time.monotonic() - start,
+                    bytes=len(body),
+                )
+                if resp.status == 429 or resp.status >= 500:
+                    retry_after = parse_retry_after(resp.headers.get("Retry-After"))
+                    raise ThrottledError(f"{resp.status} from {self.url}", retry_after=retry_after)
+                if resp.status == 401:
+                    raise self._unauthorized(resp)
+                resp.raise_for_status()
+                payload = json.loads(body)
+                data = payload.get("data")
+                if "errors" in payload:
+                    self._emit(GRAPHQL_ERROR, operation, attempt + 1, error=str(payload["errors"]))
+                if "errors" in payload and not (allow_partial and isinstance(data, dict)):
+                    raise GraphQLError(str(payload["errors"]))
+                if not isinstance(data, dict):
+                    raise GraphQLError("Malformed GraphQL response: missing data")
+                return data
+            except (*_TRANSPORT_ERRORS, ThrottledError, GraphQLError, AuthenticationError) as exc:
+                if attempt == self.retries or (isinstance(exc, AuthenticationError) and not exc.refreshed):
+                    raise
+                delay = retry_delay(exc, attempt)
+                self._emit(RETRY, operation, attempt + 1, wait=delay, error=describe_error(exc))
+                await asyncio.sleep(delay)
+        raise RuntimeError("Unreachable")
+
+    async def _stream(self, query: str, variables: dict[str, Any], path: tuple[str, ...]) -> AsyncIterator[Any]:
+        """Async counterpart of ``ApiClient._stream``: yield ``data.<path>`` elements as the body arrives."""
+        session = self._get_session()
+        operation = operation_name(query)
+        # Bound each read rather than the whole transfer, which grows with the model
+        timeout = aiohttp.ClientTimeout(total=None, sock_connect=self.timeout, sock_read=self.timeout)
+        yielded = 0
+        for attempt in range(self.retries + 1):
+            _ATTEMPTS.set(_ATTEMPTS.get() + 1)
+            try:
+                waited = await self._rate_limit()
+                if waited > 0:
+                    self._emit(THROTTLE_WAIT, operation, attempt + 1, wait=waited)
+                self._emit(REQUEST_START, operation, attempt + 1)
+                start = time.monotonic()
+                received = 0
+                status: int | None = None
+                parser = ArrayParser(("data",) + path)
+                try:
+                    async with session.post(
+                        self.url, json={"query": query, "variables": variables}, timeout=timeout
+                    ) as resp:
+                        status = resp.status
+                        if resp.status == 429 or resp.status >= 500:
+                            received = len(await resp.read())
+                            retry_after = parse_retry_after(resp.headers.get("Retry-After"))
+                            raise ThrottledError(f"{resp.status} from {self.url}", retry_after=retry_after)
+                        if resp.status == 401:
+                            raise self._unauthorized(resp)
+                        resp.raise_for_status()
+                        index = 0
+                        try:
+                            async for chunk in resp.content.iter_chunked(LISTING_CHUNK):
+                                received += len(chunk)
+                                for item in parser.feed(chunk):
+                                    if index >= yielded:
+                                        yielded += 1
+                                        yield item
+                                    index += 1
+                            for item in parser.close():
+                                if index >= yielded:
+                                    yielded += 1
+                                    yield item
+                                index += 1
+                        except ValueError as exc:
+                            raise GraphQLError(f"Malformed GraphQL response: {exc}") from exc
+                except _TRANSPORT_ERRORS as exc:
+                    self._emit(
+                        REQUEST_END, operation, attempt + 1, status=status, latency=time.monotonic() - start,
+                        bytes=received or None, error=describe_error(exc),
+                    )
+                    raise
+                except BaseException:
+                    self._emit(
+                        REQUEST_END, operation, attempt + 1, status=status, latency=time.monotonic() - start,
+                        bytes=received,
+                    )
+                    raise
+                self._emit(
+                    REQUEST_END, operation, attempt + 1, status=status, latency=time.monotonic() - start,
+                    bytes=received,
+                )
+                errors = parser.members.get(("errors",))
+                if errors is not None:
+                    self._emit(GRAPHQL_ERROR, operation, attempt + 1, error=str(errors))
+                    raise GraphQLError(str(errors))
+                if parser.depth == 0 and not isinstance(parser.members.get(("data",)), dict):
+                    raise GraphQLError("Malformed GraphQL response: missing data")
+                return
+            except (*_TRANSPORT_ERRORS, ThrottledError, GraphQLError, AuthenticationError) as exc:
+                if attempt == self.retries or (isinstance(exc, AuthenticationError) and not exc.refreshed):
+                    raise
+                delay = retry_delay(exc, attempt)
+                self._emit(RETRY, operation, attempt + 1, wait=delay, error=describe_error(exc))
+                await asyncio.sleep(delay)
+
+    def iter_locations(
+        self, model_id: str, fields: frozenset[str] | None = None, resolution: str = DEFAULT_RESOLUTION
+    ) -> AsyncIterator[dict[str, Any]]:
+        """Sweep locations, yielded as the response is parsed (skyboxes only if ``fields`` selects them)."""
+        query = build_listing_query("sweeps", fields, resolution)
+        return self._stream(query, {"modelId": model_id}, ("model", "locations"))
+
+    def iter_tags(self, model_id: str, fields: frozenset[str] | None = None) -> AsyncIterator[dict[str, Any]]:
+        return self._stream(build_listing_query("tags", fields), {"modelId": model_id}, ("model", "mattertags"))
+
+    def iter_notes(self, model_id: str, fields: frozenset[str] | None = None) -> AsyncIterator[dict[str, Any]]:
+        return self._stream(build_listing_query("notes", fields), {"modelId": model_id}, ("model", "notes"))
+
+    async def fetch_locations(
+        self, model_id: str, resolution: str = DEFAULT_RESOLUTION, fields: frozenset[str] | None = None
+    ) -> list[dict[str, Any]]:
+        return [loc async for loc in self.iter_locations(model_id, fields, resolution)]
+
+    async def fetch_tags(self, model_id: str, fields: frozenset[str] | None = None) -> list[dict[str, Any]]:
+        return [tag async for tag in self.iter_tags(model_id, fields)]
+
+    async def fetch_notes(self, model_id: str, fields: frozenset[str] | None = None) -> list[dict[str, Any]]:
+        return [note async for note in self.iter_notes(model_id, fields)]
+
+    async def fetch_model_geocoordinates(self, model_id: str) -> dict[str, Any]:
+        data = await self._post(GET_MODEL_GEOCOORDINATES, {"modelId": model_id})
+        return data.get("model") or {}
+
+    async def fetch_combined(
+        self,
+        model_id: str,
+        kinds: list[str],
+        fields: frozenset[str] | None = None,
+        resolution: str = DEFAULT_RESOLUTION,
+    ) -> tuple[dict[str, Any], dict[str, list[dict[str, Any]]]]:
+        data = await self._post(build_combined_query(tuple(kinds), fields, resolution), {"modelId": model_id})
+        model = data.get("model") or {}
+        objects = {kind: model.get(KIND_FIELDS[kind]) or [] for kind in kinds}
+        return {"id": model.get("id"), "geocoordinates": model.get("geocoordinates")}, objects
+
+    async def geocode_point(self, model_id: str, point: dict[str, float]) -> dict[str, Any]:
+        data = await self._post(GET_GEO, {"modelId": model_id, "point": point})
+        model = data.get("model") or {}
+        geo = (model.get("geocoordinates") or {}).get("geoLocationOf")
+        if not geo:
+            raise GraphQLError("Geolocation not available for point")
+        return geo  # type: ignore[no-any-return]
+
+    async def geocode_points_multi(self, model_id: str, points: list[dict[str, float]]) -> list[dict[str, Any] | None]:
+        variables: dict[str, Any] = {"modelId": model_id}
+        for i, pt in enumerate(points):
+            variables[f"p{i}"] = pt
+        data = await self._post(build_batch_geo_query(len(points)), variables, allow_partial=True)
+        geocoordinates = (data.get("model") or {}).get("geocoordinates") or {}
+        return [geocoordinates.get(f"p{i}") or None for i in range(len(points))]
+
+    async def _geocode_chunk(self, model_id: str, points: list[dict[str, float]]) -> list[PointResult]:
+        results = [PointResult(index=i) for i in range(len(points))]
+        start = _ATTEMPTS.get()
+        if len(points) == 1:
+            try:
+                results[0].geo = await self.geocode_point(model_id, points[0])
+            except (*_TRANSPORT_ERRORS, ThrottledError, GraphQLError) as exc:
+                results[0].error = describe_error(exc)
+            results[0].attempts = _ATTEMPTS.get() - start
+            return results
+        try:
+            geos = await self.geocode_points_multi(model_id, points)
+        except (*_TRANSPORT_ERRORS, ThrottledError, GraphQLError) as exc:
+            # Already retried; splitting would only send the outage more requests
+            error = describe_error(exc)
+            for result in results:
+                result.error, result.attempts = error, _ATTEMPTS.get() - start
+            return results
+        spent = _ATTEMPTS.get() - start
+        for result, geo in zip(results, geos):
+            result.geo, result.attempts = geo, spent
+        missing = [i for i, g in enumerate(geos) if g is None]
+        if missing:
+            half = (len(missing) + 1) // 2
+            for part in (missing[:half], missing[half:]):
+                if not part:
+                    continue
+                for i, sub in zip(part, await self._geocode_chunk(model_id, [points[i] for i in part])):
+                    results[i].geo, results[i].error = sub.geo, sub.error
+                    results[i].attempts += sub.attempts
+        return results
+
+    async def geocode_results(
+        self,
+        model_id: str,
+        points: list[dict[str, float]],
+        concurrency: int,
+        max_rps: float | None = None,
+        on_progress: Callable[[int, float], None] | None = None,
+        points_per_request: int = 1,
+        on_result: Callable[[int, dict[str, Any] | None], None] | None = None,
+        semaphore: asyncio.Semaphore | None = None,
+    ) -> list[PointResult]:
+        """Geocode ``points`` concurrently into one ``PointResult`` per input, in input order.
+
+        Pass a shared ``semaphore`` to cap several batches (e.g. many models)
+        together; otherwise ``concurrency`` caps this call alone.
+        """
+        if max_rps is not None:
+            self.max_rps = max_rps
+        results = [PointResult(index=i) for i in range(len(points))]
+        completed = 0
+        start_time = time.monotonic()
+        size = max(1, points_per_request)
+        chunks = [list(range(i, min(i + size, len(points)))) for i in range(0, len(points), size)]
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(max(1, concurrency))
+
+        async def run(chunk: list[int]) -> list[int]:
+            async with semaphore:
+                chunk_results = await self._geocode_chunk(model_id, [points[i] for i in chunk])
+            for idx, result in zip(chunk, chunk_results):
+                result.index = idx
+                results[idx] = result
+            return chunk
+
+        tasks = [asyncio.ensure_future(run(chunk)) for chunk in chunks]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                chunk = await next_done
+                if on_result:
+                    for idx in chunk:
+                        on_result(idx, results[idx].geo)
+                completed += len(chunk)
+                if on_progress:
+                    try:
+                        elapsed = time.monotonic() - start_time
+                        rate = completed / elapsed if elapsed > 0 else 0
+                        on_progress(completed, rate)
+                    except Exception:
+                        pass
+        finally:
+            for task in tasks:
+                task.cancel()
+        return results
+
+    async def batch_geocode(
+        self,
+        model_id: str,
+        points: list[dict[str, float]],
+        concurrency: int,
+        max_rps: float | None = None,
+        on_progress: Callable[[int, float], None] | None = None,
+        points_per_request: int = 1,
+        on_result: Callable[[int, dict[str, Any] | None], None] | None = None,
+        semaphore: asyncio.Semaphore | None = None,
+    ) -> list[dict[str, Any] | None]:
+        results = await self.geocode_results(
+            model_id,
+            points,
+            concurrency,
+            max_rps=max_rps,
+            on_progress=on_progress,
+            points_per_request=points_per_request,
+            on_result=on_result,
+            semaphore=semaphore,
+        )
+        return [r.geo for r in results]
+
+
+class BlockingAsyncClient:
+    """Synchronous facade over ``AsyncApiClient`` for code written against ``ApiClient``.
+
+    The async client lives on an event loop in a background thread; each call
+    is submitted there and waited on, so the CLI and ``geocode_points`` can
+    switch engines without changing shape. Geocode batches share one
+    semaphore, sized by the first batch's ``concurrency``, the way the thread
+    engine's batches share one worker pool.
+    """
+
+    controller = None
+
+    def __init__(self, client: AsyncApiClient) -> None:
+        self.client = client
+        self._semaphore: asyncio.Semaphore | None = None
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="mp-geo-export-async", daemon=True)
+        self._thread.start()
+
+    def _run(self, coro: Coroutine[Any, Any, T]) -> T:
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    async def _shared_semaphore(self, concurrency: int) -> asyncio.Semaphore:
+        # Runs on the loop thread, so concurrent callers cannot each create one
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(max(1, concurrency))
+        return self._semaphore
+
+    @property
+    def limiter(self) -> TokenBucket:
+        return self.client.limiter
+
+    @property
+    def observers(self) -> list[Observer]:
+        return self.client.observers
+
+    def add_observer(self, observer: Observer) -> None:
+        self.client.add_observer(observer)
+
+    @property
+    def max_rps(self) -> float:
+        return self.client.max_rps
+
+    @max_rps.setter
+    def max_rps(self, value: float) -> None:
+        self.client.max_rps = value
+
+    def close(self) -> None:
+        if self._loop.is_closed():
+            return
+        self._run(self.client.close())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+    def __enter__(self) -> "BlockingAsyncClient":
+        return self
+
+    def __exit__(self, *exc_info) -> None:  # type: ignore[no-untyped-def]
+        self.close()
+
+    def _iterate(self, items: AsyncIterator[T]) -> Iterator[T]:
+        """Drive an async generator on the loop thread one element at a time."""
+
+        async def step() -> tuple[bool, T | None]:
+            try:
+                return True, await items.__anext__()
+            except StopAsyncIteration:
+                return False, None
+
+        try:
+            while True:
+                more, item = self._run(step())
+                if not more:
+                    return
+                yield item  # type: ignore[misc]
+        finally:
+            self._run(items.aclose())  # type: ignore[attr-defined]
+
+    def _listing(
+        self, items: AsyncIterator[dict[str, Any]], noun: str, on_progress: Callable[[str], None] | None
+    ) -> Iterator[dict[str, Any]]:
+        if on_progress:
+            on_progress("Sending GraphQL request...")
+        count = 0
+        for item in self._iterate(items):
+            count += 1
+            yield item
+        if on_progress:
+            on_progress(f"Found {count} {noun}")
+
+    def iter_locations(
+        self,
+        model_id: str,
+        on_progress: Callable[[str], None] | None = None,
+        fields: frozenset[str] | None = None,
+        resolution: str = DEFAULT_RESOLUTION,
+    ) -> Iterator[dict[str, Any]]:
+        return self._listing(self.client.iter_locations(model_id, fields, resolution), "locations", on_progress)
+
+    def iter_tags(
+        self, model_id: str, on_progress: Callable[[str], None] | None = None, fields: frozenset[str] | None = None
+    ) -> Iterator[dict[str, Any]]:
+        return self._listing(self.client.iter_tags(model_id, fields), "tags", on_progress)
+
+    def iter_notes(
+        self, model_id: str, on_progress: Callable[[str], None] | None = None, fields: frozenset[str] | None = None
+    ) -> Iterator[dict[str, Any]]:
+        return self._listing(self.client.iter_notes(model_id, fields), "notes", on_progress)
+
+    def fetch_locations(
+        self,
+        model_id: str,
+        resolution: str = DEFAULT_RESOLUTION,
+        on_progress: Callable[[str], None] | None = None,
+        fields: frozenset[str] | None = None,
+    ) -> list[dict[str, Any]]:
+        return list(self.iter_locations(model_id, on_progress, fields, resolution))
+
+    def fetch_tags(
+        self, model_id: str, on_progress: Callable[[str], None] | None = None, fields: frozenset[str] | None = None
+    ) -> list[dict[str, Any]]:
+        return list(self.iter_tags(model_id, on_progress, fields))
+
+    def fetch_notes(
+        self, model_id: str, on_progress: Callable[[str], None] | None = None, fields: frozenset[str] | None = None
+    ) -> list[dict[str, Any]]:
+        return list(self.iter_notes(model_id, on_progress, fields))
+
+    def fetch_model_geocoordinates(self, model_id: str, on_progress: Callable[[str], None] | None = None) -> dict[str, Any]:
+        return self._run(self.client.fetch_model_geocoordinates(model_id))
+
+    def fetch_combined(
+        self,
+        model_id: str,
+        kinds: list[str],
+        on_progress: Callable[[str], None] | None = None,
+        fields: frozenset[str] | None = None,
+        resolution: str = DEFAULT_RESOLUTION,
+    ) -> tuple[dict[str, Any], dict[str, list[dict[str, Any]]]]:
+        model, objects = self._run(self.client.fetch_combined(model_id, kinds, fields, resolution))
+        if on_progress:
+            on_progress(", ".join(f"{len(objects[k])} {k}" for k in kinds))
+        return model, objects
+
+    def geocode_point(self, model_id: str, point: dict[str, float]) -> dict[str, Any]:
+        return self._run(self.client.geocode_point(model_id, point))
+
+    def geocode_results(
+        self,
+        model_id: str,
+        points: list[dict[str, float]],
+        concurrency: int,
+        max_rps: float | None = None,
+        on_progress: Callable[[int, float], None] | None = None,
+        points_per_request: int = 1,
+        executor: Executor | None = None,
+        on_result: Callable[[int, dict[str, Any] | None], None] | None = None,
+    ) -> list[PointResult]:
+        # Work is scheduled on the event loop; the shared semaphore stands in for a thread ``executor``
+        semaphore = self._run(self._shared_semaphore(concurrency))
+        # Callbacks are relayed back to this thread, so a slow consumer holds up only its own batch
+        events: queue.SimpleQueue[tuple[Callable[..., None], tuple[Any, ...]] | None] = queue.SimpleQueue()
+
+        def relay(callback: Callable[..., None] | None) -> Callable[..., None] | None:
+            if callback is None:
+                return None
+            return lambda *args: events.put((callback, args))
+
+        def progress(completed: int, rate: float) -> None:
+            if on_progress:
+                try:
+                    on_progress(completed, rate)
+                except Exception:
+                    pass
+
+        future = asyncio.run_coroutine_threadsafe(
+            self.client.geocode_results(
+                model_id,
+                points,
+                concurrency=concurrency,
+                max_rps=max_rps,
+                on_progress=relay(progress if on_progress else None),
+                points_per_request=points_per_request,
+                on_result=relay(on_result),
+                semaphore=semaphore,
+            ),
+            self._loop,
+        )
+        future.add_done_callback(lambda _: events.put(None))
+        try:
+            while (event := events.get()) is not None:
+                callback, args = event
+                callback(*args)
+        except BaseException:
+            future.cancel()
+            raise
+        return future.result()
+
+    def batch_geocode(
+        self,
+        model_id: str,
+        points: list[dict[str, float]],
+        concurrency: int,
+        max_rps: float | None = None,
+        on_progress: Callable[[int, float], None] | None = None,
+        points_per_request: int = 1,
+        executor: Executor | None = None,
+        on_result: Callable[[int, dict[str, Any] | None], None] | None = None,
+    ) -> list[dict[str, Any] | None]:
+        results = self.geocode_results(
+            model_id,
+            points,
+            concurrency=concurrency,
+            max_rps=max_rps,
+            on_progress=on_progress,
+            points_per_request=points_per_request,
+            on_result=on_result,
+        )
+        return [r.geo for r in results]
@@ -1,18 +1,76 @@
 from __future__ import annotations
 
+import threading
 import time
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from typing import Any
+from concurrent.futures import Executor, ThreadPoolExecutor, as_completed
+from contextlib import nullcontext
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, ContextManager, Iterator
 
 import requests
+from requests.adapters import HTTPAdapter
 
-from .queries import GET_GEO, GET_NOTES, GET_SWEEPS, GET_TAGS, GET_MODEL_GEOCOORDINATES
+from .adaptive import AdaptiveController
+from .jsonstream import ArrayParser
+from .instrument import (
+    GRAPHQL_ERROR, REQUEST_END, REQUEST_START, RETRY, THROTTLE_WAIT, Observer, RequestEvent, notify, operation_name,
+)
+from .queries import (
+    DEFAULT_RESOLUTION, GET_GEO, GET_MODEL_GEOCOORDINATES, KIND_FIELDS, build_batch_geo_query, build_combined_query,
+    build_listing_query,
+)
+from .ratelimit import TokenBucket
+from .results import PointResult, describe_error
+
+
+# Bytes read per step when streaming a listing response
+LISTING_CHUNK = 64 * 1024
 
 
 class GraphQLError(RuntimeError):
     pass
 
 
+class AuthenticationError(requests.HTTPError):
+    """401 response. ``refreshed`` is set when fresh credentials were swapped in, so a retry may succeed."""
+
+    def __init__(self, message: str, response: requests.Response | None = None, refreshed: bool = False) -> None:
+        super().__init__(message, response=response)
+        self.refreshed = refreshed
+
+
+class ThrottledError(requests.HTTPError):
+    """429 or 5xx response; ``retry_after`` holds the server's requested delay, if any."""
+
+    def __init__(self, message: str, response: requests.Response | None = None, retry_after: float | None = None) -> None:
+        super().__init__(message, response=response)
+        self.retry_after = retry_after
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Parse a ``Retry-After`` header given as seconds or an HTTP date."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def retry_delay(exc: Exception, attempt: int) -> float:
+    """Seconds to wait before retrying after ``exc``: exponential, at least ``Retry-After``, none after a credential refresh."""
+    if isinstance(exc, AuthenticationError):
+        return 0.0
+    delay = float(2 ** attempt)
+    if isinstance(exc, ThrottledError) and exc.retry_after is not None:
+        delay = max(delay, exc.retry_after)
+    return delay
+
+
 class ApiClient:
     def __init__(
         self,
@@ -21,84 +79,287 @@ class ApiClient:
         timeout: float = 30.0,
         max_rps: float = 5.0,
         retries: int = 3,
+        limiter: TokenBucket | None = None,
+        burst: float = 1.0,
+        controller: AdaptiveController | None = None,
+        pool_size: int = 10,
+        observers: list[Observer] | None = None,
+        on_unauthorized: Callable[[str], str | None] | None = None,
     ) -> None:
         self.url = url
         self.session = requests.Session()
+        # urllib3 keeps 10 connections per host by default; size the pool to the worker count
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(1, pool_size))
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
         self.session.headers.update({
             "Authorization": auth_header,
             "Content-Type": "application/json",
         })
         self.timeout = timeout
-        self.max_rps = max_rps
         self.retries = retries
-        self._last = 0.0
-
-    def _rate_limit(self) -> None:
-        if self.max_rps <= 0:
-            return
-        min_interval = 1.0 / self.max_rps
-        now = time.monotonic()
-        delta = now - self._last
-        if delta < min_interval:
-            time.sleep(min_interval - delta)
-        self._last = time.monotonic()
-
-    def _post(self, query: str, variables: dict[str, Any]) -> dict[str, Any]:
+        # Pass a shared limiter to hold several clients to one rate budget
+        self.limiter = limiter if limiter is not None else TokenBucket(max_rps, burst=burst)
+        self.controller = controller
+        # Called with a RequestEvent at each request start/end, retry, limiter wait and GraphQL error
+        self.observers: list[Observer] = list(observers or [])
+        # Called with the rejected Authorization header on a 401; returns a fresh one to retry with, or None
+        self.on_unauthorized = on_unauthorized
+        # Per-thread count of HTTP attempts, so geocodes can report attempts per point
+        self._local = threading.local()
+
+    @property
+    def max_rps(self) -> float:
+        return self.limiter.rate
+
+    @max_rps.setter
+    def max_rps(self, value: float) -> None:
+        self.limiter.rate = value
+
+    def close(self) -> None:
+        self.session.close()
+
+    def __enter__(self) -> "ApiClient":
+        return self
+
+    def __exit__(self, *exc_info) -> None:  # type: ignore[no-untyped-def]
+        self.close()
+
+    def enable_adaptive(self, concurrency: int = 8, max_rps: float = 20.0, max_concurrency: int = 32) -> AdaptiveController:
+        """Attach an AIMD controller that tunes this client's limiter and concurrency."""
+        self.controller = AdaptiveController(
+            self.limiter, concurrency=concurrency, max_rps=max_rps, max_concurrency=max_concurrency
+        )
+        return self.controller
+
+    def add_observer(self, observer: Observer) -> None:
+        self.observers.append(observer)
+
+    def _emit(self, type: str, operation: str, attempt: int, **fields: Any) -> None:
+        if self.observers:
+            notify(self.observers, RequestEvent(type=type, operation=operation, attempt=attempt, **fields))
+
+    def _rate_limit(self) -> float:
+        return self.limiter.acquire()
+
+    def _slot(self) -> ContextManager[None]:
+        return self.controller.slot() if self.controller else nullcontext()
+
+    def _attempts(self) -> int:
+        return getattr(self._local, "attempts", 0)
+
+    def _unauthorized(self, resp: requests.Response) -> AuthenticationError:
+        # The header this request went out with; another thread may already have replaced it
+        rejected = str(resp.request.headers.get("Authorization", ""))
+        fresh = self.on_unauthorized(rejected) if self.on_unauthorized else None
+        if fresh:
+            self.session.headers["Authorization"] = fresh
+        return AuthenticationError(f"401 from {self.url}: credentials rejected", response=resp, refreshed=bool(fresh))
+
+    def _post(self, query: str, variables: dict[str, Any], allow_partial: bool = False) -> dict[str, Any]:
+        """POST a GraphQL document and return its ``data``.
+
+        With ``allow_partial`` a response carrying both ``data`` and ``errors``
+        is returned as-is so callers can pick out the fields that resolved.
+        """
+        operation = operation_name(query)
         for attempt in range(self.retries + 1):
+            self._local.attempts = self._attempts() + 1
             try:
-                self._rate_limit()
-                resp = self.session.post(self.url, json={"query": query, "variables": variables}, timeout=self.timeout)
+                with self._slot():
+                    waited = self._rate_limit()
+                    if waited > 0:
+                        self._emit(THROTTLE_WAIT, operation, attempt + 1, wait=waited)
+                    self._emit(REQUEST_START, operation, attempt + 1)
+                    start = time.monotonic()
+                    try:
+                        resp = self.session.post(
+                            self.url, json={"query": query, "variables": variables}, timeout=self.timeout
+                        )
+                    except requests.RequestException as exc:
+                        self._emit(
+                            REQUEST_END, operation, attempt + 1, latency=time.monotonic() - start,
+                            error=describe_error(exc),
+                        )
+                        if self.controller:
+                            self.controller.on_error()
+                        raise
+                    latency = time.monotonic() - start
+                self._emit(
+                    REQUEST_END, operation, attempt + 1, status=resp.status_code, latency=latency,
+                    bytes=len(resp.content),
+                )
+                if resp.status_code == 429 or resp.status_code >= 500:
+                    retry_after = parse_retry_after(resp.headers.get("Retry-After"))
+                    if self.controller:
+                        self.controller.on_throttle(retry_after)
+                    raise ThrottledError(f"{resp.status_code} from {self.url}", response=resp, retry_after=retry_after)
+                if resp.status_code == 401:
+                    raise self._unauthorized(resp)
                 resp.raise_for_status()
                 payload = resp.json()
+                data = payload.get("data")
                 if "errors" in payload:
+                    self._emit(GRAPHQL_ERROR, operation, attempt + 1, error=str(payload["errors"]))
+                if "errors" in payload and not (allow_partial and isinstance(data, dict)):
                     raise GraphQLError(str(payload["errors"]))
-                data = payload.get("data")
                 if not isinstance(data, dict):
                     raise GraphQLError("Malformed GraphQL response: missing data")
+                # Only a usable response tells the controller to speed up
+                if self.controller:
+                    self.controller.on_success(latency)
                 return data
-            except (requests.RequestException, GraphQLError):
-                if attempt == self.retries:
+            except (requests.RequestException, GraphQLError) as exc:
+                if attempt == self.retries or (isinstance(exc, AuthenticationError) and not exc.refreshed):
                     raise
-                time.sleep(2 ** attempt)
+                delay = retry_delay(exc, attempt)
+                self._emit(RETRY, operation, attempt + 1, wait=delay, error=describe_error(exc))
+                time.sleep(delay)
         raise RuntimeError("Unreachable")
 
-    def fetch_locations(self, model_id: str, resolution: str, on_progress: "None | (callable)" = None) -> list[dict[str, Any]]:  # type: ignore[valid-type]
-        if on_progress:
-            on_progress("Sending GraphQL request...")
-        data = self._post(GET_SWEEPS, {"modelId": model_id})
-        if on_progress:
-            on_progress("Parsing locations data...")
-        model = data.get("model") or {}
-        locations = model.get("locations") or []
-        if on_progress:
-            on_progress(f"Found {len(locations)} locations")
-        return locations
+    def _stream(self, query: str, variables: dict[str, Any], path: tuple[str, ...]) -> Iterator[Any]:
+        """POST a GraphQL document and yield the list at ``data.<path>`` element by element.
 
-    def fetch_tags(self, model_id: str, on_progress: "None | (callable)" = None) -> list[dict[str, Any]]:  # type: ignore[valid-type]
-        if on_progress:
-            on_progress("Sending GraphQL request...")
-        data = self._post(GET_TAGS, {"modelId": model_id})
-        if on_progress:
-            on_progress("Parsing tags data...")
-        model = data.get("model") or {}
-        tags = model.get("mattertags") or []
-        if on_progress:
-            on_progress(f"Found {len(tags)} tags")
-        return tags
+        The body is parsed as it arrives, so a listing of any size never sits
+        in memory whole, and ``timeout`` applies per read rather than to the
+        whole transfer. Failures are retried like ``_post``; a retry skips the
+        elements already yielded. GraphQL ``errors`` raise once the body has
+        been read.
+        """
+        operation = operation_name(query)
+        yielded = 0
+        for attempt in range(self.retries + 1):
+            self._local.attempts = self._attempts() + 1
+            received = 0
+            try:
+                with self._slot():
+                    waited = self._rate_limit()
+                    if waited > 0:
+                        self._emit(THROTTLE_WAIT, operation, attempt + 1, wait=waited)
+                    self._emit(REQUEST_START, operation, attempt + 1)
+                    start = time.monotonic()
+                    try:
+                        resp = self.session.post(
+                            self.url, json={"query": query, "variables": variables}, timeout=self.timeout, stream=True
+                        )
+                    except requests.RequestException as exc:
+                        self._emit(
+                            REQUEST_END, operation, attempt + 1, latency=time.monotonic() - start,
+                            error=describe_error(exc),
+                        )
+                        if self.controller:
+                            self.controller.on_error()
+                        raise
+                with resp:
+                    if resp.status_code == 429 or resp.status_code >= 500:
+                        self._emit(
+                            REQUEST_END, operation, attempt + 1, status=resp.status_code,
+                            latency=time.monotonic() - start, bytes=len(resp.content),
+                        )
+                        retry_after = parse_retry_after(resp.headers.get("Retry-After"))
+                        if self.controller:
+                            self.controller.on_throttle(retry_after)
+                        raise ThrottledError(f"{resp.status_code} from {self.url}", response=resp, retry_after=retry_after)
+                    latency = time.monotonic() - start
+                    parser = ArrayParser(("data",) + path)
+                    index = 0
+                    try:
+                        if resp.status_code == 401:
+                            raise self._unauthorized(resp)
+                        resp.raise_for_status()
+                        # Only a response that made it past the status checks tells the controller to speed up
+                        if self.controller:
+                            self.controller.on_success(latency)
+                        for chunk in resp.iter_content(chunk_size=LISTING_CHUNK):
+                            received += len(chunk)
+                            for item in parser.feed(chunk):
+                                if index >= yielded:
+                                    yielded += 1
+                                    yield item
+                                index += 1
+                        for item in parser.close():
+                            if index >= yielded:
+                                yielded += 1
+                                yield item
+                            index += 1
+                    except ValueError as exc:
+                        raise GraphQLError(f"Malformed GraphQL response: {exc}") from exc
+                    finally:
+                        self._emit(
+                            REQUEST_END, operation, attempt + 1, status=resp.status_code,
+                            latency=time.monotonic() - start, bytes=received,
+                        )
+                errors = parser.members.get(("errors",))
+                if errors is not None:
+                    self._emit(GRAPHQL_ERROR, operation, attempt + 1, error=str(errors))
+                    raise GraphQLError(str(errors))
+                if parser.depth == 0 and not isinstance(parser.members.get(("data",)), dict):
+                    raise GraphQLError("Malformed GraphQL response: missing data")
+                return
+            except (requests.RequestException, GraphQLError) as exc:
+                if attempt == self.retries or (isinstance(exc, AuthenticationError) and not exc.refreshed):
+                    raise
+                delay = retry_delay(exc, attempt)
+                self._emit(RETRY, operation, attempt + 1, wait=delay, error=describe_error(exc))
+                time.sleep(delay)
 
-    def fetch_notes(self, model_id: str, on_progress: "None | (callable)" = None) -> list[dict[str, Any]]:  # type: ignore[valid-type]
+    def _listing(
+        self, query: str, model_id: str, field: str, noun: str, on_progress: Callable[[str], None] | None
+    ) -> Iterator[dict[str, Any]]:
         if on_progress:
             on_progress("Sending GraphQL request...")
-        data = self._post(GET_NOTES, {"modelId": model_id})
+        count = 0
+        for item in self._stream(query, {"modelId": model_id}, ("model", field)):
+            count += 1
+            yield item
         if on_progress:
-            on_progress("Parsing notes data...")
-        model = data.get("model") or {}
-        notes = model.get("notes") or []
-        if on_progress:
-            on_progress(f"Found {len(notes)} notes")
-        return notes
+            on_progress(f"Found {count} {noun}")
+
+    def iter_locations(
+        self,
+        model_id: str,
+        on_progress: Callable[[str], None] | None = None,
+        fields: frozenset[str] | None = None,
+        resolution: str = DEFAULT_RESOLUTION,
+    ) -> Iterator[dict[str, Any]]:
+        """Sweep locations, yielded as the response is parsed.
+
+        Pano skybox URLs at ``resolution`` are only requested when ``fields``
+        is None or selects ``skybox``.
+        """
+        query = build_listing_query("sweeps", fields, resolution)
+        return self._listing(query, model_id, "locations", "locations", on_progress)
+
+    def iter_tags(
+        self, model_id: str, on_progress: Callable[[str], None] | None = None, fields: frozenset[str] | None = None
+    ) -> Iterator[dict[str, Any]]:
+        return self._listing(build_listing_query("tags", fields), model_id, "mattertags", "tags", on_progress)
+
+    def iter_notes(
+        self, model_id: str, on_progress: Callable[[str], None] | None = None, fields: frozenset[str] | None = None
+    ) -> Iterator[dict[str, Any]]:
+        return self._listing(build_listing_query("notes", fields), model_id, "notes", "notes", on_progress)
 
-    def fetch_model_geocoordinates(self, model_id: str, on_progress: "None | (callable)" = None) -> dict[str, Any]:  # type: ignore[valid-type]
+    def fetch_locations(
+        self,
+        model_id: str,
+        resolution: str = DEFAULT_RESOLUTION,
+        on_progress: Callable[[str], None] | None = None,
+        fields: frozenset[str] | None = None,
+    ) -> list[dict[str, Any]]:
+        return list(self.iter_locations(model_id, on_progress, fields, resolution))
+
+    def fetch_tags(
+        self, model_id: str, on_progress: Callable[[str], None] | None = None, fields: frozenset[str] | None = None
+    ) -> list[dict[str, Any]]:
+        return list(self.iter_tags(model_id, on_progress, fields))
+
+    def fetch_notes(
+        self, model_id: str, on_progress: Callable[[str], None] | None = None, fields: frozenset[str] | None = None
+    ) -> list[dict[str, Any]]:
+        return list(self.iter_notes(model_id, on_progress, fields))
+
+    def fetch_model_geocoordinates(self, model_id: str, on_progress: Callable[[str], None] | None = None) -> dict[str, Any]:
         if on_progress:
             on_progress("Sending GraphQL request...")
         data = self._post(GET_MODEL_GEOCOORDINATES, {"modelId": model_id})
@@ -109,6 +370,28 @@ class ApiClient:
             on_progress("Geocoordinates retrieved")
         return model
 
+    def fetch_combined(
+        self,
+        model_id: str,
+        kinds: list[str],
+        on_progress: Callable[[str], None] | None = None,
+        fields: frozenset[str] | None = None,
+        resolution: str = DEFAULT_RESOLUTION,
+    ) -> tuple[dict[str, Any], dict[str, list[dict[str, Any]]]]:
+        """Fetch the model georeference and every kind in ``kinds`` in one request.
+
+        Returns ``(model, objects)`` where ``model`` holds ``id`` and
+        ``geocoordinates`` and ``objects`` maps each kind to its raw objects.
+        """
+        if on_progress:
+            on_progress("Sending GraphQL request...")
+        data = self._post(build_combined_query(tuple(kinds), fields, resolution), {"modelId": model_id})
+        model = data.get("model") or {}
+        objects = {kind: model.get(KIND_FIELDS[kind]) or [] for kind in kinds}
+        if on_progress:
+            on_progress(", ".join(f"{len(objects[k])} {k}" for k in kinds))
+        return {"id": model.get("id"), "geocoordinates": model.get("geocoordinates")}, objects
+
     def geocode_point(self, model_id: str, point: dict[str, float]) -> dict[str, Any]:
         data = self._post(GET_GEO, {"modelId": model_id, "point": point})
         model = data.get("model") or {}
@@ -117,26 +400,102 @@ class ApiClient:
             raise GraphQLError("Geolocation not available for point")
         return geo  # type: ignore[no-any-return]
 
-    def batch_geocode(
+    def geocode_points_multi(self, model_id: str, points: list[dict[str, float]]) -> list[dict[str, Any] | None]:
+        """Resolve several points in one request; unresolved aliases come back as None."""
+        variables: dict[str, Any] = {"modelId": model_id}
+        for i, pt in enumerate(points):
+            variables[f"p{i}"] = pt
+        data = self._post(build_batch_geo_query(len(points)), variables, allow_partial=True)
+        model = data.get("model") or {}
+        geocoordinates = model.get("geocoordinates") or {}
+        return [geocoordinates.get(f"p{i}") or None for i in range(len(points))]
+
+    def _geocode_chunk(self, model_id: str, points: list[dict[str, float]]) -> list[PointResult]:
+        """Geocode one chunk; failures are recorded per point rather than raised."""
+        results = [PointResult(index=i) for i in range(len(points))]
+        start = self._attempts()
+        # Single points go through GET_GEO so errors are reported exactly as before
+        if len(points) == 1:
+            try:
+                results[0].geo = self.geocode_point(model_id, points[0])
+            except AuthenticationError:
+                # Every other point would fail the same way
+                raise
+            except (requests.RequestException, GraphQLError) as exc:
+                results[0].error = describe_error(exc)
+            results[0].attempts = self._attempts() - start
+            return results
+        try:
+            geos = self.geocode_points_multi(model_id, points)
+        except AuthenticationError:
+            raise
+        except (requests.RequestException, GraphQLError) as exc:
+            # Already retried; splitting would only send the outage more requests
+            error = describe_error(exc)
+            for result in results:
+                result.error, result.attempts = error, self._attempts() - start
+            return results
+        spent = self._attempts() - start
+        for result, geo in zip(results, geos):
+            result.geo, result.attempts = geo, spent
+        missing = [i for i, g in enumerate(geos) if g is None]
+        if missing:
+            # Retry only the failed aliases, halving the chunk each round
+            half = (len(missing) + 1) // 2
+            for part in (missing[:half], missing[half:]):
+                if not part:
+                    continue
+                for i, sub in zip(part, self._geocode_chunk(model_id, [points[i] for i in part])):
+                    results[i].geo, results[i].error = sub.geo, sub.error
+                    results[i].attempts += sub.attempts
+        return results
+
+    def geocode_results(
         self,
         model_id: str,
         points: list[dict[str, float]],
         concurrency: int,
         max_rps: float | None = None,
-        on_progress: "None | (callable)" = None,  # type: ignore[valid-type]
-    ) -> list[dict[str, Any]]:
-        if max_rps is not None:
+        on_progress: Callable[[int, float], None] | None = None,
+        points_per_request: int = 1,
+        executor: Executor | None = None,
+        on_result: Callable[[int, dict[str, Any] | None], None] | None = None,
+    ) -> list[PointResult]:
+        """Geocode ``points`` concurrently into one ``PointResult`` per input, in input order.
+
+        A point that still fails after retries is recorded with its error and
+        the rest of the batch carries on. Pass a shared ``executor`` to run
+        several batches (e.g. many models) on one worker pool; otherwise a
+        pool of ``concurrency`` threads is used. ``on_result(index, geo)`` is
+        called from the calling thread as each point settles, in completion
+        order, with ``geo`` None for failures.
+        """
+        if max_rps is not None and self.controller is None:
+            # The controller owns the rate once adaptive mode is on
             self.max_rps = max_rps
-        results: list[dict[str, Any] | None] = [None] * len(points)
+        results = [PointResult(index=i) for i in range(len(points))]
         completed = 0
         start_time = time.monotonic()
-        
-        with ThreadPoolExecutor(max_workers=concurrency) as executor:
-            future_to_index = {executor.submit(self.geocode_point, model_id, pt): idx for idx, pt in enumerate(points)}
-            for future in as_completed(future_to_index):
-                idx = future_to_index[future]
-                results[idx] = future.result()
-                completed += 1
+        size = max(1, points_per_request)
+        chunks = [list(range(i, min(i + size, len(points)))) for i in range(0, len(points), size)]
+
+        owned = executor is None
+        if executor is None:
+            # Adaptive mode sizes the pool to the ceiling and lets the controller's gate throttle it
+            workers = self.controller.max_concurrency if self.controller else concurrency
+            executor = ThreadPoolExecutor(max_workers=workers)
+        future_to_chunk = {
+            executor.submit(self._geocode_chunk, model_id, [points[i] for i in chunk]): chunk for chunk in chunks
+        }
+        try:
+            for future in as_completed(future_to_chunk):
+                chunk = future_to_chunk[future]
+                for idx, result in zip(chunk, future.result()):
+                    result.index = idx
+                    results[idx] = result
+                    if on_result:
+                        on_result(idx, result.geo)
+                completed += len(chunk)
                 if on_progress:
                     try:
                         # Provide both completed count and rate information
@@ -145,6 +504,35 @@ class ApiClient:
                         on_progress(completed, rate)
                     except Exception:
                         pass
-        return [r for r in results if r is not None]
-
+        except BaseException:
+            for future in future_to_chunk:
+                future.cancel()
+            raise
+        finally:
+            if owned:
+                executor.shutdown(wait=True)
+        return results
 
+    def batch_geocode(
+        self,
+        model_id: str,
+        points: list[dict[str, float]],
+        concurrency: int,
+        max_rps: float | None = None,
+        on_progress: Callable[[int, float], None] | None = None,
+        points_per_request: int = 1,
+        executor: Executor | None = None,
+        on_result: Callable[[int, dict[str, Any] | None], None] | None = None,
+    ) -> list[dict[str, Any] | None]:
+        """Like ``geocode_results`` but returns just the geos, aligned by index (None where failed)."""
+        results = self.geocode_results(
+            model_id,
+            points,
+            concurrency,
+            max_rps=max_rps,
+            on_progress=on_progress,
+            points_per_request=points_per_request,
+            executor=executor,
+            on_result=on_result,
+        )
+        return [r.geo for r in results]
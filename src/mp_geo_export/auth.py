@@ -3,50 +3,184 @@ from __future__ import annotations
 import base64
 import getpass
 import os
-from typing import Optional
+import threading
+from pathlib import Path
+from typing import Callable, Optional, Sequence
 
-import keyring
+from .config import load_env
 
 SERVICE = "mp-geo-export"
 ACCOUNT = "matterport-basic"
 
+# A provider returns (key, secret), or None when it has no credentials
+Provider = Callable[[], "tuple[str, str] | None"]
+
+# Comma list of provider names overriding DEFAULT_PROVIDERS, e.g. "env,file" to never touch the keyring
+PROVIDERS_ENV = "MATTERPORT_CREDENTIAL_PROVIDERS"
+# File holding "key:secret" for the file provider
+FILE_ENV = "MATTERPORT_CREDENTIALS_FILE"
+
 
 def _b64(text: str) -> str:
     return base64.b64encode(text.encode()).decode()
 
 
+def _split(value: str | None) -> tuple[str, str] | None:
+    """Parse the stored "key:secret" form."""
+    if not value:
+        return None
+    key, sep, secret = value.strip().partition(":")
+    return (key, secret) if sep and key and secret else None
+
+
+def keyring_provider() -> tuple[str, str] | None:
+    import keyring
+    from keyring.errors import KeyringError
+
+    try:
+        return _split(keyring.get_password(SERVICE, ACCOUNT))
+    except KeyringError:
+        return None
+
+
+def env_provider() -> tuple[str, str] | None:
+    key = os.getenv("MATTERPORT_API_KEY")
+    secret = os.getenv("MATTERPORT_API_SECRET")
+    return (key, secret) if key and secret else None
+
+
+class FileProvider:
+    """Reads "key:secret" from ``path``, or from ``$MATTERPORT_CREDENTIALS_FILE`` when no path is given."""
+
+    def __init__(self, path: str | Path | None = None) -> None:
+        self.path = path
+
+    def __call__(self) -> tuple[str, str] | None:
+        path = self.path or os.getenv(FILE_ENV)
+        if not path:
+            return None
+        try:
+            return _split(Path(path).expanduser().read_text())
+        except OSError:
+            return None
+
+
+PROVIDERS: dict[str, Provider] = {"keyring": keyring_provider, "env": env_provider, "file": FileProvider()}
+DEFAULT_PROVIDERS = ("keyring", "env", "file")
+
+
+def providers_from_env() -> list[Provider]:
+    """Providers named in ``$MATTERPORT_CREDENTIAL_PROVIDERS``, else ``DEFAULT_PROVIDERS``, in order."""
+    load_env()
+    names = [n.strip().lower() for n in (os.getenv(PROVIDERS_ENV) or "").split(",") if n.strip()]
+    unknown = [n for n in names if n not in PROVIDERS]
+    if unknown:
+        raise ValueError(f"Unknown credential providers: {', '.join(unknown)}. Use {', '.join(PROVIDERS)}.")
+    return [PROVIDERS[n] for n in names or DEFAULT_PROVIDERS]
+
+
+class CredentialResolver:
+    """Resolves the ``Authorization`` header once per process and caches it.
+
+    Providers are tried in order; explicit ``api_key``/``api_secret`` come
+    after them, then an interactive prompt. Resolving can be slow (a Secret
+    Service keyring goes over D-Bus and may wait on an unlock prompt), so the
+    header is cached per set of explicit arguments until ``invalidate``, or
+    ``refresh`` after the API answered 401.
+    """
+
+    def __init__(self, providers: Sequence[Provider] | None = None) -> None:
+        # None reads the order from the environment at each resolve
+        self.providers = list(providers) if providers is not None else None
+        self._cache: dict[tuple[str | None, str | None], str] = {}
+        # Rejected header -> its replacement, so concurrent 401s resolve once
+        self._replaced: dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def header(
+        self,
+        api_key: Optional[str] = None,
+        api_secret: Optional[str] = None,
+        save_to_keyring: bool = False,
+    ) -> str:
+        with self._lock:
+            cached = self._cache.get((api_key, api_secret))
+            if cached is None:
+                cached = self._resolve(api_key, api_secret, save_to_keyring, prompt=True)
+                self._cache[(api_key, api_secret)] = cached
+            return cached
+
+    def invalidate(self, header: str | None = None) -> None:
+        """Forget the cached header (every one when ``header`` is None)."""
+        with self._lock:
+            if header is None:
+                self._cache.clear()
+            else:
+                self._cache = {k: v for k, v in self._cache.items() if v != header}
+
+    def refresh(self, rejected: str) -> str | None:
+        """Drop ``rejected`` and resolve again without prompting.
+
+        Returns the new header, or None when the providers still give the
+        rejected one (or none at all), so there is nothing new to retry with.
+        """
+        with self._lock:
+            if rejected in self._replaced:
+                return self._replaced[rejected]
+            fresh: str | None = None
+            for key in [k for k, v in self._cache.items() if v == rejected] or [(None, None)]:
+                self._cache.pop(key, None)
+                try:
+                    header = self._resolve(key[0], key[1], False, prompt=False)
+                except LookupError:
+                    continue
+                self._cache[key] = header
+                if header != rejected:
+                    fresh = header
+            if fresh is not None:
+                self._replaced[rejected] = fresh
+            return fresh
+
+    def _resolve(self, api_key: str | None, api_secret: str | None, save_to_keyring: bool, prompt: bool) -> str:
+        load_env()
+        credentials = None
+        for provider in self.providers if self.providers is not None else providers_from_env():
+            credentials = provider()
+            if credentials:
+                break
+        if not credentials and api_key and api_secret:
+            credentials = (api_key, api_secret)
+        if not credentials:
+            if not prompt:
+                raise LookupError("No Matterport API credentials found")
+            print("Enter Matterport API credentials:")
+            key = (api_key or input("API key: ").strip())
+            secret = (api_secret or getpass.getpass("API secret: ").strip())
+            if save_to_keyring:
+                import keyring
+
+                keyring.set_password(SERVICE, ACCOUNT, f"{key}:{secret}")
+            credentials = (key, secret)
+        return f"Basic {_b64(':'.join(credentials))}"
+
+
+_resolver = CredentialResolver()
+
+
 def get_auth_header(
     api_key: Optional[str] = None,
     api_secret: Optional[str] = None,
     save_to_keyring: bool = False,
 ) -> str:
-    # Priority: keyring -> env -> explicit args -> prompt
-    key: Optional[str]
-    secret: Optional[str]
+    # Priority: providers (keyring -> env -> file by default) -> explicit args -> prompt
+    return _resolver.header(api_key, api_secret, save_to_keyring)
 
-    stored = keyring.get_password(SERVICE, ACCOUNT)
-    if stored:
-        try:
-            key, secret = stored.split(":", 1)
-        except ValueError:
-            key, secret = None, None
-    else:
-        key, secret = None, None
-
-    if not (key and secret):
-        key = os.getenv("MATTERPORT_API_KEY")
-        secret = os.getenv("MATTERPORT_API_SECRET")
-
-    if not (key and secret):
-        key = api_key
-        secret = api_secret
-
-    if not (key and secret):
-        print("Enter Matterport API credentials:")
-        key = (key or input("API key: ").strip())
-        secret = (secret or getpass.getpass("API secret: ").strip())
-        if save_to_keyring:
-            keyring.set_password(SERVICE, ACCOUNT, f"{key}:{secret}")
-
-    token = _b64(f"{key}:{secret}")
-    return f"Basic {token}"
\ No newline at end of file
+
+def refresh_auth_header(rejected: str) -> str | None:
+    """``ApiClient(on_unauthorized=...)`` hook: a fresh header after a 401, or None."""
+    return _resolver.refresh(rejected)
+
+
+def invalidate_credentials(header: str | None = None) -> None:
+    """Drop cached credentials so the next ``get_auth_header`` resolves them again."""
+    _resolver.invalidate(header)
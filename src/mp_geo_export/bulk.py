@@ -0,0 +1,249 @@
+from __future__ import annotations
+
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Iterable
+
+from .cache import GeocodeCache
+from .dedup import DEFAULT_TOLERANCE
+from .delta import DeltaCounts, PreviousExport, record_georeference
+from .exports import KINDS, fetch_objects, object_points
+from .fields import parse_fields
+from .geocode import DEFAULT_VERIFY_TOLERANCE, fetch_georeference, geocode_points
+from .queries import DEFAULT_RESOLUTION
+from .results import check_on_error
+from .table import ExportTable
+from .writers import open_writer
+
+if TYPE_CHECKING:
+    from .aio import BlockingAsyncClient
+    from .api import ApiClient
+
+MANIFEST_NAME = "manifest.json"
+
+
+@dataclass
+class BulkJob:
+    model_id: str
+    kind: str
+    status: str = "pending"
+    path: str | None = None
+    count: int = 0
+    points: int = 0
+    unique_points: int = 0
+    coalesced: int = 0
+    requests_saved: int = 0
+    # Filled with ``since``: rows compared to the previous run's file, and geocodes taken from it
+    reused: int = 0
+    added: int = 0
+    moved: int = 0
+    removed: int = 0
+    # Filled in verify mode: the spot-check's max local-vs-remote error in meters
+    verify_max_error_m: float | None = None
+    failed_points: list[dict[str, Any]] = field(default_factory=list)
+    error: str | None = None
+    elapsed: float = 0.0
+
+
+@dataclass
+class BulkSummary:
+    started: str
+    finished: str = ""
+    elapsed: float = 0.0
+    jobs: list[BulkJob] = field(default_factory=list)
+    limiter: dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def failed(self) -> list[BulkJob]:
+        return [j for j in self.jobs if j.status != "ok"]
+
+    @property
+    def dedup(self) -> dict[str, int]:
+        ok = [j for j in self.jobs if j.status == "ok"]
+        return {
+            "points": sum(j.points for j in ok),
+            "unique_points": sum(j.unique_points for j in ok),
+            "coalesced": sum(j.coalesced for j in ok),
+            "requests_saved": sum(j.requests_saved for j in ok),
+        }
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "started": self.started,
+            "finished": self.finished,
+            "elapsed": round(self.elapsed, 3),
+            "models": len({j.model_id for j in self.jobs}),
+            "jobs_total": len(self.jobs),
+            "jobs_failed": len(self.failed),
+            "limiter": self.limiter,
+            "dedup": self.dedup,
+            "jobs": [asdict(j) for j in self.jobs],
+        }
+
+
+def read_model_ids(path: Path) -> list[str]:
+    """One model id per line; blank lines and ``#`` comments are skipped, duplicates dropped."""
+    seen: dict[str, None] = {}
+    for line in Path(path).read_text().splitlines():
+        model_id = line.split("#", 1)[0].strip()
+        if model_id:
+            seen.setdefault(model_id, None)
+    return list(seen)
+
+
+def parse_kinds(value: str) -> list[str]:
+    kinds = [k.strip().lower() for k in value.split(",") if k.strip()]
+    unknown = [k for k in kinds if k not in KINDS]
+    if unknown or not kinds:
+        raise ValueError(f"Unsupported kinds: {', '.join(unknown) or value!r}. Use a comma list of {', '.join(KINDS)}.")
+    return kinds
+
+
+def output_path(out_dir: Path, model_id: str, kind: str, format: str) -> Path:
+    return Path(out_dir) / f"{model_id}_{kind}.{format.lower()}"
+
+
+def run_bulk(
+    client: ApiClient | BlockingAsyncClient,
+    model_ids: list[str],
+    kinds: list[str],
+    out_dir: Path,
+    format: str = "geojson",
+    concurrency: int = 8,
+    parallel_jobs: int = 4,
+    geocode_mode: str = "remote",
+    points_per_request: int = 1,
+    include_skybox: bool = False,
+    cache: GeocodeCache | None = None,
+    pretty: bool = False,
+    on_job_done: Callable[[BulkJob], None] | None = None,
+    dedup_tolerance: float = DEFAULT_TOLERANCE,
+    on_error: str = "fail",
+    fields: str | Iterable[str] | None = None,
+    resolution: str = DEFAULT_RESOLUTION,
+    since: Path | None = None,
+    verify_tolerance: float = DEFAULT_VERIFY_TOLERANCE,
+) -> BulkSummary:
+    """Export every (model, kind) pair through one client and one geocode worker pool.
+
+    Up to ``parallel_jobs`` jobs fetch and write at once, while all of their
+    geocode requests share a single pool of ``concurrency`` workers and the
+    client's rate limiter. A failing job is recorded in the summary and the
+    rest of the batch continues; ``on_error`` decides whether points that fail
+    to geocode fail their job or are skipped/written with a null geo, and
+    they are listed per job either way. Jobs for the same model share in-flight
+    geocodes of identical points (tags and notes on one anchor, say). A
+    ``manifest.json`` is written to ``out_dir``. ``fields`` selects the
+    output fields as in ``parse_fields``, and only those are requested.
+    With ``since``, the directory of an earlier run (``out_dir`` itself
+    works), each job reads its previous file there and only geocodes the
+    objects that are new or moved; the rest keep their previous geocodes,
+    unless the model's georeference changed since. Each file gets a
+    ``.georef`` record of the georeference it was geocoded with.
+    In ``verify`` mode a job whose spot-check error exceeds
+    ``verify_tolerance`` meters fails, and each job records its max error.
+    """
+    on_error = check_on_error(on_error)
+    selected = parse_fields(fields, include_skybox)
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    summary = BulkSummary(started=datetime.now(timezone.utc).isoformat(timespec="seconds"))
+    summary.jobs = [BulkJob(model_id=m, kind=k) for m in model_ids for k in kinds]
+    start = time.monotonic()
+    georefs: dict[str, dict[str, Any]] = {}
+
+    def georeference(model_id: str) -> dict[str, Any]:
+        # Fetched once per model for all of its kinds; a race only costs a second fetch
+        if model_id not in georefs:
+            georefs[model_id] = fetch_georeference(client, model_id)
+        return georefs[model_id]
+
+    with ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix="geocode") as geocode_pool:
+
+        def run(job: BulkJob) -> BulkJob:
+            job_start = time.monotonic()
+            try:
+                previous = None
+                if since is not None and output_path(since, job.model_id, job.kind, format).exists():
+                    previous = PreviousExport.load(output_path(since, job.model_id, job.kind, format), job.kind)
+                objects = fetch_objects(client, job.kind, job.model_id, resolution, fields=selected)
+                points = object_points(job.kind, objects)
+                georef = georeference(job.model_id)
+                table = ExportTable.from_objects(
+                    job.kind, objects, include_skybox="skybox" in selected, fields=selected
+                )
+                path = output_path(out_dir, job.model_id, job.kind, format)
+                writer = open_writer(format, path, pretty)
+
+                def emit(index: int, geo: dict[str, Any] | None) -> None:
+                    if geo is None and on_error != "null":
+                        writer.put(index, [])
+                        return
+                    table.set_geo(index, geo)
+                    writer.put_rows(index, table, table.rows(index))
+
+                with writer:
+                    outcome = geocode_points(
+                        client,
+                        job.model_id,
+                        points,
+                        mode=geocode_mode,
+                        concurrency=concurrency,
+                        points_per_request=points_per_request,
+                        cache=cache,
+                        executor=geocode_pool,
+                        on_result=emit,
+                        dedup_tolerance=dedup_tolerance,
+                        geocoordinates=georef,
+                        known=previous.known(objects, georef) if previous is not None else None,
+                    )
+                    job.failed_points = [
+                        {**r.to_dict(), "id": objects[r.index].get("id")} for r in outcome.failures
+                    ]
+                    if outcome.verify is not None:
+                        job.verify_max_error_m = outcome.verify.max_error_m
+                    if on_error == "fail":
+                        outcome.raise_for_failures()
+                    outcome.raise_for_verify(verify_tolerance)
+                record_georeference(path, georef)
+                job.status, job.path, job.count, job.points = "ok", str(path), writer.count, len(points)
+                if previous is not None:
+                    counts = DeltaCounts(removed=len(previous.removed(set(table.ids))))
+                    for row in range(len(table)):
+                        counts.count(previous.change(table, row))
+                    job.reused, job.added, job.moved, job.removed = (
+                        outcome.reused, counts.added, counts.moved, counts.removed
+                    )
+                if outcome.dedup is not None:
+                    job.unique_points = outcome.dedup.unique
+                    job.coalesced = outcome.dedup.coalesced
+                    job.requests_saved = outcome.dedup.requests_saved
+            except Exception as exc:
+                job.status, job.error = "failed", f"{type(exc).__name__}: {exc}"
+            job.elapsed = time.monotonic() - job_start
+            return job
+
+        with ThreadPoolExecutor(max_workers=max(1, parallel_jobs), thread_name_prefix="bulk-job") as job_pool:
+            futures = [job_pool.submit(run, job) for job in summary.jobs]
+            for future in as_completed(futures):
+                job = future.result()
+                if on_job_done:
+                    try:
+                        on_job_done(job)
+                    except Exception:
+                        pass
+
+    summary.elapsed = time.monotonic() - start
+    summary.finished = datetime.now(timezone.utc).isoformat(timespec="seconds")
+    stats = client.limiter.stats()
+    summary.limiter = {
+        "requests": stats.acquired,
+        "waited": stats.waited,
+        "time_blocked": round(stats.time_blocked, 3),
+    }
+    (out_dir / MANIFEST_NAME).write_text(json.dumps(summary.to_dict(), indent=2))
+    return summary
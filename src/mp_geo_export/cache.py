@@ -0,0 +1,213 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from .config import load_env
+
+DEFAULT_MAX_ENTRIES = 1_000_000
+DEFAULT_MAX_AGE = 90 * 24 * 3600.0
+CACHE_FILENAME = "geocode-cache.sqlite3"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS geocodes (
+    model_id TEXT NOT NULL,
+    fingerprint TEXT NOT NULL,
+    x INTEGER NOT NULL,
+    y INTEGER NOT NULL,
+    z INTEGER NOT NULL,
+    lat REAL NOT NULL,
+    long REAL NOT NULL,
+    alt REAL,
+    created REAL NOT NULL,
+    accessed REAL NOT NULL,
+    PRIMARY KEY (model_id, fingerprint, x, y, z)
+);
+CREATE INDEX IF NOT EXISTS geocodes_accessed ON geocodes (accessed);
+"""
+
+
+def default_cache_dir() -> Path:
+    load_env()
+    override = os.getenv("MP_GEO_EXPORT_CACHE_DIR")
+    if override:
+        return Path(override)
+    if sys.platform == "win32":
+        base = os.getenv("LOCALAPPDATA") or str(Path.home() / "AppData" / "Local")
+    elif sys.platform == "darwin":
+        base = str(Path.home() / "Library" / "Caches")
+    else:
+        base = os.getenv("XDG_CACHE_HOME") or str(Path.home() / ".cache")
+    return Path(base) / "mp-geo-export"
+
+
+def georeference_fingerprint(geocoordinates: dict[str, Any] | None) -> str:
+    """Stable hash of a model's georeference; any change invalidates its cached points."""
+    canonical = json.dumps(geocoordinates or {}, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode()).hexdigest()[:16]
+
+
+@dataclass(frozen=True)
+class CacheStats:
+    path: Path
+    entries: int
+    models: int
+    size_bytes: int
+    oldest: float | None
+    newest: float | None
+
+
+class GeocodeCache:
+    """SQLite store of resolved points keyed by (model, georeference, rounded x/y/z).
+
+    Coordinates are rounded to ``precision`` decimals (0.1 mm by default) and
+    stored as integers so lookups are exact. Entries older than ``max_age``
+    seconds are ignored and pruned; beyond ``max_entries`` the least recently
+    used rows are evicted.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Path | None = None,
+        precision: int = 4,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        max_age: float | None = DEFAULT_MAX_AGE,
+    ) -> None:
+        self.dir = Path(cache_dir) if cache_dir else default_cache_dir()
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self.path = self.dir / CACHE_FILENAME
+        self.precision = precision
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.executescript(_SCHEMA)
+
+    def __enter__(self) -> "GeocodeCache":
+        return self
+
+    def __exit__(self, *exc_info) -> None:  # type: ignore[no-untyped-def]
+        self.close()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def _key(self, point: dict[str, float]) -> tuple[int, int, int]:
+        scale = 10 ** self.precision
+        return (
+            round(float(point["x"]) * scale),
+            round(float(point["y"]) * scale),
+            round(float(point["z"]) * scale),
+        )
+
+    def get_many(self, model_id: str, fingerprint: str, points: list[dict[str, float]]) -> list[dict[str, Any] | None]:
+        """Look up each point; misses (and expired entries) come back as None."""
+        now = time.time()
+        cutoff = now - self.max_age if self.max_age else float("-inf")
+        out: list[dict[str, Any] | None] = []
+        hits: list[tuple[float, str, str, int, int, int]] = []
+        with self._lock:
+            cur = self._conn.cursor()
+            for pt in points:
+                x, y, z = self._key(pt)
+                row = cur.execute(
+                    "SELECT lat, long, alt, created FROM geocodes "
+                    "WHERE model_id = ? AND fingerprint = ? AND x = ? AND y = ? AND z = ?",
+                    (model_id, fingerprint, x, y, z),
+                ).fetchone()
+                if row is None or row[3] < cutoff:
+                    out.append(None)
+                    continue
+                geo: dict[str, Any] = {"lat": row[0], "long": row[1]}
+                if row[2] is not None:
+                    geo["alt"] = row[2]
+                out.append(geo)
+                hits.append((now, model_id, fingerprint, x, y, z))
+            if hits:
+                cur.executemany(
+                    "UPDATE geocodes SET accessed = ? "
+                    "WHERE model_id = ? AND fingerprint = ? AND x = ? AND y = ? AND z = ?",
+                    hits,
+                )
+                self._conn.commit()
+        return out
+
+    def put_many(
+        self,
+        model_id: str,
+        fingerprint: str,
+        points: list[dict[str, float]],
+        geos: list[dict[str, Any]],
+    ) -> None:
+        now = time.time()
+        rows = [
+            (model_id, fingerprint, *self._key(pt), geo["lat"], geo["long"], geo.get("alt"), now, now)
+            for pt, geo in zip(points, geos)
+        ]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO geocodes "
+                "(model_id, fingerprint, x, y, z, lat, long, alt, created, accessed) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            self._trim(self.max_entries)
+            self._conn.commit()
+
+    def _trim(self, limit: int) -> int:
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM geocodes").fetchone()
+        if count <= limit:
+            return 0
+        return self._conn.execute(
+            "DELETE FROM geocodes WHERE rowid IN (SELECT rowid FROM geocodes ORDER BY accessed LIMIT ?)",
+            (count - limit,),
+        ).rowcount
+
+    def prune(self, max_age: float | None = None, max_entries: int | None = None) -> int:
+        """Drop expired rows and trim to ``max_entries`` by least recent use.
+
+        Limits default to the cache's own settings. Returns the number of rows removed.
+        """
+        age = self.max_age if max_age is None else max_age
+        limit = self.max_entries if max_entries is None else max_entries
+        removed = 0
+        with self._lock:
+            if age:
+                removed += self._conn.execute("DELETE FROM geocodes WHERE created < ?", (time.time() - age,)).rowcount
+            removed += self._trim(limit)
+            self._conn.commit()
+        return removed
+
+    def clear(self, model_id: str | None = None) -> int:
+        with self._lock:
+            if model_id is None:
+                removed = self._conn.execute("DELETE FROM geocodes").rowcount
+            else:
+                removed = self._conn.execute("DELETE FROM geocodes WHERE model_id = ?", (model_id,)).rowcount
+            self._conn.commit()
+            if model_id is None:
+                self._conn.execute("VACUUM")
+        return removed
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            entries, models, oldest, newest = self._conn.execute(
+                "SELECT COUNT(*), COUNT(DISTINCT model_id), MIN(created), MAX(created) FROM geocodes"
+            ).fetchone()
+        return CacheStats(
+            path=self.path,
+            entries=entries,
+            models=models,
+            size_bytes=self.path.stat().st_size if self.path.exists() else 0,
+            oldest=oldest,
+            newest=newest,
+        )
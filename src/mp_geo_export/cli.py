@@ -3,23 +3,50 @@ from __future__ import annotations
 import json
 import os
 import sys
+from contextlib import ExitStack, nullcontext
+from datetime import datetime
 from pathlib import Path
-from typing import List
+from typing import TYPE_CHECKING, Any, Callable, Iterable, Iterator, List
 
 import typer
-from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn, TaskProgressColumn, TimeElapsedColumn, TimeRemainingColumn
-from rich.status import Status
 
-from .api import ApiClient
-from .auth import get_auth_header
-from .config import api_url
-from .models import GeoPoint, LatLng, NoteExport, PanoExport, TagExport, ModelExport, ModelGeoCoordinates, Quaternion
-from .utils import Timer, console, write_json, write_geojson, to_geojson_feature
+from .config import load_env
+from .dedup import DEFAULT_TOLERANCE
+from .fields import parse_fields
+from .queries import DEFAULT_RESOLUTION
+from .results import check_on_error
+from .utils import OUTPUT_FORMATS, Timer, console
+
+# Everything that pulls in requests, rich's progress display, pydantic,
+# keyring or NumPy is imported inside the command that needs it, so
+# ``--help`` and small exports start fast (see tests/test_startup.py).
+if TYPE_CHECKING:
+    from rich.console import Console
+    from rich.progress import Progress
+
+    from .aio import BlockingAsyncClient
+    from .api import ApiClient
+    from .cache import GeocodeCache
+    from .geocode import GeocodeOutcome
+    from .instrument import MetricsRecorder, TraceWriter
+    from .journal import CheckpointJournal
+    from .pipeline import Batch, PipelineResult
+    from .results import PointResult
+
+ENGINES = ("threads", "async")
 
 
 app = typer.Typer(add_completion=False, help="Export Matterport panos, tags, notes with geocoordinates.")
 export_app = typer.Typer(help="Export data as JSON/GeoJSON")
 app.add_typer(export_app, name="export")
+cache_app = typer.Typer(help="Inspect and manage the on-disk geocode cache")
+app.add_typer(cache_app, name="cache")
+
+
+@app.callback()
+def _startup() -> None:
+    # .env is read here rather than at import, once per run
+    load_env()
 
 
 def _default_pretty() -> bool:
@@ -29,18 +56,667 @@ def _default_pretty() -> bool:
         return False
 
 
+def _build_client(
+    engine: str,
+    auth: str,
+    url: str | None,
+    timeout: float,
+    max_rps: float,
+    retries: int,
+    burst: float,
+    concurrency: int,
+    adaptive: bool,
+    max_concurrency: int,
+    max_rps_ceiling: float,
+    extra_connections: int = 0,
+) -> ApiClient | BlockingAsyncClient:
+    from .api import ApiClient
+    from .auth import refresh_auth_header
+    from .config import api_url
+
+    engine = engine.lower()
+    if engine not in ENGINES:
+        raise typer.BadParameter(f"Unsupported engine: {engine}. Use {' or '.join(ENGINES)}.")
+    if engine == "async":
+        if adaptive:
+            raise typer.BadParameter("--adaptive is only supported with --engine threads")
+        try:
+            from .aio import AsyncApiClient, BlockingAsyncClient
+        except ImportError as exc:
+            raise typer.BadParameter("--engine async needs aiohttp: pip install 'mp-geo-export[async]'") from exc
+        return BlockingAsyncClient(
+            AsyncApiClient(
+                api_url(url), auth_header=auth, timeout=timeout, max_rps=max_rps, retries=retries,
+                burst=burst, pool_size=concurrency + extra_connections, on_unauthorized=refresh_auth_header,
+            )
+        )
+    pool_size = (max(concurrency, max_concurrency) if adaptive else concurrency) + extra_connections
+    client = ApiClient(
+        api_url(url), auth_header=auth, timeout=timeout, max_rps=max_rps, retries=retries,
+        burst=burst, pool_size=pool_size, on_unauthorized=refresh_auth_header,
+    )
+    if adaptive:
+        client.enable_adaptive(concurrency=concurrency, max_rps=max_rps_ceiling, max_concurrency=max_concurrency)
+    return client
+
+
+def _progress(c: Console) -> Progress:
+    from rich.progress import (
+        BarColumn, Progress, SpinnerColumn, TaskProgressColumn, TextColumn, TimeElapsedColumn, TimeRemainingColumn,
+    )
+
+    return Progress(
+        SpinnerColumn(),
+        TextColumn("[progress.description]{task.description}"),
+        BarColumn(),
+        TaskProgressColumn(),
+        TextColumn("•"),
+        TimeElapsedColumn(),
+        TextColumn("•"),
+        TimeRemainingColumn(),
+        console=c
+    )
+
+
+def _pipelined_geocode(
+    client: ApiClient | BlockingAsyncClient,
+    model_id: str,
+    listing: Callable[[Callable[[str], None] | None], Iterable[Batch]],
+    status_label: str,
+    label: str,
+    mode: str,
+    concurrency: int,
+    verify_sample: int,
+    verify_tolerance: float,
+    points_per_request: int,
+    cache: GeocodeCache | None,
+    quiet: bool,
+    c: Console,
+    on_objects: Callable[[str, list[dict[str, Any]]], None],
+    on_result: Callable[[int, dict[str, Any] | None], None],
+    journal: CheckpointJournal | None = None,
+    dedup_tolerance: float = DEFAULT_TOLERANCE,
+    geocoordinates: Callable[[], dict[str, Any] | None] = lambda: None,
+    known: dict[int, dict[str, Any]] | None = None,
+) -> PipelineResult:
+    """List, geocode and write through ``run_pipeline`` with one progress display (unless quiet).
+
+    ``listing(on_progress)`` yields batches of raw objects; each is geocoded
+    as soon as it is listed, so the geocode bar's total grows with the
+    listing. ``geocoordinates()`` returns the georeference if the listing
+    already brought it along. ``known`` holds geos by export index that the
+    listing carried over from a previous export; it is filled as batches
+    are listed and consumed as they are geocoded.
+    """
+    from .geocode import GEOCODE_MODES, fetch_georeference, geocode_points
+    from .pipeline import run_pipeline
+
+    if mode.lower() not in GEOCODE_MODES:
+        raise typer.BadParameter(f"Unsupported geocode mode: {mode}. Use {', '.join(GEOCODE_MODES)}.")
+    progress = None if quiet else _progress(c)
+    georef: dict[str, Any] | None = None
+
+    def source() -> Iterator[Batch]:
+        if progress is None:
+            yield from listing(None)
+            return
+        task = progress.add_task(status_label, total=None)
+
+        def update_status(msg: str) -> None:
+            progress.update(task, description=f"{status_label} {msg}")
+
+        yield from listing(update_status)
+        progress.update(task, description=status_label, total=1, completed=1)
+
+    geocode_task = None if progress is None else progress.add_task(f"Geocoding {label}", total=None)
+
+    def geocode(points: list[dict[str, float]], offset: int, emit: Callable[..., None]) -> GeocodeOutcome:
+        nonlocal georef
+        if georef is None:
+            georef = geocoordinates()
+        if georef is None and (mode.lower() != "remote" or cache is not None):
+            # Fetch the georeference once for the whole export, not once per batch
+            georef = fetch_georeference(client, model_id)
+        # The verify sample is drawn from the first batch; later ones only need the transform
+        batch_mode = "local" if mode.lower() == "verify" and offset > 0 else mode
+        inc = None
+        if progress is not None and geocode_task is not None:
+            progress.update(geocode_task, total=offset + len(points))
+
+            def inc(completed: int, rate: float) -> None:
+                progress.update(geocode_task, completed=offset + completed, description=f"Geocoding {label} ({rate:.1f}/s)")
+        return geocode_points(
+            client, model_id, points, mode=batch_mode, concurrency=concurrency,
+            verify_sample=verify_sample, points_per_request=points_per_request, cache=cache, on_progress=inc,
+            on_result=emit, journal=journal.slice(offset) if journal is not None else None,
+            dedup_tolerance=dedup_tolerance, geocoordinates=georef,
+            known=None if known is None else {
+                i: known.pop(offset + i) for i in range(len(points)) if offset + i in known
+            },
+        )
+
+    with progress if progress is not None else nullcontext():
+        result = run_pipeline(source(), geocode, on_objects, on_result)
+    _report_outcome(result.outcome, result.points, cache, quiet, c, verify_tolerance)
+    if not quiet:
+        c.print(f"[dim]{result.times.summary()}[/dim]", highlight=False)
+    return result
+
+
+def _report_outcome(
+    outcome: GeocodeOutcome, total: int, cache: GeocodeCache | None, quiet: bool, c: Console, verify_tolerance: float
+) -> None:
+    """Print resume/cache/dedup stats (unless quiet) and fail when verify exceeds the tolerance."""
+    if outcome.resumed and not quiet:
+        c.print(f"[dim]Resumed: {outcome.resumed}/{total} points taken from the checkpoint journal[/dim]")
+    if outcome.reused and not quiet:
+        c.print(f"[dim]Delta: {outcome.reused}/{total} unmoved points reused from the previous export[/dim]")
+    if cache is not None and not quiet:
+        c.print(f"[dim]Cache: {outcome.cache_hits}/{total} points served from cache[/dim]")
+    if outcome.dedup is not None and not quiet:
+        d = outcome.dedup
+        c.print(
+            f"[dim]Dedup: {d.unique}/{d.points} unique points ({d.duplicate_ratio:.0%} duplicates), "
+            f"{d.coalesced} shared with concurrent exports, {d.requests_saved} requests saved[/dim]"
+        )
+    report = outcome.verify
+    if report is not None:
+        typer.echo(
+            f"Verified {report.sampled} points against geoLocationOf: "
+            f"max error {report.max_error_m:.3f} m, mean {report.mean_error_m:.3f} m",
+            err=True,
+        )
+        if report.max_error_m > verify_tolerance:
+            typer.echo(f"Local transform error exceeds tolerance of {verify_tolerance} m", err=True)
+            raise typer.Exit(code=1)
+
+
+def _report_failures(failures: list[PointResult], ids: list[Any], total: int, limit: int = 20) -> None:
+    typer.echo(f"{len(failures)} of {total} points failed to geocode:", err=True)
+    for r in failures[:limit]:
+        typer.echo(f"  {ids[r.index] or r.index}: {r.error} ({r.attempts} attempts)", err=True)
+    if len(failures) > limit:
+        typer.echo(f"  ... and {len(failures) - limit} more", err=True)
+
+
+def _open_cache(use_cache: bool, cache_dir: Path | None) -> GeocodeCache | None:
+    if not use_cache:
+        return None
+    from .cache import GeocodeCache
+
+    return GeocodeCache(cache_dir)
+
+
+def _open_journal(
+    out: Path | None, model_id: str, kind: str, geocode_mode: str, resume: bool
+) -> CheckpointJournal | None:
+    """Checkpoint journal beside a file ``--out`` for remote geocodes; local ones are cheap to redo."""
+    if out is None or str(out) == "-" or geocode_mode.lower() != "remote":
+        return None
+    from .journal import CheckpointJournal, JournalMismatchError, journal_path
+
+    try:
+        return CheckpointJournal(journal_path(out), model_id, kind, resume=resume)
+    except JournalMismatchError as exc:
+        raise typer.BadParameter(str(exc)) from exc
+
+
+def _print_limiter_stats(client: ApiClient | BlockingAsyncClient, c: Console) -> None:
+    stats = client.limiter.stats()
+    c.print(
+        f"[dim]Rate limiter: {stats.acquired} requests, {stats.waited} waited "
+        f"({stats.wait_ratio:.0%}), {stats.time_blocked:.2f}s blocked[/dim]"
+    )
+    if client.controller:
+        state = client.controller.state()
+        c.print(
+            f"[dim]Adaptive: settled at {state.rps:.1f} req/s, concurrency {state.concurrency} "
+            f"({state.increases} increases, {state.decreases} backoffs)[/dim]"
+        )
+
+
+def _attach_instruments(client: ApiClient | BlockingAsyncClient, trace_file: Path | None) -> tuple[MetricsRecorder, TraceWriter | None]:
+    """Observe every request: always into a metrics recorder, plus a JSON-lines trace if asked."""
+    from .instrument import MetricsRecorder, TraceWriter
+
+    metrics = MetricsRecorder()
+    client.add_observer(metrics)
+    trace = TraceWriter(trace_file) if trace_file is not None else None
+    if trace is not None:
+        client.add_observer(trace)
+    return metrics, trace
+
+
+def _finish_instruments(metrics: MetricsRecorder, trace: TraceWriter | None, metrics_file: Path | None) -> None:
+    if trace is not None:
+        trace.close()
+    if metrics_file is not None:
+        metrics.write_prometheus(metrics_file)
+
+
+def _print_request_metrics(metrics: MetricsRecorder, t: Timer, c: Console) -> None:
+    lines = metrics.summary()
+    if lines:
+        c.print(f"[dim]Finished in {t.format_elapsed()}[/dim]")
+    for line in lines:
+        c.print(f"[dim]{line}[/dim]", highlight=False)
+
+
+# Progress labels per kind: (fetch status, geocode description, summary noun)
+_KIND_LABELS = {
+    "sweeps": ("Fetching locations & sweeps...", "sweep locations", "sweeps"),
+    "tags": ("Fetching tags...", "tags", "tags"),
+    "notes": ("Fetching notes...", "notes", "notes"),
+}
+
+
+def _run_export(
+    kind: str,
+    model_id: str,
+    out: Path | None,
+    format: str,
+    pretty: bool | None,
+    concurrency: int,
+    engine: str,
+    geocode_mode: str,
+    verify_sample: int,
+    verify_tolerance: float,
+    max_rps: float,
+    adaptive: bool,
+    max_concurrency: int,
+    max_rps_ceiling: float,
+    use_cache: bool,
+    cache_dir: Path | None,
+    burst: float,
+    points_per_request: int,
+    retries: int,
+    timeout: float,
+    api_key: str | None,
+    api_secret: str | None,
+    url: str | None,
+    save_to_keyring: bool,
+    include_skybox: bool = False,
+    ordered: bool = True,
+    resume: bool = False,
+    dedup_tolerance: float = DEFAULT_TOLERANCE,
+    on_error: str = "fail",
+    trace_file: Path | None = None,
+    metrics_file: Path | None = None,
+    resolution: str = DEFAULT_RESOLUTION,
+    fields: str | None = None,
+    since: Path | None = None,
+    changes: bool = False,
+) -> None:
+    if not model_id:
+        raise typer.BadParameter("--model-id is required")
+    try:
+        on_error = check_on_error(on_error)
+        selected = parse_fields(fields, include_skybox)
+    except ValueError as exc:
+        raise typer.BadParameter(str(exc)) from exc
+    if resume and (out is None or str(out) == "-"):
+        raise typer.BadParameter("--resume needs --out PATH (the journal is kept next to the output file)")
+    if changes and since is None:
+        raise typer.BadParameter("--changes needs --since PATH (the export to compare against)")
+    from .delta import DeltaCounts, PreviousExport, record_georeference, tag_change
+
+    previous = None
+    if since is not None:
+        try:
+            previous = PreviousExport.load(since, kind)
+        except (OSError, ValueError) as exc:
+            raise typer.BadParameter(f"--since: {exc}") from exc
+    if format.lower() not in OUTPUT_FORMATS:
+        raise typer.BadParameter(f"Unsupported format: {format}. Use one of {', '.join(OUTPUT_FORMATS)}.")
+    if pretty is None:
+        pretty = _default_pretty()
+    from .auth import get_auth_header
+    from .exports import iter_objects
+    from .geocode import fetch_georeference
+    from .pipeline import batched
+    from .table import ExportTable
+    from .writers import open_writer
+
+    status_label, geocode_label, noun = _KIND_LABELS[kind]
+    auth = get_auth_header(api_key=api_key, api_secret=api_secret, save_to_keyring=save_to_keyring)
+    client = _build_client(
+        engine, auth, url, timeout, max_rps, retries, burst, concurrency, adaptive, max_concurrency, max_rps_ceiling
+    )
+    c = console()
+    cache = _open_cache(use_cache, cache_dir)
+    metrics, trace = _attach_instruments(client, trace_file)
+    # Show progress when running interactively, unless explicitly outputting to stdout
+    quiet = str(out) == "-" or (out is None and not sys.stdout.isatty())
+    try:
+        with Timer() as t:
+            # Only ids are kept from the raw objects, for failure reports
+            ids: list[Any] = []
+            table = ExportTable(selected)
+            writer = open_writer(format, out, pretty, ordered=ordered)
+            known: dict[int, dict[str, Any]] | None = None if previous is None else {}
+            counts = DeltaCounts()
+            # Stream to files and pipes as results land; on an interactive terminal the
+            # progress bar owns stdout, so hold everything until geocoding finishes
+            stream = quiet or writer.out_path is not None
+            held: list[tuple[int, dict[str, Any] | None]] = []
+            # Reuse and the output's .georef record both need the georeference the geocodes come from
+            georef = None
+            if previous is not None or (writer.out_path is not None and not changes):
+                georef = fetch_georeference(client, model_id)
+
+            def listing(on_progress: Callable[[str], None] | None) -> Iterator[Batch]:
+                listed = 0
+                objects = iter_objects(client, kind, model_id, on_progress, selected, resolution)
+                for batch in batched(kind, objects):
+                    if previous is not None and known is not None:
+                        known.update((listed + i, geo) for i, geo in previous.known(batch[0][1], georef).items())
+                    listed += len(batch[0][1])
+                    if on_progress:
+                        on_progress(f"{listed} listed")
+                    yield batch
+
+            def add(kind: str, batch: list[dict[str, Any]]) -> None:
+                ids.extend(o.get("id") for o in batch)
+                table.add_objects(kind, batch, include_skybox="skybox" in selected)
+
+            def emit(index: int, geo: dict[str, Any] | None) -> None:
+                if not stream:
+                    held.append((index, geo))
+                    return
+                if geo is None and on_error != "null":
+                    writer.put(index, [])
+                    return
+                table.set_geo(index, geo)
+                if previous is None:
+                    writer.put_rows(index, table, table.rows(index))
+                    return
+                records = []
+                for row in table.rows(index):
+                    change = previous.change(table, row)
+                    counts.count(change)
+                    if not changes:
+                        records.append(writer.render_row(table, row))
+                    elif change is not None:
+                        records.append(tag_change(writer.render_row(table, row), change, writer.features))
+                writer.put_records(index, records)
+
+            journal = _open_journal(out, model_id, kind, geocode_mode, resume)
+            try:
+                with writer:
+                    result = _pipelined_geocode(
+                        client, model_id, listing, status_label, geocode_label, geocode_mode, concurrency,
+                        verify_sample, verify_tolerance, points_per_request, cache, quiet, c, add, emit,
+                        journal=journal, dedup_tolerance=dedup_tolerance, geocoordinates=lambda: georef, known=known,
+                    )
+                    failures = result.outcome.failures
+                    if failures:
+                        _report_failures(failures, ids, result.points)
+                        if on_error == "fail":
+                            raise typer.Exit(code=1)
+                    stream = True
+                    for index, geo in held:
+                        emit(index, geo)
+                    if previous is not None:
+                        removed = previous.removed(set(table.ids))
+                        counts.removed = len(removed)
+                        if changes:
+                            # After every listed object, so ordered writers put them last
+                            writer.put_records(table.objects, [previous.removed_record(i, writer.features) for i in removed])
+            except BaseException:
+                if journal is not None:
+                    journal.close()
+                    typer.echo(
+                        f"{len(journal)}/{len(ids)} points saved to {journal.path}; rerun with --resume to continue",
+                        err=True,
+                    )
+                raise
+            if journal is not None:
+                journal.discard()
+            if writer.out_path is not None and not changes:
+                record_georeference(writer.out_path, georef)
+            if not quiet:
+                c.print(f"[green]Exported {writer.count} {noun}.[/green]")
+                if previous is not None:
+                    c.print(f"[dim]Changes since {since}: {counts.summary()}[/dim]")
+                _print_limiter_stats(client, c)
+        if not quiet:
+            _print_request_metrics(metrics, t, c)
+    finally:
+        client.close()
+        if cache is not None:
+            cache.close()
+        _finish_instruments(metrics, trace, metrics_file)
+
+
+def _run_export_all(
+    kinds: list[str],
+    model_id: str,
+    out: Path | None,
+    out_dir: Path | None,
+    format: str,
+    pretty: bool | None,
+    concurrency: int,
+    engine: str,
+    geocode_mode: str,
+    verify_sample: int,
+    verify_tolerance: float,
+    max_rps: float,
+    adaptive: bool,
+    max_concurrency: int,
+    max_rps_ceiling: float,
+    use_cache: bool,
+    cache_dir: Path | None,
+    burst: float,
+    points_per_request: int,
+    retries: int,
+    timeout: float,
+    api_key: str | None,
+    api_secret: str | None,
+    url: str | None,
+    save_to_keyring: bool,
+    include_skybox: bool = False,
+    ordered: bool = True,
+    resume: bool = False,
+    dedup_tolerance: float = DEFAULT_TOLERANCE,
+    on_error: str = "fail",
+    trace_file: Path | None = None,
+    metrics_file: Path | None = None,
+    resolution: str = DEFAULT_RESOLUTION,
+    fields: str | None = None,
+) -> None:
+    """Fetch every kind plus the georeference in one request and geocode all points in one pass.
+
+    With ``out_dir`` each kind streams to ``<model>_<kind>.<format>`` and the
+    georeference goes to ``<model>_model.json``. Otherwise one layered
+    document is written: GeoJSON/GeoJSONSeq features of every kind (told
+    apart by ``properties.type``) after a model anchor feature, or for
+    ``json`` an object with ``model`` and one array per kind.
+    """
+    if not model_id:
+        raise typer.BadParameter("--model-id is required")
+    fmt = format.lower()
+    try:
+        on_error = check_on_error(on_error)
+        selected = parse_fields(fields, include_skybox)
+    except ValueError as exc:
+        raise typer.BadParameter(str(exc)) from exc
+    if fmt not in OUTPUT_FORMATS:
+        raise typer.BadParameter(f"Unsupported format: {format}. Use one of {', '.join(OUTPUT_FORMATS)}.")
+    if out_dir is not None and out is not None:
+        raise typer.BadParameter("Use either --out (one layered document) or --out-dir (one file per kind)")
+    if out_dir is None and fmt == "ndjson":
+        raise typer.BadParameter("ndjson records do not name their kind; use --out-dir, or geojson, geojsonseq or json")
+    if resume and out_dir is None and (out is None or str(out) == "-"):
+        raise typer.BadParameter("--resume needs --out PATH or --out-dir (the journal is kept next to the output)")
+    if pretty is None:
+        pretty = _default_pretty()
+    from .auth import get_auth_header
+    from .bulk import output_path
+    from .delta import record_georeference
+    from .exports import build_model_export, fetch_combined, model_feature
+    from .table import ExportTable
+    from .utils import write_json
+    from .writers import open_writer
+
+    auth = get_auth_header(api_key=api_key, api_secret=api_secret, save_to_keyring=save_to_keyring)
+    client = _build_client(
+        engine, auth, url, timeout, max_rps, retries, burst, concurrency, adaptive, max_concurrency, max_rps_ceiling
+    )
+    c = console()
+    cache = _open_cache(use_cache, cache_dir)
+    metrics, trace = _attach_instruments(client, trace_file)
+    quiet = out_dir is None and (str(out) == "-" or (out is None and not sys.stdout.isatty()))
+    try:
+        with Timer() as t:
+            status_label = f"Fetching {', '.join(kinds)} & georeference..."
+            model: dict[str, Any] = {}
+            # Per point: its kind and its index among that kind's points
+            owner: list[tuple[str, int]] = []
+            counts = {kind: 0 for kind in kinds}
+            ids: list[Any] = []
+            kept: list[bool] = []
+            table = ExportTable(selected)
+
+            writers: dict[str, Any] = {}
+            layered_json = out_dir is None and fmt == "json"
+            if out_dir is not None:
+                out_dir.mkdir(parents=True, exist_ok=True)
+                writers = {k: open_writer(fmt, output_path(out_dir, model_id, k, fmt), pretty, ordered) for k in kinds}
+                journal_target: Path | None = output_path(out_dir, model_id, "all", fmt)
+            else:
+                if not layered_json:
+                    writers = {"all": open_writer(fmt, out, pretty, ordered=ordered)}
+                journal_target = out
+
+            def listing(on_progress: Callable[[str], None] | None) -> Iterator[Batch]:
+                fetched, objects = fetch_combined(client, model_id, kinds, on_progress, selected, resolution)
+                model.update(fetched)
+                yield [(kind, objects[kind]) for kind in kinds]
 
+            anchored = False
+
+            def add(kind: str, batch: list[dict[str, Any]]) -> None:
+                nonlocal anchored
+                if not anchored and "all" in writers:
+                    anchored = True
+                    feature = model_feature(build_model_export(model, model_id))
+                    writers["all"].put_records(0, [feature] if feature is not None else [])
+                owner.extend((kind, counts[kind] + j) for j in range(len(batch)))
+                counts[kind] += len(batch)
+                ids.extend(o.get("id") for o in batch)
+                kept.extend([False] * len(batch))
+                table.add_objects(kind, batch, include_skybox="skybox" in selected)
+
+            def route(index: int) -> tuple[Any, int]:
+                if out_dir is not None:
+                    kind, position = owner[index]
+                    return writers[kind], position
+                # index 0 of the single document is the model anchor feature
+                return writers["all"], index + 1
+
+            stream = quiet or out_dir is not None or (out is not None and str(out) != "-")
+            held: list[tuple[int, dict[str, Any] | None]] = []
+
+            def emit(index: int, geo: dict[str, Any] | None) -> None:
+                if not stream:
+                    held.append((index, geo))
+                    return
+                keep = geo is not None or on_error == "null"
+                if keep:
+                    table.set_geo(index, geo)
+                kept[index] = keep
+                if layered_json:
+                    return
+                writer, position = route(index)
+                if keep:
+                    writer.put_rows(position, table, table.rows(index))
+                else:
+                    writer.put(position, [])
+
+            journal = _open_journal(journal_target, model_id, "all:" + ",".join(kinds), geocode_mode, resume)
+            try:
+                with ExitStack() as stack:
+                    for writer in writers.values():
+                        stack.enter_context(writer)
+                    result = _pipelined_geocode(
+                        client, model_id, listing, status_label, "objects", geocode_mode, concurrency,
+                        verify_sample, verify_tolerance, points_per_request, cache, quiet, c, add, emit,
+                        journal=journal, dedup_tolerance=dedup_tolerance,
+                        geocoordinates=lambda: model.get("geocoordinates") or {},
+                    )
+                    failures = result.outcome.failures
+                    if failures:
+                        _report_failures(failures, ids, result.points)
+                        if on_error == "fail":
+                            raise typer.Exit(code=1)
+                    stream = True
+                    for index, geo in held:
+                        emit(index, geo)
+                    model_export = build_model_export(model, model_id)
+                    if layered_json:
+                        document: dict[str, Any] = {"model": model_export.model_dump()}
+                        for kind in kinds:
+                            document[kind] = [
+                                table.record(row)
+                                for i, (owned, _) in enumerate(owner) if owned == kind and kept[i]
+                                for row in table.rows(i)
+                            ]
+                        write_json(document, out, pretty)
+            except BaseException:
+                if journal is not None:
+                    journal.close()
+                    typer.echo(
+                        f"{len(journal)}/{len(ids)} points saved to {journal.path}; rerun with --resume to continue",
+                        err=True,
+                    )
+                raise
+            if journal is not None:
+                journal.discard()
+            georef = model.get("geocoordinates") or {}
+            if out_dir is not None:
+                write_json(model_export.model_dump(), out_dir / f"{model_id}_model.json", pretty)
+                for kind in kinds:
+                    record_georeference(output_path(out_dir, model_id, kind, fmt), georef)
+            elif out is not None and str(out) != "-":
+                record_georeference(out, georef)
+            if not quiet:
+                counts = {k: 0 for k in kinds}
+                for i, (kind, _) in enumerate(owner):
+                    if kept[i]:
+                        counts[kind] += len(table.rows(i))
+                c.print(f"[green]Exported {', '.join(f'{n} {k}' for k, n in counts.items())} and the georeference.[/green]")
+                _print_limiter_stats(client, c)
+        if not quiet:
+            _print_request_metrics(metrics, t, c)
+    finally:
+        client.close()
+        if cache is not None:
+            cache.close()
+        _finish_instruments(metrics, trace, metrics_file)
 
 
 @export_app.command("sweeps")
 def export_sweeps_cmd(
     model_id: str = typer.Option(..., "--model-id", "-m", help="Matterport model ID"),
     out: Path | None = typer.Option(None, "--out", "-o", help="Output path or '-' for stdout"),
-    format: str = typer.Option("json", "--format", "-f", case_sensitive=False, help="json or geojson"),
-
+    format: str = typer.Option("json", "--format", "-f", case_sensitive=False, help="json, geojson, ndjson or geojsonseq"),
     include_skybox: bool = typer.Option(False, "--include-skybox/--no-include-skybox"),
+    resolution: str = typer.Option(DEFAULT_RESOLUTION, "--resolution", help="Skybox image resolution with --include-skybox (e.g. 512, 1k, 2k, 4k)"),
+    fields: str | None = typer.Option(None, "--fields", help="Comma list of output fields to keep: label, text, local, skybox (id and geo are always written)"),
     concurrency: int = typer.Option(8, "--concurrency"),
+    engine: str = typer.Option("threads", "--engine", case_sensitive=False, help="threads (requests + thread pool) or async (aiohttp)"),
+    geocode_mode: str = typer.Option("remote", "--geocode-mode", case_sensitive=False, help="remote (geoLocationOf per point), local (client-side transform) or verify (local + spot-check)"),
+    verify_sample: int = typer.Option(10, "--verify-sample", help="Points to spot-check in verify mode"),
+    verify_tolerance: float = typer.Option(1.0, "--verify-tolerance", help="Max allowed verify error in meters"),
     max_rps: float = typer.Option(5.0, "--max-rps"),
+    adaptive: bool = typer.Option(False, "--adaptive/--no-adaptive", help="Tune rate and concurrency from server feedback (AIMD)"),
+    max_concurrency: int = typer.Option(32, "--max-concurrency", min=1, help="Concurrency ceiling for --adaptive"),
+    max_rps_ceiling: float = typer.Option(20.0, "--max-rps-ceiling", help="Requests-per-second ceiling for --adaptive"),
+    use_cache: bool = typer.Option(False, "--cache/--no-cache", help="Reuse geocodes from the on-disk cache"),
+    cache_dir: Path | None = typer.Option(None, "--cache-dir", help="Cache directory (default: user cache dir)"),
+    burst: float = typer.Option(1.0, "--burst", min=1.0, help="Requests allowed back-to-back before --max-rps applies"),
+    points_per_request: int = typer.Option(1, "--points-per-request", min=1, help="Points geocoded per GraphQL request"),
+    dedup_tolerance: float = typer.Option(DEFAULT_TOLERANCE, "--dedup-tolerance", min=0.0, help="Geocode points closer than this (meters) only once; 0 dedups exact matches only"),
     retries: int = typer.Option(3, "--retries"),
     timeout: float = typer.Option(30.0, "--timeout"),
     api_key: str | None = typer.Option(None, "--api-key"),
@@ -48,82 +724,47 @@ def export_sweeps_cmd(
     url: str | None = typer.Option(None, "--url"),
     save_to_keyring: bool = typer.Option(True, "--save-to-keyring/--no-save-to-keyring"),
     pretty: bool = typer.Option(None, "--pretty/--no-pretty", help="Pretty output; default true for TTY"),
+    ordered: bool = typer.Option(True, "--ordered/--unordered", help="Keep input order, or write features as soon as they are geocoded"),
+    resume: bool = typer.Option(False, "--resume", help="Continue an interrupted export from its checkpoint journal (<out>.journal)"),
+    since: Path | None = typer.Option(None, "--since", help="A previous export of this kind: reuse the geocodes of objects that did not move"),
+    changes: bool = typer.Option(False, "--changes", help="With --since, write only added, moved and removed rows, tagged with 'change'"),
+    on_error: str = typer.Option("fail", "--on-error", case_sensitive=False, help="Points that fail to geocode: fail (exit 1, keep the journal), skip (omit them) or null (write geo: null)"),
+    trace_file: Path | None = typer.Option(None, "--trace-file", help="Write every request event as JSON lines to this file"),
+    metrics_file: Path | None = typer.Option(None, "--metrics-file", help="Write request metrics in Prometheus text format to this file"),
 ) -> None:
-    if not model_id:
-        raise typer.BadParameter("--model-id is required")
-    if pretty is None:
-        pretty = _default_pretty()
-    auth = get_auth_header(api_key=api_key, api_secret=api_secret, save_to_keyring=save_to_keyring)
-    client = ApiClient(api_url(url), auth_header=auth, timeout=timeout, max_rps=max_rps, retries=retries)
-    c = console()
-    # Show progress when running interactively, unless explicitly outputting to stdout
-    quiet = str(out) == "-" or (out is None and not sys.stdout.isatty())
-    with Timer() as t:
-        # Fetch locations with progress indicator
-        if quiet:
-            locs = client.fetch_locations(model_id, "2k")
-        else:
-            with Status("Fetching locations & sweeps...", console=c) as status:
-                def update_status(msg: str) -> None:
-                    status.update(f"Fetching locations & sweeps... {msg}")
-                locs = client.fetch_locations(model_id, "2k", on_progress=update_status)
-        
-        points = [{"x": l["position"]["x"], "y": l["position"]["y"], "z": l["position"]["z"]} for l in locs]
-        
-        # Geocode with enhanced progress bar
-        if quiet:
-            geos = client.batch_geocode(model_id, points, concurrency=concurrency, max_rps=max_rps)
-        else:
-            progress = Progress(
-                SpinnerColumn(),
-                TextColumn("[progress.description]{task.description}"),
-                BarColumn(),
-                TaskProgressColumn(),
-                TextColumn("•"),
-                TimeElapsedColumn(),
-                TextColumn("•"),
-                TimeRemainingColumn(),
-                console=c
-            )
-            with progress:
-                task = progress.add_task("Geocoding sweep locations", total=len(points))
-                def inc(completed: int, rate: float) -> None:
-                    progress.update(task, completed=completed, description=f"Geocoding sweep locations ({rate:.1f}/s)")
-                geos = client.batch_geocode(model_id, points, concurrency=concurrency, max_rps=max_rps, on_progress=inc)
-        exports: list[PanoExport] = []
-        for i, loc in enumerate(locs):
-            geo = geos[i]
-            panos = loc.get("panos") or []
-            for idx, pano in enumerate(panos):
-                sky = pano.get("skybox", {}).get("children") if include_skybox else None
-                if include_skybox and (not sky or len(sky) != 6):
-                    continue
-                exports.append(
-                    PanoExport(
-                        id=f"{loc['id']}_pano{idx+1}",
-                        local=GeoPoint(**loc["position"]),
-                        geo=LatLng(**geo),
-                        skyboxImages=sky if include_skybox else None,
-                    )
-                )
-        if format.lower() == "json":
-            write_json([e.model_dump() for e in exports], out, pretty)
-        elif format.lower() == "geojson":
-            features = [to_geojson_feature(e) for e in exports]
-            write_geojson(features, out, pretty)
-        else:
-            raise typer.BadParameter(f"Unsupported format: {format}. Use 'json' or 'geojson'.")
-        if not quiet:
-            c.print(f"[green]Exported {len(exports)} sweeps.[/green]")
+    _run_export(
+        "sweeps",
+        include_skybox=include_skybox, resolution=resolution, fields=fields, since=since, changes=changes,
+        model_id=model_id, out=out, format=format, pretty=pretty, concurrency=concurrency, engine=engine,
+        geocode_mode=geocode_mode, verify_sample=verify_sample, verify_tolerance=verify_tolerance, max_rps=max_rps,
+        adaptive=adaptive, max_concurrency=max_concurrency, max_rps_ceiling=max_rps_ceiling, use_cache=use_cache,
+        cache_dir=cache_dir, burst=burst, points_per_request=points_per_request, retries=retries, timeout=timeout,
+        api_key=api_key, api_secret=api_secret, url=url, save_to_keyring=save_to_keyring, ordered=ordered,
+        resume=resume, dedup_tolerance=dedup_tolerance, on_error=on_error, trace_file=trace_file,
+        metrics_file=metrics_file,
+    )
 
 
 @export_app.command("tags")
 def export_tags_cmd(
     model_id: str = typer.Option(..., "--model-id", "-m", help="Matterport model ID"),
     out: Path | None = typer.Option(None, "--out", "-o", help="Output path or '-' for stdout"),
-    format: str = typer.Option("json", "--format", "-f", case_sensitive=False, help="json or geojson"),
+    format: str = typer.Option("json", "--format", "-f", case_sensitive=False, help="json, geojson, ndjson or geojsonseq"),
+    fields: str | None = typer.Option(None, "--fields", help="Comma list of output fields to keep: label, text, local, skybox (id and geo are always written)"),
     concurrency: int = typer.Option(8, "--concurrency"),
+    engine: str = typer.Option("threads", "--engine", case_sensitive=False, help="threads (requests + thread pool) or async (aiohttp)"),
+    geocode_mode: str = typer.Option("remote", "--geocode-mode", case_sensitive=False, help="remote (geoLocationOf per point), local (client-side transform) or verify (local + spot-check)"),
+    verify_sample: int = typer.Option(10, "--verify-sample", help="Points to spot-check in verify mode"),
+    verify_tolerance: float = typer.Option(1.0, "--verify-tolerance", help="Max allowed verify error in meters"),
     max_rps: float = typer.Option(5.0, "--max-rps"),
+    adaptive: bool = typer.Option(False, "--adaptive/--no-adaptive", help="Tune rate and concurrency from server feedback (AIMD)"),
+    max_concurrency: int = typer.Option(32, "--max-concurrency", min=1, help="Concurrency ceiling for --adaptive"),
+    max_rps_ceiling: float = typer.Option(20.0, "--max-rps-ceiling", help="Requests-per-second ceiling for --adaptive"),
+    use_cache: bool = typer.Option(False, "--cache/--no-cache", help="Reuse geocodes from the on-disk cache"),
+    cache_dir: Path | None = typer.Option(None, "--cache-dir", help="Cache directory (default: user cache dir)"),
+    burst: float = typer.Option(1.0, "--burst", min=1.0, help="Requests allowed back-to-back before --max-rps applies"),
+    points_per_request: int = typer.Option(1, "--points-per-request", min=1, help="Points geocoded per GraphQL request"),
+    dedup_tolerance: float = typer.Option(DEFAULT_TOLERANCE, "--dedup-tolerance", min=0.0, help="Geocode points closer than this (meters) only once; 0 dedups exact matches only"),
     retries: int = typer.Option(3, "--retries"),
     timeout: float = typer.Option(30.0, "--timeout"),
     api_key: str | None = typer.Option(None, "--api-key"),
@@ -131,75 +772,47 @@ def export_tags_cmd(
     url: str | None = typer.Option(None, "--url"),
     save_to_keyring: bool = typer.Option(True, "--save-to-keyring/--no-save-to-keyring"),
     pretty: bool = typer.Option(None, "--pretty/--no-pretty", help="Pretty output; default true for TTY"),
+    ordered: bool = typer.Option(True, "--ordered/--unordered", help="Keep input order, or write features as soon as they are geocoded"),
+    resume: bool = typer.Option(False, "--resume", help="Continue an interrupted export from its checkpoint journal (<out>.journal)"),
+    since: Path | None = typer.Option(None, "--since", help="A previous export of this kind: reuse the geocodes of objects that did not move"),
+    changes: bool = typer.Option(False, "--changes", help="With --since, write only added, moved and removed rows, tagged with 'change'"),
+    on_error: str = typer.Option("fail", "--on-error", case_sensitive=False, help="Points that fail to geocode: fail (exit 1, keep the journal), skip (omit them) or null (write geo: null)"),
+    trace_file: Path | None = typer.Option(None, "--trace-file", help="Write every request event as JSON lines to this file"),
+    metrics_file: Path | None = typer.Option(None, "--metrics-file", help="Write request metrics in Prometheus text format to this file"),
 ) -> None:
-    if not model_id:
-        raise typer.BadParameter("--model-id is required")
-    if pretty is None:
-        pretty = _default_pretty()
-    auth = get_auth_header(api_key=api_key, api_secret=api_secret, save_to_keyring=save_to_keyring)
-    client = ApiClient(api_url(url), auth_header=auth, timeout=timeout, max_rps=max_rps, retries=retries)
-    c = console()
-    # Show progress when running interactively, unless explicitly outputting to stdout
-    quiet = str(out) == "-" or (out is None and not sys.stdout.isatty())
-    with Timer() as t:
-        # Fetch tags with progress indicator
-        if quiet:
-            tags = client.fetch_tags(model_id)
-        else:
-            with Status("Fetching tags...", console=c) as status:
-                def update_status(msg: str) -> None:
-                    status.update(f"Fetching tags... {msg}")
-                tags = client.fetch_tags(model_id, on_progress=update_status)
-        
-        points = [t["anchorPosition"] for t in tags]
-        
-        # Geocode with enhanced progress bar
-        if quiet:
-            geos = client.batch_geocode(model_id, points, concurrency=concurrency, max_rps=max_rps)
-        else:
-            progress = Progress(
-                SpinnerColumn(),
-                TextColumn("[progress.description]{task.description}"),
-                BarColumn(),
-                TaskProgressColumn(),
-                TextColumn("•"),
-                TimeElapsedColumn(),
-                TextColumn("•"),
-                TimeRemainingColumn(),
-                console=c
-            )
-            with progress:
-                task = progress.add_task("Geocoding tags", total=len(points))
-                def inc(completed: int, rate: float) -> None:
-                    progress.update(task, completed=completed, description=f"Geocoding tags ({rate:.1f}/s)")
-                geos = client.batch_geocode(model_id, points, concurrency=concurrency, max_rps=max_rps, on_progress=inc)
-        exports = [
-            TagExport(
-                id=t["id"],
-                label=t.get("label"),
-                local=GeoPoint(**t["anchorPosition"]),
-                geo=LatLng(**geos[i]),
-            )
-            for i, t in enumerate(tags)
-        ]
-        if format.lower() == "json":
-            write_json([e.model_dump() for e in exports], out, pretty)
-        elif format.lower() == "geojson":
-            features = [to_geojson_feature(e) for e in exports]
-            write_geojson(features, out, pretty)
-        else:
-            raise typer.BadParameter(f"Unsupported format: {format}. Use 'json' or 'geojson'.")
-        if not quiet:
-            c.print(f"[green]Exported {len(exports)} tags.[/green]")
+    _run_export(
+        "tags",
+        fields=fields, since=since, changes=changes,
+        model_id=model_id, out=out, format=format, pretty=pretty, concurrency=concurrency, engine=engine,
+        geocode_mode=geocode_mode, verify_sample=verify_sample, verify_tolerance=verify_tolerance, max_rps=max_rps,
+        adaptive=adaptive, max_concurrency=max_concurrency, max_rps_ceiling=max_rps_ceiling, use_cache=use_cache,
+        cache_dir=cache_dir, burst=burst, points_per_request=points_per_request, retries=retries, timeout=timeout,
+        api_key=api_key, api_secret=api_secret, url=url, save_to_keyring=save_to_keyring, ordered=ordered,
+        resume=resume, dedup_tolerance=dedup_tolerance, on_error=on_error, trace_file=trace_file,
+        metrics_file=metrics_file,
+    )
 
 
 @export_app.command("notes")
 def export_notes_cmd(
     model_id: str = typer.Option(..., "--model-id", "-m", help="Matterport model ID"),
     out: Path | None = typer.Option(None, "--out", "-o", help="Output path or '-' for stdout"),
-    format: str = typer.Option("json", "--format", "-f", case_sensitive=False, help="json or geojson"),
+    format: str = typer.Option("json", "--format", "-f", case_sensitive=False, help="json, geojson, ndjson or geojsonseq"),
+    fields: str | None = typer.Option(None, "--fields", help="Comma list of output fields to keep: label, text, local, skybox (id and geo are always written)"),
     concurrency: int = typer.Option(8, "--concurrency"),
+    engine: str = typer.Option("threads", "--engine", case_sensitive=False, help="threads (requests + thread pool) or async (aiohttp)"),
+    geocode_mode: str = typer.Option("remote", "--geocode-mode", case_sensitive=False, help="remote (geoLocationOf per point), local (client-side transform) or verify (local + spot-check)"),
+    verify_sample: int = typer.Option(10, "--verify-sample", help="Points to spot-check in verify mode"),
+    verify_tolerance: float = typer.Option(1.0, "--verify-tolerance", help="Max allowed verify error in meters"),
     max_rps: float = typer.Option(5.0, "--max-rps"),
+    adaptive: bool = typer.Option(False, "--adaptive/--no-adaptive", help="Tune rate and concurrency from server feedback (AIMD)"),
+    max_concurrency: int = typer.Option(32, "--max-concurrency", min=1, help="Concurrency ceiling for --adaptive"),
+    max_rps_ceiling: float = typer.Option(20.0, "--max-rps-ceiling", help="Requests-per-second ceiling for --adaptive"),
+    use_cache: bool = typer.Option(False, "--cache/--no-cache", help="Reuse geocodes from the on-disk cache"),
+    cache_dir: Path | None = typer.Option(None, "--cache-dir", help="Cache directory (default: user cache dir)"),
+    burst: float = typer.Option(1.0, "--burst", min=1.0, help="Requests allowed back-to-back before --max-rps applies"),
+    points_per_request: int = typer.Option(1, "--points-per-request", min=1, help="Points geocoded per GraphQL request"),
+    dedup_tolerance: float = typer.Option(DEFAULT_TOLERANCE, "--dedup-tolerance", min=0.0, help="Geocode points closer than this (meters) only once; 0 dedups exact matches only"),
     retries: int = typer.Option(3, "--retries"),
     timeout: float = typer.Option(30.0, "--timeout"),
     api_key: str | None = typer.Option(None, "--api-key"),
@@ -207,66 +820,82 @@ def export_notes_cmd(
     url: str | None = typer.Option(None, "--url"),
     save_to_keyring: bool = typer.Option(True, "--save-to-keyring/--no-save-to-keyring"),
     pretty: bool = typer.Option(None, "--pretty/--no-pretty", help="Pretty output; default true for TTY"),
+    ordered: bool = typer.Option(True, "--ordered/--unordered", help="Keep input order, or write features as soon as they are geocoded"),
+    resume: bool = typer.Option(False, "--resume", help="Continue an interrupted export from its checkpoint journal (<out>.journal)"),
+    since: Path | None = typer.Option(None, "--since", help="A previous export of this kind: reuse the geocodes of objects that did not move"),
+    changes: bool = typer.Option(False, "--changes", help="With --since, write only added, moved and removed rows, tagged with 'change'"),
+    on_error: str = typer.Option("fail", "--on-error", case_sensitive=False, help="Points that fail to geocode: fail (exit 1, keep the journal), skip (omit them) or null (write geo: null)"),
+    trace_file: Path | None = typer.Option(None, "--trace-file", help="Write every request event as JSON lines to this file"),
+    metrics_file: Path | None = typer.Option(None, "--metrics-file", help="Write request metrics in Prometheus text format to this file"),
 ) -> None:
-    if not model_id:
-        raise typer.BadParameter("--model-id is required")
-    if pretty is None:
-        pretty = _default_pretty()
-    auth = get_auth_header(api_key=api_key, api_secret=api_secret, save_to_keyring=save_to_keyring)
-    client = ApiClient(api_url(url), auth_header=auth, timeout=timeout, max_rps=max_rps, retries=retries)
-    c = console()
-    # Show progress when running interactively, unless explicitly outputting to stdout
-    quiet = str(out) == "-" or (out is None and not sys.stdout.isatty())
-    with Timer() as t:
-        # Fetch notes with progress indicator
-        if quiet:
-            notes = client.fetch_notes(model_id)
-        else:
-            with Status("Fetching notes...", console=c) as status:
-                def update_status(msg: str) -> None:
-                    status.update(f"Fetching notes... {msg}")
-                notes = client.fetch_notes(model_id, on_progress=update_status)
-        
-        points = [n["anchorPosition"] for n in notes]
-        
-        # Geocode with enhanced progress bar
-        if quiet:
-            geos = client.batch_geocode(model_id, points, concurrency=concurrency, max_rps=max_rps)
-        else:
-            progress = Progress(
-                SpinnerColumn(),
-                TextColumn("[progress.description]{task.description}"),
-                BarColumn(),
-                TaskProgressColumn(),
-                TextColumn("•"),
-                TimeElapsedColumn(),
-                TextColumn("•"),
-                TimeRemainingColumn(),
-                console=c
-            )
-            with progress:
-                task = progress.add_task("Geocoding notes", total=len(points))
-                def inc(completed: int, rate: float) -> None:
-                    progress.update(task, completed=completed, description=f"Geocoding notes ({rate:.1f}/s)")
-                geos = client.batch_geocode(model_id, points, concurrency=concurrency, max_rps=max_rps, on_progress=inc)
-        exports = [
-            NoteExport(
-                id=n["id"],
-                text=n.get("label"),
-                local=GeoPoint(**n["anchorPosition"]),
-                geo=LatLng(**geos[i]),
-            )
-            for i, n in enumerate(notes)
-        ]
-        if format.lower() == "json":
-            write_json([e.model_dump() for e in exports], out, pretty)
-        elif format.lower() == "geojson":
-            features = [to_geojson_feature(e) for e in exports]
-            write_geojson(features, out, pretty)
-        else:
-            raise typer.BadParameter(f"Unsupported format: {format}. Use 'json' or 'geojson'.")
-        if not quiet:
-            c.print(f"[green]Exported {len(exports)} notes.[/green]")
+    _run_export(
+        "notes",
+        fields=fields, since=since, changes=changes,
+        model_id=model_id, out=out, format=format, pretty=pretty, concurrency=concurrency, engine=engine,
+        geocode_mode=geocode_mode, verify_sample=verify_sample, verify_tolerance=verify_tolerance, max_rps=max_rps,
+        adaptive=adaptive, max_concurrency=max_concurrency, max_rps_ceiling=max_rps_ceiling, use_cache=use_cache,
+        cache_dir=cache_dir, burst=burst, points_per_request=points_per_request, retries=retries, timeout=timeout,
+        api_key=api_key, api_secret=api_secret, url=url, save_to_keyring=save_to_keyring, ordered=ordered,
+        resume=resume, dedup_tolerance=dedup_tolerance, on_error=on_error, trace_file=trace_file,
+        metrics_file=metrics_file,
+    )
+
+
+@export_app.command("all")
+def export_all_cmd(
+    model_id: str = typer.Option(..., "--model-id", "-m", help="Matterport model ID"),
+    kinds: str = typer.Option("sweeps,tags,notes", "--kinds", help="Comma list of sweeps, tags, notes"),
+    out: Path | None = typer.Option(None, "--out", "-o", help="One layered document: output path or '-' for stdout"),
+    out_dir: Path | None = typer.Option(None, "--out-dir", help="Write <model>_<kind>.<format> per kind plus <model>_model.json here"),
+    format: str = typer.Option("geojson", "--format", "-f", case_sensitive=False, help="json, geojson, ndjson (--out-dir only) or geojsonseq"),
+    include_skybox: bool = typer.Option(False, "--include-skybox/--no-include-skybox"),
+    resolution: str = typer.Option(DEFAULT_RESOLUTION, "--resolution", help="Skybox image resolution with --include-skybox (e.g. 512, 1k, 2k, 4k)"),
+    fields: str | None = typer.Option(None, "--fields", help="Comma list of output fields to keep: label, text, local, skybox (id and geo are always written)"),
+    concurrency: int = typer.Option(8, "--concurrency"),
+    engine: str = typer.Option("threads", "--engine", case_sensitive=False, help="threads (requests + thread pool) or async (aiohttp)"),
+    geocode_mode: str = typer.Option("remote", "--geocode-mode", case_sensitive=False, help="remote (geoLocationOf per point), local (client-side transform) or verify (local + spot-check)"),
+    verify_sample: int = typer.Option(10, "--verify-sample", help="Points to spot-check in verify mode"),
+    verify_tolerance: float = typer.Option(1.0, "--verify-tolerance", help="Max allowed verify error in meters"),
+    max_rps: float = typer.Option(5.0, "--max-rps"),
+    adaptive: bool = typer.Option(False, "--adaptive/--no-adaptive", help="Tune rate and concurrency from server feedback (AIMD)"),
+    max_concurrency: int = typer.Option(32, "--max-concurrency", min=1, help="Concurrency ceiling for --adaptive"),
+    max_rps_ceiling: float = typer.Option(20.0, "--max-rps-ceiling", help="Requests-per-second ceiling for --adaptive"),
+    use_cache: bool = typer.Option(False, "--cache/--no-cache", help="Reuse geocodes from the on-disk cache"),
+    cache_dir: Path | None = typer.Option(None, "--cache-dir", help="Cache directory (default: user cache dir)"),
+    burst: float = typer.Option(1.0, "--burst", min=1.0, help="Requests allowed back-to-back before --max-rps applies"),
+    points_per_request: int = typer.Option(1, "--points-per-request", min=1, help="Points geocoded per GraphQL request"),
+    dedup_tolerance: float = typer.Option(DEFAULT_TOLERANCE, "--dedup-tolerance", min=0.0, help="Geocode points closer than this (meters) only once; 0 dedups exact matches only"),
+    retries: int = typer.Option(3, "--retries"),
+    timeout: float = typer.Option(30.0, "--timeout"),
+    api_key: str | None = typer.Option(None, "--api-key"),
+    api_secret: str | None = typer.Option(None, "--api-secret"),
+    url: str | None = typer.Option(None, "--url"),
+    save_to_keyring: bool = typer.Option(True, "--save-to-keyring/--no-save-to-keyring"),
+    pretty: bool = typer.Option(None, "--pretty/--no-pretty", help="Pretty output; default true for TTY"),
+    ordered: bool = typer.Option(True, "--ordered/--unordered", help="Keep input order, or write features as soon as they are geocoded"),
+    resume: bool = typer.Option(False, "--resume", help="Continue an interrupted export from its checkpoint journal"),
+    on_error: str = typer.Option("fail", "--on-error", case_sensitive=False, help="Points that fail to geocode: fail (exit 1, keep the journal), skip (omit them) or null (write geo: null)"),
+    trace_file: Path | None = typer.Option(None, "--trace-file", help="Write every request event as JSON lines to this file"),
+    metrics_file: Path | None = typer.Option(None, "--metrics-file", help="Write request metrics in Prometheus text format to this file"),
+) -> None:
+    """Export sweeps, tags, notes and the model georeference from one GraphQL request."""
+    from .bulk import parse_kinds
+
+    try:
+        kind_list = parse_kinds(kinds)
+    except ValueError as exc:
+        raise typer.BadParameter(str(exc)) from exc
+    _run_export_all(
+        kind_list,
+        model_id=model_id, out=out, out_dir=out_dir, format=format, pretty=pretty, concurrency=concurrency,
+        engine=engine, geocode_mode=geocode_mode, verify_sample=verify_sample, verify_tolerance=verify_tolerance,
+        max_rps=max_rps, adaptive=adaptive, max_concurrency=max_concurrency, max_rps_ceiling=max_rps_ceiling,
+        use_cache=use_cache, cache_dir=cache_dir, burst=burst, points_per_request=points_per_request,
+        retries=retries, timeout=timeout, api_key=api_key, api_secret=api_secret, url=url,
+        save_to_keyring=save_to_keyring, include_skybox=include_skybox, resolution=resolution, fields=fields,
+        ordered=ordered, resume=resume, dedup_tolerance=dedup_tolerance, on_error=on_error, trace_file=trace_file,
+        metrics_file=metrics_file,
+    )
 
 
 @export_app.command("model")
@@ -285,8 +914,16 @@ def export_model_cmd(
         raise typer.BadParameter("--model-id is required")
     if pretty is None:
         pretty = _default_pretty()
+    from rich.status import Status
+
+    from .api import ApiClient
+    from .auth import get_auth_header, refresh_auth_header
+    from .config import api_url
+    from .exports import build_model_export, model_feature
+    from .utils import write_geojson, write_json
+
     auth = get_auth_header(api_key=api_key, api_secret=api_secret, save_to_keyring=save_to_keyring)
-    client = ApiClient(api_url(url), auth_header=auth, timeout=timeout)
+    client = ApiClient(api_url(url), auth_header=auth, timeout=timeout, on_unauthorized=refresh_auth_header)
     c = console()
     # Show progress when running interactively, unless explicitly outputting to stdout
     quiet = str(out) == "-" or (out is None and not sys.stdout.isatty())
@@ -300,38 +937,14 @@ def export_model_cmd(
                     status.update(f"Fetching model geocoordinates... {msg}")
                 model_data = client.fetch_model_geocoordinates(model_id, on_progress=update_status)
         
-        # Build the model export
-        geocoords_data = model_data.get("geocoordinates") or {}
-        translation = geocoords_data.get("translation")
-        rotation = geocoords_data.get("rotation")
-        
-        geocoords = ModelGeoCoordinates(
-            source=geocoords_data.get("source"),
-            altitude=geocoords_data.get("altitude"),
-            latitude=geocoords_data.get("latitude"),
-            longitude=geocoords_data.get("longitude"),
-            translation=GeoPoint(**translation) if translation else None,
-            rotation=Quaternion(**rotation) if rotation else None,
-        )
-        
-        export = ModelExport(
-            id=model_data.get("id", model_id),
-            geocoordinates=geocoords
-        )
-        
+        export = build_model_export(model_data, model_id)
+
         if format.lower() == "json":
             write_json(export.model_dump(), out, pretty)
         elif format.lower() == "geojson":
             # For GeoJSON, create a feature with the lat/lng if available
-            if geocoords.latitude is not None and geocoords.longitude is not None:
-                feature = {
-                    "type": "Feature",
-                    "geometry": {
-                        "type": "Point",
-                        "coordinates": [geocoords.longitude, geocoords.latitude, geocoords.altitude]
-                    },
-                    "properties": export.model_dump()
-                }
+            feature = model_feature(export)
+            if feature is not None:
                 write_geojson([feature], out, pretty)
             else:
                 # Fallback to JSON if no coordinates available
@@ -340,4 +953,237 @@ def export_model_cmd(
             raise typer.BadParameter(f"Unsupported format: {format}. Use 'json' or 'geojson'.")
         
         if not quiet:
-            c.print(f"[green]Exported model geocoordinates.[/green]")
\ No newline at end of file
+            c.print(f"[green]Exported model geocoordinates.[/green]")
+
+@app.command("bulk")
+def bulk_cmd(
+    models: Path = typer.Option(..., "--models", help="File with one model ID per line"),
+    kinds: str = typer.Option("sweeps,tags,notes", "--kinds", help="Comma list of sweeps, tags, notes"),
+    out_dir: Path = typer.Option(..., "--out-dir", help="Directory for per-model files and manifest.json"),
+    format: str = typer.Option("geojson", "--format", "-f", case_sensitive=False, help="json, geojson, ndjson or geojsonseq"),
+    include_skybox: bool = typer.Option(False, "--include-skybox/--no-include-skybox"),
+    resolution: str = typer.Option(DEFAULT_RESOLUTION, "--resolution", help="Skybox image resolution with --include-skybox (e.g. 512, 1k, 2k, 4k)"),
+    fields: str | None = typer.Option(None, "--fields", help="Comma list of output fields to keep: label, text, local, skybox (id and geo are always written)"),
+    parallel_jobs: int = typer.Option(4, "--parallel-jobs", min=1, help="Model/kind jobs fetched and written at once"),
+    since: Path | None = typer.Option(None, "--since", help="Directory of a previous run (may be --out-dir): reuse the geocodes of objects that did not move"),
+    concurrency: int = typer.Option(8, "--concurrency", help="Geocode workers shared by all jobs"),
+    engine: str = typer.Option("threads", "--engine", case_sensitive=False, help="threads (requests + thread pool) or async (aiohttp)"),
+    geocode_mode: str = typer.Option("remote", "--geocode-mode", case_sensitive=False, help="remote, local or verify"),
+    verify_tolerance: float = typer.Option(1.0, "--verify-tolerance", help="Max allowed verify error in meters; a job over it fails"),
+    max_rps: float = typer.Option(5.0, "--max-rps", help="Rate budget shared by all jobs"),
+    adaptive: bool = typer.Option(False, "--adaptive/--no-adaptive", help="Tune rate and concurrency from server feedback (AIMD)"),
+    max_concurrency: int = typer.Option(32, "--max-concurrency", min=1, help="Concurrency ceiling for --adaptive"),
+    max_rps_ceiling: float = typer.Option(20.0, "--max-rps-ceiling", help="Requests-per-second ceiling for --adaptive"),
+    use_cache: bool = typer.Option(False, "--cache/--no-cache", help="Reuse geocodes from the on-disk cache"),
+    cache_dir: Path | None = typer.Option(None, "--cache-dir", help="Cache directory (default: user cache dir)"),
+    burst: float = typer.Option(1.0, "--burst", min=1.0, help="Requests allowed back-to-back before --max-rps applies"),
+    points_per_request: int = typer.Option(1, "--points-per-request", min=1, help="Points geocoded per GraphQL request"),
+    dedup_tolerance: float = typer.Option(DEFAULT_TOLERANCE, "--dedup-tolerance", min=0.0, help="Geocode points closer than this (meters) only once; 0 dedups exact matches only"),
+    on_error: str = typer.Option("fail", "--on-error", case_sensitive=False, help="Points that fail to geocode: fail the job, skip them, or write geo: null"),
+    retries: int = typer.Option(3, "--retries"),
+    timeout: float = typer.Option(30.0, "--timeout"),
+    api_key: str | None = typer.Option(None, "--api-key"),
+    api_secret: str | None = typer.Option(None, "--api-secret"),
+    url: str | None = typer.Option(None, "--url"),
+    save_to_keyring: bool = typer.Option(True, "--save-to-keyring/--no-save-to-keyring"),
+    pretty: bool = typer.Option(False, "--pretty/--no-pretty"),
+    trace_file: Path | None = typer.Option(None, "--trace-file", help="Write every request event as JSON lines to this file"),
+    metrics_file: Path | None = typer.Option(None, "--metrics-file", help="Write request metrics in Prometheus text format to this file"),
+) -> None:
+    """Export many models through one shared client, rate limiter and worker pool."""
+    from rich.progress import BarColumn, Progress, SpinnerColumn, TaskProgressColumn, TextColumn, TimeElapsedColumn
+
+    from .auth import get_auth_header
+    from .bulk import parse_kinds, read_model_ids, run_bulk
+    from .geocode import GEOCODE_MODES
+
+    if format.lower() not in OUTPUT_FORMATS:
+        raise typer.BadParameter(f"Unsupported format: {format}. Use one of {', '.join(OUTPUT_FORMATS)}.")
+    if geocode_mode.lower() not in GEOCODE_MODES:
+        raise typer.BadParameter(f"Unsupported geocode mode: {geocode_mode}. Use {', '.join(GEOCODE_MODES)}.")
+    try:
+        kind_list = parse_kinds(kinds)
+        on_error = check_on_error(on_error)
+        selected = parse_fields(fields, include_skybox)
+    except ValueError as exc:
+        raise typer.BadParameter(str(exc)) from exc
+    model_ids = read_model_ids(models)
+    if not model_ids:
+        raise typer.BadParameter(f"No model IDs found in {models}")
+    auth = get_auth_header(api_key=api_key, api_secret=api_secret, save_to_keyring=save_to_keyring)
+    client = _build_client(
+        engine, auth, url, timeout, max_rps, retries, burst, concurrency, adaptive, max_concurrency, max_rps_ceiling,
+        extra_connections=parallel_jobs,
+    )
+    c = console()
+    cache = _open_cache(use_cache, cache_dir)
+    metrics, trace = _attach_instruments(client, trace_file)
+    interactive = sys.stdout.isatty()
+    try:
+        with Timer() as t:
+            progress = Progress(
+                SpinnerColumn(),
+                TextColumn("[progress.description]{task.description}"),
+                BarColumn(),
+                TaskProgressColumn(),
+                TextColumn("•"),
+                TimeElapsedColumn(),
+                console=c,
+                disable=not interactive,
+            )
+            with progress:
+                task = progress.add_task("Exporting", total=len(model_ids) * len(kind_list))
+                def done(job: Any) -> None:
+                    progress.advance(task)
+                    if job.status != "ok":
+                        c.print(f"[red]{job.model_id} {job.kind}: {job.error}[/red]")
+                    elif job.failed_points:
+                        c.print(f"[yellow]{job.model_id} {job.kind}: {len(job.failed_points)} points failed ({on_error})[/yellow]")
+                summary = run_bulk(
+                    client, model_ids, kind_list, out_dir, format=format, concurrency=concurrency,
+                    parallel_jobs=parallel_jobs, geocode_mode=geocode_mode, points_per_request=points_per_request,
+                    fields=selected, resolution=resolution, cache=cache, pretty=pretty, on_job_done=done,
+                    dedup_tolerance=dedup_tolerance, on_error=on_error, since=since, verify_tolerance=verify_tolerance,
+                )
+    finally:
+        client.close()
+        if cache is not None:
+            cache.close()
+        _finish_instruments(metrics, trace, metrics_file)
+    failed = summary.failed
+    c.print(
+        f"[green]Exported {len(summary.jobs) - len(failed)}/{len(summary.jobs)} jobs "
+        f"for {len(model_ids)} models in {t.format_elapsed()}.[/green] Manifest: {Path(out_dir) / 'manifest.json'}"
+    )
+    dedup = summary.dedup
+    c.print(
+        f"[dim]Dedup: {dedup['unique_points']}/{dedup['points']} unique points, "
+        f"{dedup['coalesced']} shared between jobs, {dedup['requests_saved']} requests saved[/dim]"
+    )
+    if since is not None:
+        ok = [j for j in summary.jobs if j.status == "ok"]
+        c.print(
+            f"[dim]Delta: {sum(j.reused for j in ok)}/{sum(j.points for j in ok)} points reused from {since}; "
+            f"{sum(j.added for j in ok)} rows added, {sum(j.moved for j in ok)} moved, "
+            f"{sum(j.removed for j in ok)} removed[/dim]"
+        )
+    _print_request_metrics(metrics, t, c)
+    if failed:
+        raise typer.Exit(code=1)
+
+
+@app.command("serve")
+def serve_cmd(
+    host: str = typer.Option("127.0.0.1", "--host", help="Interface to listen on"),
+    port: int = typer.Option(8765, "--port", min=0, help="Port to listen on (0 picks a free one)"),
+    concurrency: int = typer.Option(8, "--concurrency", help="Geocode workers shared by all requests"),
+    engine: str = typer.Option("threads", "--engine", case_sensitive=False, help="threads (requests + thread pool) or async (aiohttp)"),
+    geocode_mode: str = typer.Option("remote", "--geocode-mode", case_sensitive=False, help="remote, local or verify"),
+    verify_tolerance: float = typer.Option(1.0, "--verify-tolerance", help="Max allowed verify error in meters; an export over it answers 502"),
+    max_rps: float = typer.Option(5.0, "--max-rps", help="Rate budget shared by all requests"),
+    adaptive: bool = typer.Option(False, "--adaptive/--no-adaptive", help="Tune rate and concurrency from server feedback (AIMD)"),
+    max_concurrency: int = typer.Option(32, "--max-concurrency", min=1, help="Concurrency ceiling for --adaptive"),
+    max_rps_ceiling: float = typer.Option(20.0, "--max-rps-ceiling", help="Requests-per-second ceiling for --adaptive"),
+    use_cache: bool = typer.Option(True, "--cache/--no-cache", help="Reuse geocodes from the on-disk cache"),
+    cache_dir: Path | None = typer.Option(None, "--cache-dir", help="Cache directory (default: user cache dir)"),
+    burst: float = typer.Option(1.0, "--burst", min=1.0, help="Requests allowed back-to-back before --max-rps applies"),
+    points_per_request: int = typer.Option(1, "--points-per-request", min=1, help="Points geocoded per GraphQL request"),
+    dedup_tolerance: float = typer.Option(DEFAULT_TOLERANCE, "--dedup-tolerance", min=0.0, help="Geocode points closer than this (meters) only once; 0 dedups exact matches only"),
+    on_error: str = typer.Option("fail", "--on-error", case_sensitive=False, help="Points that fail to geocode: fail (truncate the response), skip them, or write geo: null"),
+    retries: int = typer.Option(3, "--retries"),
+    timeout: float = typer.Option(30.0, "--timeout"),
+    api_key: str | None = typer.Option(None, "--api-key"),
+    api_secret: str | None = typer.Option(None, "--api-secret"),
+    url: str | None = typer.Option(None, "--url"),
+    save_to_keyring: bool = typer.Option(True, "--save-to-keyring/--no-save-to-keyring"),
+    trace_file: Path | None = typer.Option(None, "--trace-file", help="Write every request event as JSON lines to this file"),
+    quiet: bool = typer.Option(False, "--quiet", "-q", help="Don't log each request"),
+) -> None:
+    """Serve exports over HTTP from one long-lived client, cache and rate limiter.
+
+    GET /export/{sweeps|tags|notes}?model_id=... streams GeoJSON (or
+    format=json|ndjson|geojsonseq); concurrent requests for the same export
+    share one job. /healthz and /metrics report on the server.
+    """
+    from .auth import get_auth_header
+    from .geocode import GEOCODE_MODES
+    from .sdk import Exporter
+    from .server import ExportServer
+
+    if geocode_mode.lower() not in GEOCODE_MODES:
+        raise typer.BadParameter(f"Unsupported geocode mode: {geocode_mode}. Use {', '.join(GEOCODE_MODES)}.")
+    try:
+        on_error = check_on_error(on_error)
+    except ValueError as exc:
+        raise typer.BadParameter(str(exc)) from exc
+    auth = get_auth_header(api_key=api_key, api_secret=api_secret, save_to_keyring=save_to_keyring)
+    client = _build_client(
+        engine, auth, url, timeout, max_rps, retries, burst, concurrency, adaptive, max_concurrency, max_rps_ceiling
+    )
+    cache = _open_cache(use_cache, cache_dir)
+    metrics, trace = _attach_instruments(client, trace_file)
+    exporter = Exporter(
+        client=client, cache=cache, concurrency=concurrency, adaptive=adaptive, max_concurrency=max_concurrency,
+        geocode_mode=geocode_mode, points_per_request=points_per_request, dedup_tolerance=dedup_tolerance,
+        on_error=on_error, verify_tolerance=verify_tolerance,
+    )
+    c = console()
+    try:
+        with ExportServer(exporter, host, port, metrics=metrics, quiet=quiet) as server:
+            c.print(f"[green]Serving exports on {server.url}[/green] (Ctrl+C to stop)")
+            try:
+                server.serve_forever()
+            except KeyboardInterrupt:
+                pass
+    finally:
+        exporter.close()
+        client.close()
+        if cache is not None:
+            cache.close()
+        _finish_instruments(metrics, trace, None)
+
+
+@cache_app.command("stats")
+def cache_stats_cmd(
+    cache_dir: Path | None = typer.Option(None, "--cache-dir", help="Cache directory (default: user cache dir)"),
+) -> None:
+    from .cache import GeocodeCache
+
+    with GeocodeCache(cache_dir) as cache:
+        stats = cache.stats()
+    c = console()
+    c.print(f"Path:    {stats.path}")
+    c.print(f"Entries: {stats.entries}")
+    c.print(f"Models:  {stats.models}")
+    c.print(f"Size:    {stats.size_bytes / 1024:.1f} KiB")
+    if stats.oldest is not None and stats.newest is not None:
+        c.print(f"Oldest:  {datetime.fromtimestamp(stats.oldest).isoformat(timespec='seconds')}")
+        c.print(f"Newest:  {datetime.fromtimestamp(stats.newest).isoformat(timespec='seconds')}")
+
+
+@cache_app.command("prune")
+def cache_prune_cmd(
+    cache_dir: Path | None = typer.Option(None, "--cache-dir", help="Cache directory (default: user cache dir)"),
+    max_age_days: float | None = typer.Option(None, "--max-age-days", help="Drop entries older than this (default: 90)"),
+    max_entries: int | None = typer.Option(None, "--max-entries", help="Keep at most this many, least recently used first out"),
+) -> None:
+    from .cache import GeocodeCache
+
+    with GeocodeCache(cache_dir) as cache:
+        removed = cache.prune(
+            max_age=max_age_days * 86400 if max_age_days is not None else None,
+            max_entries=max_entries,
+        )
+    console().print(f"[green]Pruned {removed} cache entries.[/green]")
+
+
+@cache_app.command("clear")
+def cache_clear_cmd(
+    cache_dir: Path | None = typer.Option(None, "--cache-dir", help="Cache directory (default: user cache dir)"),
+    model_id: str | None = typer.Option(None, "--model-id", "-m", help="Only clear this model"),
+) -> None:
+    from .cache import GeocodeCache
+
+    with GeocodeCache(cache_dir) as cache:
+        removed = cache.clear(model_id)
+    console().print(f"[green]Cleared {removed} cache entries.[/green]")
@@ -2,14 +2,27 @@ from __future__ import annotations
 
 import os
 
-from dotenv import load_dotenv
+DEFAULT_URL = "https://api.matterport.com/api/models/graph"
 
-load_dotenv()
+_env_loaded = False
 
-DEFAULT_URL = "https://api.matterport.com/api/models/graph"
 
+def load_env() -> None:
+    """Load ``.env`` into the environment once, on first use rather than at import.
 
-def api_url(override: str | None = None) -> str:
-    return override or os.getenv("MATTERPORT_API_URL") or DEFAULT_URL
+    Variables already set in the environment win over the file.
+    """
+    global _env_loaded
+    if _env_loaded:
+        return
+    _env_loaded = True
+    from dotenv import load_dotenv
 
+    load_dotenv()
 
+
+def api_url(override: str | None = None) -> str:
+    if override:
+        return override
+    load_env()
+    return os.getenv("MATTERPORT_API_URL") or DEFAULT_URL
@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import math
+import threading
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import Any
+
+DEFAULT_TOLERANCE = 1e-4
+
+# (grid size, x, y, z): the grid size keeps keys built with different tolerances apart
+PointKey = tuple[float, float, float, float]
+
+
+def point_key(point: dict[str, float], tolerance: float = DEFAULT_TOLERANCE) -> PointKey:
+    """Canonical form of a local point: snapped to a ``tolerance`` grid (meters), or exact if 0."""
+    if tolerance <= 0:
+        return (0.0, float(point["x"]), float(point["y"]), float(point["z"]))
+    return (
+        float(tolerance),
+        float(round(point["x"] / tolerance)),
+        float(round(point["y"] / tolerance)),
+        float(round(point["z"] / tolerance)),
+    )
+
+
+@dataclass(frozen=True)
+class DedupStats:
+    """How much work deduplication and in-flight coalescing removed from one geocode run."""
+
+    points: int
+    unique: int
+    coalesced: int = 0
+    requests_saved: int = 0
+
+    @property
+    def duplicate_ratio(self) -> float:
+        return 1 - self.unique / self.points if self.points else 0.0
+
+
+@dataclass
+class DedupPlan:
+    """Unique points to geocode and the input indexes each one fans back out to."""
+
+    keys: list[PointKey]
+    points: list[dict[str, float]]
+    groups: list[list[int]]
+
+    @classmethod
+    def build(cls, points: list[dict[str, float]], tolerance: float = DEFAULT_TOLERANCE) -> "DedupPlan":
+        slots: dict[PointKey, int] = {}
+        plan = cls(keys=[], points=[], groups=[])
+        for i, point in enumerate(points):
+            key = point_key(point, tolerance)
+            slot = slots.get(key)
+            if slot is None:
+                slots[key] = len(plan.keys)
+                plan.keys.append(key)
+                plan.points.append(point)
+                plan.groups.append([i])
+            else:
+                plan.groups[slot].append(i)
+        return plan
+
+    def expand(self, unique_geos: list[Any]) -> list[Any]:
+        """Results for the unique points, copied back to every original index."""
+        out: list[Any] = [None] * sum(len(g) for g in self.groups)
+        for group, geo in zip(self.groups, unique_geos):
+            for i in group:
+                out[i] = geo
+        return out
+
+
+def requests_for(points: int, points_per_request: int) -> int:
+    return math.ceil(points / max(1, points_per_request))
+
+
+class InflightRegistry:
+    """Process-wide table of geocodes currently being fetched, keyed by model and point.
+
+    The first export to ``claim`` a point owns the request and must
+    ``resolve`` (or ``release``) it; concurrent exports asking for the same
+    point get the owner's future instead of issuing a duplicate request.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._inflight: dict[tuple[str, PointKey], Future[Any]] = {}
+
+    def claim(self, model_id: str, keys: list[PointKey]) -> tuple[list[int], dict[int, Future[Any]], list[Future[Any]]]:
+        """Split ``keys`` into ones this caller must fetch and ones already in flight.
+
+        Returns the owned positions, the borrowed futures by position, and the
+        futures this caller has registered (to hand to ``release``).
+        """
+        owned: list[int] = []
+        borrowed: dict[int, Future[Any]] = {}
+        registered: list[Future[Any]] = []
+        with self._lock:
+            for pos, key in enumerate(keys):
+                future = self._inflight.get((model_id, key))
+                if future is not None:
+                    borrowed[pos] = future
+                    continue
+                future = Future()
+                self._inflight[(model_id, key)] = future
+                owned.append(pos)
+                registered.append(future)
+        return owned, borrowed, registered
+
+    def resolve(self, model_id: str, key: PointKey, geo: Any) -> None:
+        with self._lock:
+            future = self._inflight.pop((model_id, key), None)
+        if future is not None and not future.done():
+            future.set_result(geo)
+
+    def release(self, model_id: str, keys: list[PointKey], futures: list[Future[Any]], exc: BaseException) -> None:
+        """Fail any of this caller's futures that never resolved, so waiters fall back."""
+        mine = {id(f) for f in futures}
+        with self._lock:
+            for key in keys:
+                future = self._inflight.get((model_id, key))
+                if future is not None and id(future) in mine:
+                    del self._inflight[(model_id, key)]
+        for future in futures:
+            if not future.done():
+                future.set_exception(exc)
+
+
+INFLIGHT = InflightRegistry()
@@ -0,0 +1,235 @@
+from __future__ import annotations
+
+import json
+import math
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Iterator
+
+from .cache import georeference_fingerprint
+from .table import ROW_KINDS, ExportTable, pano_id
+
+# Change kinds written to ``change`` (``properties.change`` for Features) in a change set
+ADDED, MOVED, REMOVED = "added", "moved", "removed"
+
+# Local positions closer than this (meters) count as unmoved
+MOVE_TOLERANCE = 1e-6
+
+_RS = "\x1e"
+
+# Beside an export file: the fingerprint of the georeference its geocodes came from
+GEOREF_SUFFIX = ".georef"
+
+
+def georef_path(out_path: str | Path) -> Path:
+    """Georeference record for an export file: ``<out>.georef`` beside it."""
+    out_path = Path(out_path)
+    return out_path.with_name(out_path.name + GEOREF_SUFFIX)
+
+
+def record_georeference(out_path: str | Path, geocoordinates: dict[str, Any] | None) -> None:
+    """Note the georeference an export file was geocoded with, for a later ``--since``."""
+    georef_path(out_path).write_text(georeference_fingerprint(geocoordinates) + "\n")
+
+
+@dataclass
+class PriorRow:
+    local: tuple[float, float, float]
+    geo: dict[str, Any]
+
+
+def _documents(text: str) -> Iterator[Any]:
+    """The JSON documents of a file: one for json/geojson, one per line for ndjson/geojsonseq."""
+    try:
+        yield json.loads(text)
+        return
+    except json.JSONDecodeError:
+        pass
+    for line in text.splitlines():
+        line = line.strip().lstrip(_RS)
+        if line:
+            yield json.loads(line)
+
+
+def _items(doc: Any, kind: str) -> Iterator[Any]:
+    if isinstance(doc, list):
+        yield from doc
+    elif isinstance(doc, dict) and doc.get("type") == "FeatureCollection":
+        yield from doc.get("features") or []
+    elif isinstance(doc, dict) and isinstance(doc.get(kind), list):
+        # The layered json document of ``export all``
+        yield from doc[kind]
+    else:
+        yield doc
+
+
+def _point(value: Any) -> tuple[float, float, float] | None:
+    if not isinstance(value, dict):
+        return None
+    try:
+        return float(value["x"]), float(value["y"]), float(value["z"])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def _row(item: Any, row_kind: str) -> tuple[Any, tuple[float, float, float] | None, dict[str, Any] | None]:
+    """(id, local, geo) of a record or Feature; id is None for rows of another kind."""
+    if not isinstance(item, dict):
+        return None, None, None
+    if item.get("type") == "Feature":
+        props = item.get("properties") or {}
+        if props.get("type", row_kind) != row_kind:
+            return None, None, None
+        coordinates = (item.get("geometry") or {}).get("coordinates")
+        geo = None
+        if coordinates and len(coordinates) >= 2:
+            geo = {"lat": coordinates[1], "long": coordinates[0], "alt": coordinates[2] if len(coordinates) > 2 else None}
+        return props.get("id"), _point(props.get("local_coordinates")), geo
+    return item.get("id"), _point(item.get("local")), item.get("geo")
+
+
+class PreviousExport:
+    """The rows of an earlier export of one kind, keyed by id, for a delta export.
+
+    Reads any output format this tool writes (json, geojson, ndjson,
+    geojsonseq, and the layered ``export all`` documents). Rows need their
+    local coordinates, which are written unless ``--fields`` left ``local``
+    out, so moves can be told apart from unchanged objects; rows without a
+    geocode are dropped and so count as added. Geocodes are only reused
+    while the model's georeference matches ``fingerprint``, read from the
+    file's ``.georef`` record (see ``record_georeference``); without one
+    every object is geocoded again.
+    """
+
+    def __init__(
+        self, kind: str, rows: dict[str, PriorRow], path: Path | None = None, fingerprint: str | None = None
+    ) -> None:
+        self.kind = kind
+        self.rows = rows
+        self.path = path
+        self.fingerprint = fingerprint
+
+    @classmethod
+    def load(cls, path: str | Path, kind: str) -> "PreviousExport":
+        row_kind = ROW_KINDS.get(kind)
+        if row_kind is None:
+            raise ValueError(f"Unsupported kind: {kind}. Use one of {', '.join(ROW_KINDS)}.")
+        path = Path(path)
+        text = path.read_text()
+        rows: dict[str, PriorRow] = {}
+        found = unplaced = 0
+        try:
+            for doc in _documents(text):
+                for item in _items(doc, kind):
+                    id, local, geo = _row(item, row_kind)
+                    if id is None:
+                        continue
+                    found += 1
+                    if local is None:
+                        unplaced += 1
+                    elif geo is not None:
+                        rows[str(id)] = PriorRow(local, geo)
+        except json.JSONDecodeError as exc:
+            raise ValueError(f"{path} is not an export this tool can read: {exc}") from exc
+        if found and unplaced == found:
+            raise ValueError(f"{path} has no local coordinates to compare against; export it with the 'local' field")
+        record = georef_path(path)
+        fingerprint = record.read_text().strip() if record.exists() else None
+        return cls(kind, rows, path, fingerprint or None)
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def _same(self, prior: PriorRow, local: tuple[float, float, float]) -> bool:
+        return math.dist(prior.local, local) <= MOVE_TOLERANCE
+
+    def reusable(self, geocoordinates: dict[str, Any] | None) -> bool:
+        """Whether the previous geocodes came from this georeference, as the cache checks."""
+        return self.fingerprint is not None and self.fingerprint == georeference_fingerprint(geocoordinates)
+
+    def geo_for(self, obj: dict[str, Any], geocoordinates: dict[str, Any] | None) -> dict[str, Any] | None:
+        """The previous geocode of a raw listed object, if it is still where it was.
+
+        None for every object once ``geocoordinates`` differs from the
+        georeference the previous export was geocoded with.
+        """
+        return self._unmoved(obj) if self.reusable(geocoordinates) else None
+
+    def _unmoved(self, obj: dict[str, Any]) -> dict[str, Any] | None:
+        if self.kind == "sweeps":
+            ids = [pano_id(obj["id"], i) for i in range(len(obj.get("panos") or []))]
+            pos = obj["position"]
+        else:
+            ids = [obj["id"]]
+            pos = obj["anchorPosition"]
+        local = (float(pos["x"]), float(pos["y"]), float(pos["z"]))
+        for id in ids:
+            prior = self.rows.get(id)
+            if prior is not None and self._same(prior, local):
+                return prior.geo
+        return None
+
+    def known(self, objects: list[dict[str, Any]], geocoordinates: dict[str, Any] | None) -> dict[int, dict[str, Any]]:
+        """Previous geocodes by index for those of ``objects`` that did not move.
+
+        Empty when the georeference changed (see ``geo_for``).
+        """
+        known: dict[int, dict[str, Any]] = {}
+        if not self.reusable(geocoordinates):
+            return known
+        for i, obj in enumerate(objects):
+            geo = self._unmoved(obj)
+            if geo is not None:
+                known[i] = geo
+        return known
+
+    def change(self, table: ExportTable, row: int) -> str | None:
+        """``added`` or ``moved`` for a row of the new export, None when it is unchanged."""
+        prior = self.rows.get(table.ids[row])
+        if prior is None:
+            return ADDED
+        return None if self._same(prior, (table.x[row], table.y[row], table.z[row])) else MOVED
+
+    def removed(self, ids: set[str]) -> list[str]:
+        """Ids of the previous export missing from ``ids``, in their previous order."""
+        return [id for id in self.rows if id not in ids]
+
+    def removed_record(self, id: str, features: bool) -> dict[str, Any]:
+        """A change-set entry for a removed row, as a record or a GeoJSON Feature."""
+        prior = self.rows[id]
+        local = dict(zip("xyz", prior.local))
+        if not features:
+            return {"id": id, "local": local, "geo": prior.geo, "change": REMOVED}
+        coordinates = [prior.geo["long"], prior.geo["lat"]]
+        if prior.geo.get("alt") is not None:
+            coordinates.append(prior.geo["alt"])
+        return {
+            "type": "Feature",
+            "geometry": {"type": "Point", "coordinates": coordinates},
+            "properties": {"id": id, "local_coordinates": local, "type": ROW_KINDS[self.kind], "change": REMOVED},
+        }
+
+
+def tag_change(record: dict[str, Any], change: str, features: bool) -> dict[str, Any]:
+    """Mark a rendered record or Feature with its change kind."""
+    (record["properties"] if features else record)["change"] = change
+    return record
+
+
+@dataclass
+class DeltaCounts:
+    added: int = 0
+    moved: int = 0
+    removed: int = 0
+    unchanged: int = 0
+
+    def count(self, change: str | None) -> None:
+        if change == ADDED:
+            self.added += 1
+        elif change == MOVED:
+            self.moved += 1
+        else:
+            self.unchanged += 1
+
+    def summary(self) -> str:
+        return f"{self.added} added, {self.moved} moved, {self.removed} removed, {self.unchanged} unchanged"
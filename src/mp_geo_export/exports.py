@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Callable, Iterator
+
+from .queries import DEFAULT_RESOLUTION
+from .table import ExportTable
+
+# The pydantic models are imported where they are built: the CLI writes rows
+# straight from ``ExportTable`` and never needs them.
+if TYPE_CHECKING:
+    from .aio import BlockingAsyncClient
+    from .api import ApiClient
+    from .models import ModelExport
+
+KINDS = ("sweeps", "tags", "notes")
+
+
+@dataclass
+class CombinedExport:
+    """``export_all`` result: the model georeference and one ``ExportTable`` per kind."""
+
+    model: ModelExport
+    tables: dict[str, ExportTable]
+
+    def __getitem__(self, kind: str) -> ExportTable:
+        return self.tables[kind]
+
+
+def fetch_objects(
+    client: ApiClient | BlockingAsyncClient,
+    kind: str,
+    model_id: str,
+    resolution: str = DEFAULT_RESOLUTION,
+    on_progress: Callable[[str], None] | None = None,
+    fields: frozenset[str] | None = None,
+) -> list[dict[str, Any]]:
+    """Fetch the raw API objects for one export kind.
+
+    ``fields`` (output field names) trims what the API is asked for; None
+    requests everything, including skyboxes at ``resolution``.
+    """
+    return list(iter_objects(client, kind, model_id, on_progress, fields, resolution))
+
+
+def iter_objects(
+    client: ApiClient | BlockingAsyncClient,
+    kind: str,
+    model_id: str,
+    on_progress: Callable[[str], None] | None = None,
+    fields: frozenset[str] | None = None,
+    resolution: str = DEFAULT_RESOLUTION,
+) -> Iterator[dict[str, Any]]:
+    """Stream the raw API objects for one export kind as the listing response is parsed."""
+    if kind == "sweeps":
+        return client.iter_locations(model_id, on_progress=on_progress, fields=fields, resolution=resolution)
+    if kind == "tags":
+        return client.iter_tags(model_id, on_progress=on_progress, fields=fields)
+    if kind == "notes":
+        return client.iter_notes(model_id, on_progress=on_progress, fields=fields)
+    raise ValueError(f"Unsupported kind: {kind}. Use one of {', '.join(KINDS)}.")
+
+
+def fetch_combined(
+    client: ApiClient | BlockingAsyncClient,
+    model_id: str,
+    kinds: list[str],
+    on_progress: Callable[[str], None] | None = None,
+    fields: frozenset[str] | None = None,
+    resolution: str = DEFAULT_RESOLUTION,
+) -> tuple[dict[str, Any], dict[str, list[dict[str, Any]]]]:
+    """Fetch the model georeference and the raw objects of every kind in one request."""
+    unknown = [k for k in kinds if k not in KINDS]
+    if unknown or not kinds:
+        raise ValueError(f"Unsupported kinds: {', '.join(unknown) or kinds!r}. Use {', '.join(KINDS)}.")
+    return client.fetch_combined(model_id, kinds, on_progress=on_progress, fields=fields, resolution=resolution)
+
+
+def combined_points(
+    kinds: list[str], objects: dict[str, list[dict[str, Any]]]
+) -> tuple[list[dict[str, float]], dict[str, range]]:
+    """All kinds' points as one list, plus the index range each kind occupies in it."""
+    points: list[dict[str, float]] = []
+    spans: dict[str, range] = {}
+    for kind in kinds:
+        start = len(points)
+        points.extend(object_points(kind, objects[kind]))
+        spans[kind] = range(start, len(points))
+    return points, spans
+
+
+def object_points(kind: str, objects: list[dict[str, Any]]) -> list[dict[str, float]]:
+    """Local points to geocode, one per object (sweeps geocode their location)."""
+    key = "position" if kind == "sweeps" else "anchorPosition"
+    return [{"x": o[key]["x"], "y": o[key]["y"], "z": o[key]["z"]} for o in objects]
+
+
+def build_model_export(model: dict[str, Any], model_id: str) -> ModelExport:
+    """``ModelExport`` for a ``fetch_model_geocoordinates``/``fetch_combined`` model payload."""
+    from .models import GeoPoint, ModelExport, ModelGeoCoordinates, Quaternion
+
+    geocoords = model.get("geocoordinates") or {}
+    translation = geocoords.get("translation")
+    rotation = geocoords.get("rotation")
+    return ModelExport(
+        id=model.get("id") or model_id,
+        geocoordinates=ModelGeoCoordinates(
+            source=geocoords.get("source"),
+            altitude=geocoords.get("altitude"),
+            latitude=geocoords.get("latitude"),
+            longitude=geocoords.get("longitude"),
+            translation=GeoPoint(**translation) if translation else None,
+            rotation=Quaternion(**rotation) if rotation else None,
+        ),
+    )
+
+
+def model_feature(export: ModelExport) -> dict[str, Any] | None:
+    """GeoJSON Feature at the model anchor, or None if the model is not georeferenced."""
+    geocoords = export.geocoordinates
+    if geocoords.latitude is None or geocoords.longitude is None:
+        return None
+    return {
+        "type": "Feature",
+        "geometry": {"type": "Point", "coordinates": [geocoords.longitude, geocoords.latitude, geocoords.altitude]},
+        "properties": export.model_dump(),
+    }
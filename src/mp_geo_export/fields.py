@@ -0,0 +1,28 @@
+from __future__ import annotations
+
+from typing import Iterable
+
+# Optional output fields; every row always carries its id and geocode
+FIELDS = ("label", "text", "local", "skybox")
+ALWAYS = ("id", "geo")
+DEFAULT_FIELDS = frozenset(("label", "text", "local"))
+ALL_FIELDS = frozenset(FIELDS)
+
+
+def parse_fields(value: str | Iterable[str] | None, include_skybox: bool = False) -> frozenset[str]:
+    """Output fields from a comma list or iterable of names; None selects the defaults.
+
+    ``id`` and ``geo`` are accepted and ignored since they are always written.
+    ``include_skybox`` adds ``skybox`` to whatever was selected.
+    """
+    if value is None:
+        fields = set(DEFAULT_FIELDS)
+    else:
+        names = value.split(",") if isinstance(value, str) else list(value)
+        fields = {n.strip().lower() for n in names if n.strip()} - set(ALWAYS)
+        unknown = sorted(fields - ALL_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}. Use {', '.join(ALWAYS + FIELDS)}.")
+    if include_skybox:
+        fields.add("skybox")
+    return frozenset(fields)
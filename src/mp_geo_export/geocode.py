@@ -0,0 +1,414 @@
+from __future__ import annotations
+
+import random
+import time
+from concurrent.futures import Executor
+from dataclasses import dataclass, replace
+from typing import TYPE_CHECKING, Any, Callable
+
+from .cache import GeocodeCache, georeference_fingerprint
+from .dedup import DEFAULT_TOLERANCE, INFLIGHT, DedupPlan, DedupStats, requests_for
+from .journal import CheckpointJournal, JournalSlice
+from .results import GeocodeFailedError, PointResult
+from .transform import GeoTransform, haversine_m
+
+if TYPE_CHECKING:
+    from .aio import BlockingAsyncClient
+    from .api import ApiClient
+
+GEOCODE_MODES = ("remote", "local", "verify")
+
+# Max local-vs-remote error (meters) a ``verify`` run accepts
+DEFAULT_VERIFY_TOLERANCE = 1.0
+
+
+@dataclass
+class VerifyReport:
+    """Local-vs-remote comparison over a sample of points (errors in meters)."""
+
+    sampled: int
+    max_error_m: float
+    mean_error_m: float
+
+
+class VerifyToleranceError(RuntimeError):
+    """Raised when a ``verify`` spot-check finds the local transform off by more than the tolerance."""
+
+    def __init__(self, report: VerifyReport, tolerance: float) -> None:
+        self.report = report
+        self.tolerance = tolerance
+        super().__init__(
+            f"Local transform error {report.max_error_m:.3f} m over {report.sampled} sampled points "
+            f"exceeds tolerance of {tolerance} m"
+        )
+
+
+@dataclass
+class GeocodeOutcome:
+    """Per-point results of one ``geocode_points`` call, aligned with the input points."""
+
+    results: list[PointResult]
+    mode: str
+    verify: VerifyReport | None = None
+    cache_hits: int = 0
+    resumed: int = 0
+    reused: int = 0
+    dedup: DedupStats | None = None
+
+    @property
+    def geos(self) -> list[dict[str, Any] | None]:
+        """Resolved geos by input index; None where the point failed."""
+        return [r.geo for r in self.results]
+
+    @property
+    def failures(self) -> list[PointResult]:
+        return [r for r in self.results if not r.ok]
+
+    def raise_for_failures(self) -> None:
+        """Apply the ``fail`` policy: raise if any point was left unresolved."""
+        failures = self.failures
+        if failures:
+            raise GeocodeFailedError(failures, total=len(self.results))
+
+    def raise_for_verify(self, tolerance: float = DEFAULT_VERIFY_TOLERANCE) -> None:
+        """Raise if the ``verify`` spot-check's max error is over ``tolerance`` meters."""
+        if self.verify is not None and self.verify.max_error_m > tolerance:
+            raise VerifyToleranceError(self.verify, tolerance)
+
+
+def merge_outcomes(parts: list[tuple[int, GeocodeOutcome]], mode: str = "remote") -> GeocodeOutcome:
+    """Combine per-batch outcomes into one, re-indexing each batch's results by its ``offset``."""
+    results: list[PointResult] = []
+    for offset, outcome in parts:
+        results.extend(replace(r, index=offset + r.index) for r in outcome.results)
+    dedups = [o.dedup for _, o in parts if o.dedup is not None]
+    dedup = None
+    if dedups:
+        dedup = DedupStats(
+            points=sum(d.points for d in dedups),
+            unique=sum(d.unique for d in dedups),
+            coalesced=sum(d.coalesced for d in dedups),
+            requests_saved=sum(d.requests_saved for d in dedups),
+        )
+    reports = [o.verify for _, o in parts if o.verify is not None]
+    verify = None
+    if reports:
+        sampled = sum(r.sampled for r in reports)
+        verify = VerifyReport(
+            sampled=sampled,
+            max_error_m=max(r.max_error_m for r in reports),
+            mean_error_m=sum(r.mean_error_m * r.sampled for r in reports) / sampled if sampled else 0.0,
+        )
+    return GeocodeOutcome(
+        results=results,
+        mode=parts[0][1].mode if parts else mode,
+        verify=verify,
+        cache_hits=sum(o.cache_hits for _, o in parts),
+        resumed=sum(o.resumed for _, o in parts),
+        reused=sum(o.reused for _, o in parts),
+        dedup=dedup,
+    )
+
+
+def fetch_georeference(
+    client: ApiClient | BlockingAsyncClient, model_id: str, geocoordinates: dict[str, Any] | None = None
+) -> dict[str, Any]:
+    """The model's ``geocoordinates``, fetched unless the caller already has them."""
+    if geocoordinates is not None:
+        return geocoordinates
+    model = client.fetch_model_geocoordinates(model_id)
+    return model.get("geocoordinates") or {}
+
+
+def fetch_transform(
+    client: ApiClient | BlockingAsyncClient, model_id: str, geocoordinates: dict[str, Any] | None = None
+) -> GeoTransform:
+    """Fetch the model anchor once and build a local transform from it."""
+    return GeoTransform.from_geocoordinates(fetch_georeference(client, model_id, geocoordinates))
+
+
+def verify_transform(
+    client: ApiClient | BlockingAsyncClient,
+    model_id: str,
+    transform: GeoTransform,
+    points: list[dict[str, float]],
+    local_geos: list[dict[str, Any]],
+    sample_size: int = 10,
+    concurrency: int = 8,
+    points_per_request: int = 1,
+    executor: Executor | None = None,
+    seed: int | None = None,
+) -> VerifyReport:
+    """Spot-check local results against ``geoLocationOf`` for a random sample."""
+    if not points:
+        return VerifyReport(sampled=0, max_error_m=0.0, mean_error_m=0.0)
+    indexes = sorted(random.Random(seed).sample(range(len(points)), min(sample_size, len(points))))
+    remote = client.batch_geocode(
+        model_id,
+        [points[i] for i in indexes],
+        concurrency=concurrency,
+        points_per_request=points_per_request,
+        executor=executor,
+    )
+    errors = [
+        haversine_m(local_geos[i]["lat"], local_geos[i]["long"], r["lat"], r["long"])
+        for i, r in zip(indexes, remote)
+        if r is not None
+    ]
+    if not errors:
+        raise GeocodeFailedError(
+            [PointResult(index=i, error="geoLocationOf failed for every verify sample") for i in indexes]
+        )
+    return VerifyReport(
+        sampled=len(errors),
+        max_error_m=max(errors),
+        mean_error_m=sum(errors) / len(errors),
+    )
+
+
+def geocode_points(
+    client: ApiClient | BlockingAsyncClient,
+    model_id: str,
+    points: list[dict[str, float]],
+    mode: str = "remote",
+    concurrency: int = 8,
+    max_rps: float | None = None,
+    verify_sample: int = 10,
+    points_per_request: int = 1,
+    cache: GeocodeCache | None = None,
+    executor: Executor | None = None,
+    on_progress: Callable[[int, float], None] | None = None,
+    on_result: Callable[[int, dict[str, Any] | None], None] | None = None,
+    journal: CheckpointJournal | JournalSlice | None = None,
+    dedup_tolerance: float = DEFAULT_TOLERANCE,
+    geocoordinates: dict[str, Any] | None = None,
+    known: dict[int, dict[str, Any]] | None = None,
+) -> GeocodeOutcome:
+    """Resolve local points to lat/long/alt using the requested geocode mode.
+
+    ``remote`` calls ``geoLocationOf`` per point, ``local`` fetches the model
+    georeference once and transforms every point on the client, and ``verify``
+    does the local transform and spot-checks a sample against the API.
+    With a ``cache``, remote mode only requests points not already cached
+    under the model's current georeference. With a ``journal``, remote mode
+    skips points already journaled by an earlier run and records each new
+    result as it lands. Remote requests are deduplicated: points equal to
+    within ``dedup_tolerance`` meters are geocoded once, and points another
+    export in this process is already fetching are shared rather than
+    requested twice. ``on_result(index, geo)`` fires as each point resolves
+    so callers can stream output. Pass the model's ``geocoordinates`` when
+    they are already known (e.g. from a combined fetch) to skip requesting
+    the georeference again. ``known`` maps input indexes to geos carried over
+    from a previous export; remote mode takes those as they are.
+    """
+    mode = mode.lower()
+    if mode not in GEOCODE_MODES:
+        raise ValueError(f"Unsupported geocode mode: {mode}. Use one of {', '.join(GEOCODE_MODES)}.")
+    if mode == "remote":
+        return _remote_partial(
+            client, model_id, points, cache, journal, concurrency, max_rps, points_per_request, executor,
+            on_progress, on_result, dedup_tolerance, geocoordinates, known,
+        )
+
+    start_time = time.monotonic()
+    transform = fetch_transform(client, model_id, geocoordinates)
+    geos = transform.batch(points)
+    if on_result:
+        for i, geo in enumerate(geos):
+            on_result(i, geo)
+    if on_progress:
+        try:
+            elapsed = time.monotonic() - start_time
+            on_progress(len(geos), len(geos) / elapsed if elapsed > 0 else 0)
+        except Exception:
+            pass
+    report = None
+    if mode == "verify":
+        if max_rps is not None and client.controller is None:
+            client.max_rps = max_rps
+        report = verify_transform(
+            client,
+            model_id,
+            transform,
+            points,
+            geos,
+            sample_size=verify_sample,
+            concurrency=concurrency,
+            points_per_request=points_per_request,
+            executor=executor,
+        )
+    results = [PointResult(index=i, geo=geo) for i, geo in enumerate(geos)]
+    return GeocodeOutcome(results=results, mode=mode, verify=report)
+
+
+def _remote_partial(
+    client: ApiClient | BlockingAsyncClient,
+    model_id: str,
+    points: list[dict[str, float]],
+    cache: GeocodeCache | None,
+    journal: CheckpointJournal | JournalSlice | None,
+    concurrency: int,
+    max_rps: float | None,
+    points_per_request: int,
+    executor: Executor | None,
+    on_progress: Callable[[int, float], None] | None,
+    on_result: Callable[[int, dict[str, Any] | None], None] | None,
+    dedup_tolerance: float,
+    geocoordinates: dict[str, Any] | None = None,
+    previous: dict[int, dict[str, Any]] | None = None,
+) -> GeocodeOutcome:
+    """Remote geocode of only the points not already known, journaled or cached."""
+    known: list[dict[str, Any] | None] = [None] * len(points)
+    for i, geo in (previous or {}).items():
+        known[i] = geo
+    reused = sum(g is not None for g in known)
+    if journal is not None:
+        for i, geo in journal.resolved(points).items():
+            if known[i] is None:
+                known[i] = geo
+    resumed = sum(g is not None for g in known) - reused
+    fingerprint = ""
+    if cache is not None:
+        fingerprint = georeference_fingerprint(fetch_georeference(client, model_id, geocoordinates))
+        todo = [i for i, g in enumerate(known) if g is None]
+        for i, cached in zip(todo, cache.get_many(model_id, fingerprint, [points[i] for i in todo])):
+            if cached is not None:
+                known[i] = cached
+                if journal is not None:
+                    journal.record(i, points[i], cached)
+    results = [PointResult(index=i, geo=geo) for i, geo in enumerate(known)]
+    missing = [i for i, g in enumerate(known) if g is None]
+    hits = len(points) - len(missing)
+
+    def progress(completed: int, rate: float) -> None:
+        if on_progress:
+            on_progress(hits + completed, rate)
+
+    if hits:
+        progress(0, 0.0)
+        if on_result:
+            for i, hit in enumerate(known):
+                if hit is not None:
+                    on_result(i, hit)
+
+    def result(idx: int, geo: dict[str, Any] | None) -> None:
+        if journal is not None and geo is not None:
+            journal.record(missing[idx], points[missing[idx]], geo)
+        if on_result:
+            on_result(missing[idx], geo)
+
+    fresh, dedup = _geocode_unique(
+        client,
+        model_id,
+        [points[i] for i in missing],
+        concurrency=concurrency,
+        max_rps=max_rps,
+        on_progress=progress,
+        points_per_request=points_per_request,
+        executor=executor,
+        on_result=result,
+        tolerance=dedup_tolerance,
+    )
+    for i, r in zip(missing, fresh):
+        results[i] = replace(r, index=i)
+    if cache is not None:
+        resolved = [(points[missing[r.index]], r.geo) for r in fresh if r.geo is not None]
+        cache.put_many(model_id, fingerprint, [p for p, _ in resolved], [g for _, g in resolved])
+    return GeocodeOutcome(
+        results=results,
+        mode="remote",
+        cache_hits=hits - resumed - reused,
+        resumed=resumed,
+        reused=reused,
+        dedup=dedup,
+    )
+
+
+def _geocode_unique(
+    client: ApiClient | BlockingAsyncClient,
+    model_id: str,
+    points: list[dict[str, float]],
+    concurrency: int,
+    max_rps: float | None,
+    on_progress: Callable[[int, float], None] | None,
+    points_per_request: int,
+    executor: Executor | None,
+    on_result: Callable[[int, dict[str, Any] | None], None] | None,
+    tolerance: float,
+) -> tuple[list[PointResult], DedupStats]:
+    """``geocode_results`` over the distinct points, sharing in-flight requests process-wide.
+
+    Returns one result per input point and the dedup/coalescing counts.
+    """
+    plan = DedupPlan.build(points, tolerance)
+    owned, borrowed, registered = INFLIGHT.claim(model_id, plan.keys)
+    unique: list[PointResult] = [PointResult(index=pos) for pos in range(len(plan.keys))]
+    done = 0
+    start_time = time.monotonic()
+
+    def notify(pos: int, geo: dict[str, Any] | None) -> None:
+        nonlocal done
+        done += len(plan.groups[pos])
+        if on_result:
+            for i in plan.groups[pos]:
+                on_result(i, geo)
+
+    def progress(completed: int, rate: float) -> None:
+        if on_progress:
+            elapsed = time.monotonic() - start_time
+            on_progress(done, done / elapsed if elapsed > 0 else rate)
+
+    def fetch(positions: list[int], register: bool) -> None:
+        def result(idx: int, geo: dict[str, Any] | None) -> None:
+            if register:
+                INFLIGHT.resolve(model_id, plan.keys[positions[idx]], geo)
+            notify(positions[idx], geo)
+
+        if not positions:
+            return
+        fetched = client.geocode_results(
+            model_id,
+            [plan.points[p] for p in positions],
+            concurrency=concurrency,
+            max_rps=max_rps,
+            on_progress=progress,
+            points_per_request=points_per_request,
+            executor=executor,
+            on_result=result,
+        )
+        for r in fetched:
+            unique[positions[r.index]] = replace(r, index=positions[r.index])
+
+    try:
+        fetch(owned, register=True)
+    except BaseException as exc:
+        INFLIGHT.release(model_id, [plan.keys[p] for p in owned], registered, exc)
+        raise
+    INFLIGHT.release(model_id, [plan.keys[p] for p in owned], registered, RuntimeError("Geocode not resolved"))
+
+    # Points another export was already fetching: wait for its result, and
+    # fetch them ourselves only if that export failed
+    retry: list[int] = []
+    for pos, future in borrowed.items():
+        try:
+            geo = future.result()
+        except Exception:
+            geo = None
+        if geo is None:
+            retry.append(pos)
+            continue
+        unique[pos] = PointResult(index=pos, geo=geo)
+        notify(pos, geo)
+    fetch(retry, register=False)
+    if borrowed:
+        progress(done, 0.0)
+
+    requested = len(owned) + len(retry)
+    stats = DedupStats(
+        points=len(points),
+        unique=len(plan.keys),
+        coalesced=len(borrowed) - len(retry),
+        requests_saved=requests_for(len(points), points_per_request) - requests_for(requested, points_per_request),
+    )
+    expanded = plan.expand(unique)
+    return [replace(r, index=i) for i, r in enumerate(expanded)], stats
@@ -0,0 +1,231 @@
+from __future__ import annotations
+
+import bisect
+import json
+import re
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, TextIO
+
+# Event types emitted by the API clients
+REQUEST_START = "request_start"
+REQUEST_END = "request_end"
+RETRY = "retry"
+THROTTLE_WAIT = "throttle_wait"
+GRAPHQL_ERROR = "graphql_error"
+
+# Latency histogram bucket bounds in seconds (Prometheus client defaults)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_OPERATION = re.compile(r"\b(?:query|mutation)\s+(\w+)")
+
+
+@lru_cache(maxsize=128)
+def operation_name(query: str) -> str:
+    """The GraphQL operation name of a document (``getSweeps``), or ``anonymous``."""
+    match = _OPERATION.search(query)
+    return match.group(1) if match else "anonymous"
+
+
+@dataclass(frozen=True)
+class RequestEvent:
+    """One step of a GraphQL request as seen by the client.
+
+    ``attempt`` is 1 for the first try of a request and counts up on retries.
+    ``latency`` and ``status`` are set on ``request_end`` (status None when
+    the transport failed), ``wait`` on ``throttle_wait`` (time the rate
+    limiter held the request) and ``retry`` (backoff before the next
+    attempt), and ``error`` on failures.
+    """
+
+    type: str
+    operation: str
+    attempt: int
+    time: float = field(default_factory=time.time)
+    status: int | None = None
+    latency: float | None = None
+    bytes: int | None = None
+    wait: float | None = None
+    error: str | None = None
+
+    def to_dict(self) -> dict[str, Any]:
+        return {k: v for k, v in asdict(self).items() if v is not None}
+
+
+Observer = Callable[[RequestEvent], None]
+
+
+def notify(observers: list[Observer], event: RequestEvent) -> None:
+    """Hand ``event`` to each observer; a failing observer never breaks the request."""
+    for observer in observers:
+        try:
+            observer(event)
+        except Exception:
+            pass
+
+
+@dataclass
+class _OperationStats:
+    requests: int = 0
+    statuses: dict[str, int] = field(default_factory=dict)
+    buckets: list[int] = field(default_factory=lambda: [0] * (len(LATENCY_BUCKETS) + 1))
+    latency_sum: float = 0.0
+    latency_max: float = 0.0
+    retries: int = 0
+    graphql_errors: int = 0
+    throttle_wait: float = 0.0
+    bytes: int = 0
+
+
+class MetricsRecorder:
+    """Observer aggregating events into per-operation counters and latency histograms.
+
+    Memory is constant in the number of requests. ``summary`` gives the
+    lines printed after an export and ``prometheus`` the text exposition
+    format.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._ops: dict[str, _OperationStats] = {}
+
+    def __call__(self, event: RequestEvent) -> None:
+        with self._lock:
+            stats = self._ops.setdefault(event.operation, _OperationStats())
+            if event.type == REQUEST_END:
+                stats.requests += 1
+                status = str(event.status) if event.status is not None else "error"
+                stats.statuses[status] = stats.statuses.get(status, 0) + 1
+                if event.latency is not None:
+                    stats.buckets[bisect.bisect_left(LATENCY_BUCKETS, event.latency)] += 1
+                    stats.latency_sum += event.latency
+                    stats.latency_max = max(stats.latency_max, event.latency)
+                stats.bytes += event.bytes or 0
+            elif event.type == RETRY:
+                stats.retries += 1
+            elif event.type == GRAPHQL_ERROR:
+                stats.graphql_errors += 1
+            elif event.type == THROTTLE_WAIT:
+                stats.throttle_wait += event.wait or 0.0
+
+    def _merged(self) -> _OperationStats:
+        total = _OperationStats()
+        for stats in self._ops.values():
+            total.requests += stats.requests
+            for status, n in stats.statuses.items():
+                total.statuses[status] = total.statuses.get(status, 0) + n
+            total.buckets = [a + b for a, b in zip(total.buckets, stats.buckets)]
+            total.latency_sum += stats.latency_sum
+            total.latency_max = max(total.latency_max, stats.latency_max)
+            total.retries += stats.retries
+            total.graphql_errors += stats.graphql_errors
+            total.throttle_wait += stats.throttle_wait
+            total.bytes += stats.bytes
+        return total
+
+    @staticmethod
+    def _quantile(buckets: list[int], q: float) -> float:
+        """Upper bound of the bucket holding quantile ``q`` (inf past the last bound)."""
+        target = q * sum(buckets)
+        seen = 0
+        for bound, count in zip(LATENCY_BUCKETS + (float("inf"),), buckets):
+            seen += count
+            if count and seen >= target:
+                return bound
+        return float("inf")
+
+    def summary(self) -> list[str]:
+        with self._lock:
+            total = self._merged()
+        if not total.requests:
+            return []
+        statuses = ", ".join(f"{s}: {n}" for s, n in sorted(total.statuses.items()))
+        lines = [
+            f"Requests: {total.requests} ({statuses}), {total.retries} retries, "
+            f"{total.graphql_errors} GraphQL errors, {total.bytes / 1024:.1f} KiB received",
+            f"Latency: mean {total.latency_sum / total.requests * 1000:.1f} ms, "
+            f"p50 <= {self._fmt(self._quantile(total.buckets, 0.5))}, "
+            f"p95 <= {self._fmt(self._quantile(total.buckets, 0.95))}, "
+            f"p99 <= {self._fmt(self._quantile(total.buckets, 0.99))}, max {total.latency_max * 1000:.1f} ms; "
+            f"rate limiter wait {total.throttle_wait:.2f}s",
+        ]
+        peak = max(total.buckets)
+        for bound, count in zip(LATENCY_BUCKETS + (float("inf"),), total.buckets):
+            if count:
+                lines.append(f"  <= {self._fmt(bound):>8} {'#' * max(1, round(count / peak * 30)):<30} {count}")
+        return lines
+
+    @staticmethod
+    def _fmt(seconds: float) -> str:
+        if seconds == float("inf"):
+            return "inf"
+        return f"{seconds * 1000:g} ms" if seconds < 1 else f"{seconds:g} s"
+
+    def prometheus(self, prefix: str = "mp_geo_export") -> str:
+        """All counters and histograms in the Prometheus text exposition format."""
+        with self._lock:
+            ops = sorted(self._ops.items())
+        out: list[str] = []
+
+        def family(name: str, kind: str, help: str) -> str:
+            metric = f"{prefix}_{name}"
+            out.append(f"# HELP {metric} {help}")
+            out.append(f"# TYPE {metric} {kind}")
+            return metric
+
+        metric = family("requests_total", "counter", "GraphQL HTTP requests by operation and status.")
+        for op, stats in ops:
+            for status, n in sorted(stats.statuses.items()):
+                out.append(f'{metric}{{operation="{op}",status="{status}"}} {n}')
+        metric = family("request_duration_seconds", "histogram", "GraphQL HTTP request latency.")
+        for op, stats in ops:
+            cumulative = 0
+            for bound, count in zip(LATENCY_BUCKETS + (float("inf"),), stats.buckets):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                out.append(f'{metric}_bucket{{operation="{op}",le="{le}"}} {cumulative}')
+            out.append(f'{metric}_sum{{operation="{op}"}} {stats.latency_sum!r}')
+            out.append(f'{metric}_count{{operation="{op}"}} {stats.requests}')
+        for name, attr, kind, help in (
+            ("retries_total", "retries", "counter", "Request attempts retried after a failure."),
+            ("graphql_errors_total", "graphql_errors", "counter", "Responses carrying GraphQL errors."),
+            ("throttle_wait_seconds_total", "throttle_wait", "counter", "Time requests waited on the rate limiter."),
+            ("response_bytes_total", "bytes", "counter", "Response body bytes received."),
+        ):
+            metric = family(name, kind, help)
+            for op, stats in ops:
+                out.append(f'{metric}{{operation="{op}"}} {getattr(stats, attr)!r}')
+        return "\n".join(out) + "\n"
+
+    def write_prometheus(self, path: Path) -> None:
+        Path(path).write_text(self.prometheus())
+
+
+class TraceWriter:
+    """Observer appending every event as one JSON line to a trace file."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._fh: TextIO | None = self.path.open("w")
+
+    def __call__(self, event: RequestEvent) -> None:
+        line = json.dumps(event.to_dict(), separators=(",", ":")) + "\n"
+        with self._lock:
+            if self._fh is not None:
+                self._fh.write(line)
+
+    def __enter__(self) -> "TraceWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:  # type: ignore[no-untyped-def]
+        self.close()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._fh is not None:
+                self._fh.close()
+                self._fh = None
@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import json
+import threading
+from pathlib import Path
+from typing import Any, TextIO
+
+JOURNAL_VERSION = 1
+JOURNAL_SUFFIX = ".journal"
+
+
+class JournalMismatchError(ValueError):
+    """The journal on disk belongs to a different model or export kind."""
+
+
+def journal_path(out_path: Path) -> Path:
+    """Checkpoint journal location for an output file: ``<out>.journal`` beside it."""
+    out_path = Path(out_path)
+    return out_path.with_name(out_path.name + JOURNAL_SUFFIX)
+
+
+class CheckpointJournal:
+    """Append-only log of points geocoded so far for one export.
+
+    The first line is a header naming the model and export kind; every later
+    line records one resolved point by index together with its local
+    coordinates, so entries are only reused for the identical input. Lines are
+    flushed as they are written, and a torn final line from a crash is ignored
+    on load. With ``resume`` an existing journal is read and appended to;
+    otherwise it is started afresh.
+    """
+
+    def __init__(self, path: Path, model_id: str, kind: str, resume: bool = False) -> None:
+        self.path = Path(path)
+        self.model_id = model_id
+        self.kind = kind
+        self._entries: dict[int, tuple[list[float], dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+        self._fh: TextIO | None = None
+        if resume and self.path.exists():
+            torn = self._load()
+            self._fh = self.path.open("a")
+            if torn:
+                self._fh.write("\n")
+        else:
+            self._fh = self.path.open("w")
+            self._write({"version": JOURNAL_VERSION, "model_id": model_id, "kind": kind})
+
+    def __enter__(self) -> "CheckpointJournal":
+        return self
+
+    def __exit__(self, *exc_info) -> None:  # type: ignore[no-untyped-def]
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _load(self) -> bool:
+        """Read header and entries; returns True if the file ends mid-line."""
+        with self.path.open() as fh:
+            text = fh.read()
+        lines = text.splitlines()
+        try:
+            header = json.loads(lines[0])
+        except (IndexError, ValueError):
+            raise JournalMismatchError(f"Checkpoint journal {self.path} has no valid header") from None
+        if header.get("model_id") != self.model_id or header.get("kind") != self.kind:
+            raise JournalMismatchError(
+                f"Checkpoint journal {self.path} is for {header.get('kind')} of model {header.get('model_id')}, "
+                f"not {self.kind} of model {self.model_id}"
+            )
+        for line in lines[1:]:
+            try:
+                entry = json.loads(line)
+                self._entries[int(entry["i"])] = (entry["p"], entry["geo"])
+            except (ValueError, KeyError, TypeError):
+                continue
+        return not text.endswith("\n")
+
+    def _write(self, record: dict[str, Any]) -> None:
+        assert self._fh is not None
+        self._fh.write(json.dumps(record, separators=(",", ":")) + "\n")
+        self._fh.flush()
+
+    def resolved(self, points: list[dict[str, float]], offset: int = 0) -> dict[int, dict[str, Any]]:
+        """Journaled results whose index and coordinates still match ``points``.
+
+        ``points[0]`` is export point ``offset``; keys of the result index ``points``.
+        """
+        out: dict[int, dict[str, Any]] = {}
+        for i, (xyz, geo) in self._entries.items():
+            j = i - offset
+            if 0 <= j < len(points) and xyz == [points[j]["x"], points[j]["y"], points[j]["z"]]:
+                out[j] = geo
+        return out
+
+    def record(self, index: int, point: dict[str, float], geo: dict[str, Any]) -> None:
+        xyz = [point["x"], point["y"], point["z"]]
+        with self._lock:
+            self._entries[index] = (xyz, geo)
+            self._write({"i": index, "p": xyz, "geo": geo})
+
+    def slice(self, offset: int) -> "JournalSlice":
+        """View for a batch whose point 0 is point ``offset`` of the whole export."""
+        return JournalSlice(self, offset)
+
+    def close(self) -> None:
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+
+    def discard(self) -> None:
+        """Close and delete the journal once the export it protects has been written."""
+        self.close()
+        self.path.unlink(missing_ok=True)
+
+
+class JournalSlice:
+    """A ``CheckpointJournal`` seen through batch-local indexes, for pipelined exports."""
+
+    def __init__(self, journal: CheckpointJournal, offset: int) -> None:
+        self.journal = journal
+        self.offset = offset
+
+    def resolved(self, points: list[dict[str, float]]) -> dict[int, dict[str, Any]]:
+        return self.journal.resolved(points, self.offset)
+
+    def record(self, index: int, point: dict[str, float], geo: dict[str, Any]) -> None:
+        self.journal.record(index + self.offset, point, geo)
@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+import codecs
+import json
+from typing import Any
+
+_WHITESPACE = " \t\n\r"
+# Characters that can follow a prefix of a JSON number inside the same number
+_NUMBER_TAIL = frozenset(".eE+-0123456789")
+
+# Parser states
+_START, _KEY_OR_END, _AFTER_MEMBER, _ITEM_OR_END, _AFTER_ITEM, _DONE = range(6)
+
+
+class _NeedMore(Exception):
+    pass
+
+
+class ArrayParser:
+    """Incremental parser yielding the elements of one array inside a JSON document.
+
+    ``path`` names the object keys leading to the array, e.g. ``("data",
+    "model", "locations")``. Bytes go in through ``feed`` in chunks of any
+    size, and each call returns the elements completed so far. Only the
+    current element is held in memory, never the whole document. Members
+    found along the way that are not on the path, such as a top-level
+    ``errors`` list, are decoded whole and kept in ``members`` keyed by
+    their own path. ``depth`` counts the objects on the path that were
+    entered, so ``depth == 0`` after ``close`` means the document had no
+    ``path[0]`` object.
+    """
+
+    def __init__(self, path: tuple[str, ...]) -> None:
+        if not path:
+            raise ValueError("path must not be empty")
+        self.path = path
+        self.members: dict[tuple[str, ...], Any] = {}
+        self.depth = 0
+        self._level = 0
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._json = json.JSONDecoder()
+        self._buf = ""
+        self._pos = 0
+        self._state = _START
+        self._eof = False
+        # Don't retry a value that did not fit until the buffer has grown this
+        # much, so a long value is re-scanned a logarithmic number of times
+        self._wait_for = 0
+
+    def feed(self, data: bytes) -> list[Any]:
+        self._buf = self._buf[self._pos:] + self._decoder.decode(data)
+        self._pos = 0
+        if len(self._buf) < self._wait_for:
+            return []
+        return self._run()
+
+    def close(self) -> list[Any]:
+        """Parse what is left and check that the document was complete."""
+        self._buf = self._buf[self._pos:] + self._decoder.decode(b"", final=True)
+        self._pos = 0
+        self._eof = True
+        items = self._run()
+        if self._state != _DONE:
+            raise ValueError("Truncated JSON document")
+        if self._buf[self._pos:].strip(_WHITESPACE):
+            raise ValueError("Extra data after JSON document")
+        return items
+
+    def _run(self) -> list[Any]:
+        items: list[Any] = []
+        while self._state != _DONE:
+            mark = self._pos
+            try:
+                self._step(items)
+            except _NeedMore:
+                if self._eof:
+                    raise ValueError("Truncated JSON document") from None
+                self._pos = mark
+                self._wait_for = 2 * (len(self._buf) - mark)
+                break
+        else:
+            self._wait_for = 0
+        return items
+
+    def _peek(self) -> str:
+        buf, pos = self._buf, self._pos
+        while pos < len(buf) and buf[pos] in _WHITESPACE:
+            pos += 1
+        self._pos = pos
+        if pos >= len(buf):
+            raise _NeedMore()
+        return buf[pos]
+
+    def _expect(self, char: str) -> None:
+        if self._peek() != char:
+            raise ValueError(f"Expected {char!r} at offset {self._pos} of the buffered JSON")
+        self._pos += 1
+
+    def _value(self) -> Any:
+        self._peek()
+        try:
+            value, end = self._json.raw_decode(self._buf, self._pos)
+        except json.JSONDecodeError:
+            if self._eof:
+                raise
+            raise _NeedMore() from None
+        # A number may continue in the next chunk if it runs to the end of the
+        # buffer or stops where "1." or "3.5e" would (raw_decode reads 1 and 3.5)
+        if not self._eof and isinstance(value, (int, float)) and not isinstance(value, bool):
+            if end == len(self._buf) or self._buf[end] in _NUMBER_TAIL:
+                raise _NeedMore()
+        self._pos = end
+        return value
+
+    def _close_object(self) -> None:
+        if self._level == 0:
+            self._state = _DONE
+        else:
+            self._level -= 1
+            self._state = _AFTER_MEMBER
+
+    def _step(self, items: list[Any]) -> None:
+        state = self._state
+        if state == _START:
+            self._expect("{")
+            self._state = _KEY_OR_END
+        elif state == _KEY_OR_END:
+            if self._peek() == "}":
+                self._pos += 1
+                self._close_object()
+                return
+            key = self._value()
+            if not isinstance(key, str):
+                raise ValueError("Expected an object key in the JSON document")
+            self._expect(":")
+            level = self._level
+            on_path = key == self.path[level]
+            last = level == len(self.path) - 1
+            if on_path and self._peek() == ("[" if last else "{"):
+                self._pos += 1
+                if last:
+                    self._state = _ITEM_OR_END
+                else:
+                    self._level += 1
+                    self.depth = max(self.depth, self._level)
+                    self._state = _KEY_OR_END
+                return
+            self.members[self.path[:level] + (key,)] = self._value()
+            self._state = _AFTER_MEMBER
+        elif state == _AFTER_MEMBER:
+            char = self._peek()
+            self._pos += 1
+            if char == ",":
+                self._state = _KEY_OR_END
+            elif char == "}":
+                self._close_object()
+            else:
+                raise ValueError(f"Expected ',' or '}}' in the JSON document, got {char!r}")
+        elif state == _ITEM_OR_END:
+            if self._peek() == "]":
+                self._pos += 1
+                self._state = _AFTER_MEMBER
+                return
+            items.append(self._value())
+            self._state = _AFTER_ITEM
+        elif state == _AFTER_ITEM:
+            char = self._peek()
+            self._pos += 1
+            if char == ",":
+                self._state = _ITEM_OR_END
+            elif char == "]":
+                self._state = _AFTER_MEMBER
+            else:
+                raise ValueError(f"Expected ',' or ']' in the JSON document, got {char!r}")
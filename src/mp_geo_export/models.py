@@ -18,7 +18,7 @@ class LatLng(BaseModel):
 class PanoExport(BaseModel):
     id: str
     local: GeoPoint
-    geo: LatLng
+    geo: LatLng | None = None
     skyboxImages: list[str] | None = None
 
 
@@ -26,14 +26,14 @@ class TagExport(BaseModel):
     id: str
     label: str | None = None
     local: GeoPoint
-    geo: LatLng
+    geo: LatLng | None = None
 
 
 class NoteExport(BaseModel):
     id: str
     text: str | None = None
     local: GeoPoint
-    geo: LatLng
+    geo: LatLng | None = None
 
 
 class Quaternion(BaseModel):
@@ -0,0 +1,218 @@
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable, Iterator
+
+from .exports import object_points
+from .geocode import GeocodeOutcome, merge_outcomes
+
+# One unit of listing output: raw objects of one or more kinds, in export order
+Batch = list[tuple[str, list[dict[str, Any]]]]
+
+# geocode(points, offset, emit) -> outcome; emit(index, geo) takes batch-local indexes
+GeocodeFn = Callable[[list[dict[str, float]], int, Callable[[int, "dict[str, Any] | None"], None]], GeocodeOutcome]
+
+DEFAULT_DEPTH = 4
+# Objects per batch when a streamed listing is cut up for the geocoder
+LISTING_BATCH = 1000
+DEFAULT_MAX_PENDING = 1024
+
+_POLL = 0.05
+
+
+class _Stopped(Exception):
+    """Raised inside a stage once another stage has failed or the consumer has quit."""
+
+
+@dataclass
+class _Failed:
+    exc: BaseException
+
+
+_DONE = object()
+
+
+def batched(kind: str, objects: Iterable[dict[str, Any]], size: int = LISTING_BATCH) -> Iterator[Batch]:
+    """Cut a streamed listing of one kind into pipeline batches of up to ``size`` objects."""
+    batch: list[dict[str, Any]] = []
+    for obj in objects:
+        batch.append(obj)
+        if len(batch) >= size:
+            yield [(kind, batch)]
+            batch = []
+    if batch:
+        yield [(kind, batch)]
+
+
+@dataclass
+class StageTimes:
+    """Where one pipelined export spent its time, in seconds.
+
+    ``*_blocked`` is time a stage waited on a full queue downstream
+    (backpressure), ``write_idle`` time the writer waited for work, and
+    ``first_geocode`` how far into the run geocoding started.
+    """
+
+    fetch: float = 0.0
+    fetch_blocked: float = 0.0
+    geocode: float = 0.0
+    geocode_blocked: float = 0.0
+    write: float = 0.0
+    write_idle: float = 0.0
+    first_geocode: float | None = None
+    elapsed: float = 0.0
+    batches: int = 0
+
+    def summary(self) -> str:
+        started = f"{self.first_geocode:.2f}s" if self.first_geocode is not None else "-"
+        return (
+            f"Pipeline: {self.batches} batches; fetch {self.fetch:.2f}s (blocked {self.fetch_blocked:.2f}s), "
+            f"geocode {self.geocode:.2f}s (blocked {self.geocode_blocked:.2f}s), write {self.write:.2f}s "
+            f"(idle {self.write_idle:.2f}s); geocoding started at {started} of {self.elapsed:.2f}s"
+        )
+
+
+@dataclass
+class PipelineResult:
+    outcome: GeocodeOutcome
+    times: StageTimes
+    points: int
+
+
+def run_pipeline(
+    source: Iterable[Batch],
+    geocode: GeocodeFn,
+    on_objects: Callable[[str, list[dict[str, Any]]], None],
+    on_result: Callable[[int, "dict[str, Any] | None"], None],
+    depth: int = DEFAULT_DEPTH,
+    max_pending: int = DEFAULT_MAX_PENDING,
+) -> PipelineResult:
+    """List, geocode and write an export with the three stages overlapping.
+
+    Iterating ``source`` (the listing) runs on one thread and geocoding on
+    another, while model construction and writing (``on_objects`` and
+    ``on_result``) run on the calling thread. Up to ``depth`` listed batches
+    wait for the geocoder and up to ``max_pending`` results wait for the
+    writer; a full queue blocks the stage feeding it, so memory is bounded by
+    the slowest stage rather than the model size. ``on_objects(kind,
+    objects)`` for a batch always arrives before ``on_result(index, geo)``
+    for its points, and indexes count across batches. An exception in any
+    stage stops the others and is re-raised here.
+    """
+    times = StageTimes()
+    stop = threading.Event()
+    batches: queue.Queue[Any] = queue.Queue(maxsize=max(1, depth))
+    results: queue.Queue[Any] = queue.Queue(maxsize=max(1, max_pending))
+    start = time.monotonic()
+
+    def put(q: queue.Queue[Any], item: Any) -> float:
+        """Put that gives up once the pipeline is stopping; returns the time spent blocked."""
+        began = time.monotonic()
+        while True:
+            if stop.is_set():
+                raise _Stopped()
+            try:
+                q.put(item, timeout=_POLL)
+                return time.monotonic() - began
+            except queue.Full:
+                continue
+
+    def get(q: queue.Queue[Any]) -> Any:
+        while True:
+            if stop.is_set():
+                raise _Stopped()
+            try:
+                return q.get(timeout=_POLL)
+            except queue.Empty:
+                continue
+
+    def fetch_stage() -> None:
+        try:
+            batch_iter = iter(source)
+            while True:
+                began = time.monotonic()
+                try:
+                    batch = next(batch_iter)
+                except StopIteration:
+                    break
+                finally:
+                    times.fetch += time.monotonic() - began
+                times.fetch_blocked += put(batches, batch)
+            put(batches, _DONE)
+        except _Stopped:
+            pass
+        except BaseException as exc:
+            try:
+                put(batches, _Failed(exc))
+            except _Stopped:
+                pass
+
+    def geocode_stage() -> None:
+        parts: list[tuple[int, GeocodeOutcome]] = []
+        offset = 0
+        try:
+            while True:
+                item = get(batches)
+                if item is _DONE:
+                    break
+                if isinstance(item, _Failed):
+                    put(results, item)
+                    return
+                points: list[dict[str, float]] = []
+                for kind, objects in item:
+                    times.geocode_blocked += put(results, ("objects", kind, objects))
+                    points.extend(object_points(kind, objects))
+                times.batches += 1
+                if times.first_geocode is None:
+                    times.first_geocode = time.monotonic() - start
+                blocked = [0.0]
+
+                def emit(index: int, geo: dict[str, Any] | None, base: int = offset) -> None:
+                    blocked[0] += put(results, ("geo", base + index, geo))
+
+                began = time.monotonic()
+                outcome = geocode(points, offset, emit)
+                times.geocode += time.monotonic() - began - blocked[0]
+                times.geocode_blocked += blocked[0]
+                parts.append((offset, outcome))
+                offset += len(points)
+            put(results, ("done", merge_outcomes(parts), offset))
+        except _Stopped:
+            pass
+        except BaseException as exc:
+            try:
+                put(results, _Failed(exc))
+            except _Stopped:
+                pass
+
+    threads = [
+        threading.Thread(target=fetch_stage, name="export-fetch", daemon=True),
+        threading.Thread(target=geocode_stage, name="export-geocode", daemon=True),
+    ]
+    for thread in threads:
+        thread.start()
+    try:
+        while True:
+            began = time.monotonic()
+            item = results.get()
+            times.write_idle += time.monotonic() - began
+            if isinstance(item, _Failed):
+                raise item.exc
+            began = time.monotonic()
+            if item[0] == "objects":
+                on_objects(item[1], item[2])
+            elif item[0] == "geo":
+                on_result(item[1], item[2])
+            else:
+                outcome, total = item[1], item[2]
+                break
+            times.write += time.monotonic() - began
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join()
+    times.elapsed = time.monotonic() - start
+    return PipelineResult(outcome=outcome, times=times, points=total)
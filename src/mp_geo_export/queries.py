@@ -1,40 +1,5 @@
-GET_SWEEPS = """
-query getSweeps($modelId: ID!) {
-  model(id: $modelId) {
-    locations {
-      id
-      position { x y z }
-      panos {
-        skybox { children }
-      }
-    }
-  }
-}
-"""
-
-GET_TAGS = """
-query getTags($modelId: ID!) {
-  model(id: $modelId) {
-    mattertags {
-      id
-      label
-      anchorPosition { x y z }
-    }
-  }
-}
-"""
-
-GET_NOTES = """
-query getNotes($modelId: ID!) {
-  model(id: $modelId) {
-    notes {
-      id
-      label
-      anchorPosition { x y z }
-    }
-  }
-}
-"""
+import json
+from functools import lru_cache
 
 GET_GEO = """
 query getLatLongOfModelPoint($modelId: ID!, $point: IPoint3D!) {
@@ -46,6 +11,17 @@ query getLatLongOfModelPoint($modelId: ID!, $point: IPoint3D!) {
 }
 """
 
+GEOCOORDINATE_FRAGMENT = """
+fragment GeoCoordinateFragment on GeoCoordinate {
+  source
+  altitude
+  latitude
+  longitude
+  translation { x y z }
+  rotation { x y z w }
+}
+"""
+
 GET_MODEL_GEOCOORDINATES = """
 query getGeoCoordinates($modelId: ID!) {
   model(id: $modelId) {
@@ -55,15 +31,103 @@ query getGeoCoordinates($modelId: ID!) {
     }
   }
 }
+""" + GEOCOORDINATE_FRAGMENT
 
-fragment GeoCoordinateFragment on GeoCoordinate {
-  source
-  altitude
-  latitude
-  longitude
-  translation { x y z }
-  rotation { x y z w }
-}
+# Field under ``model`` holding each export kind
+KIND_FIELDS = {"sweeps": "locations", "tags": "mattertags", "notes": "notes"}
+
+# Default skybox image resolution
+DEFAULT_RESOLUTION = "2k"
+
+
+def _selection(kind: str, fields: frozenset[str] | None, resolution: str) -> str:
+    """The ``model`` field listing ``kind``, selecting only what ``fields`` will write.
+
+    Positions are always selected since every point is geocoded. Sweeps ask
+    for pano skyboxes only when ``skybox`` is selected; otherwise just pano
+    ids, which are enough to emit one row per pano.
+    """
+    if kind not in KIND_FIELDS:
+        raise ValueError(f"Unsupported kind: {kind}. Use one of {', '.join(KIND_FIELDS)}.")
+    lines = ["id"]
+    if kind == "sweeps":
+        lines.append("position { x y z }")
+        if fields is None or "skybox" in fields:
+            lines += ["panos {", f"  skybox(resolution: {json.dumps(resolution)}) {{ children }}", "}"]
+        else:
+            lines.append("panos { id }")
+    else:
+        if fields is None or ("label" if kind == "tags" else "text") in fields:
+            lines.append("label")
+        lines.append("anchorPosition { x y z }")
+    body = "\n".join(f"      {line}" for line in lines)
+    return f"    {KIND_FIELDS[kind]} {{\n{body}\n    }}"
+
+
+_OPERATIONS = {"sweeps": "getSweeps", "tags": "getTags", "notes": "getNotes"}
+
+
+@lru_cache(maxsize=64)
+def build_listing_query(kind: str, fields: frozenset[str] | None = None, resolution: str = DEFAULT_RESOLUTION) -> str:
+    """Build the document listing one kind, selecting only the API fields ``fields`` needs.
+
+    ``fields`` holds output field names (see ``fields.FIELDS``); None selects
+    everything, including skyboxes at ``resolution``.
+    """
+    return f"""
+query {_OPERATIONS.get(kind, kind)}($modelId: ID!) {{
+  model(id: $modelId) {{
+{_selection(kind, fields, resolution)}
+  }}
+}}
 """
 
 
+GET_SWEEPS = build_listing_query("sweeps")
+GET_TAGS = build_listing_query("tags")
+GET_NOTES = build_listing_query("notes")
+
+
+@lru_cache(maxsize=64)
+def build_batch_geo_query(count: int) -> str:
+    """Build one document resolving ``count`` points via aliased ``geoLocationOf`` fields.
+
+    Points are passed as ``$p0``..``$p{count-1}`` and come back under the same aliases.
+    """
+    if count < 1:
+        raise ValueError("count must be >= 1")
+    params = ", ".join(f"$p{i}: IPoint3D!" for i in range(count))
+    fields = "\n".join(f"      p{i}: geoLocationOf(modelLocation: $p{i}) {{ lat long }}" for i in range(count))
+    return f"""
+query getLatLongOfModelPoints($modelId: ID!, {params}) {{
+  model(id: $modelId) {{
+    geocoordinates {{
+{fields}
+    }}
+  }}
+}}
+"""
+
+
+@lru_cache(maxsize=16)
+def build_combined_query(
+    kinds: tuple[str, ...], fields: frozenset[str] | None = None, resolution: str = DEFAULT_RESOLUTION
+) -> str:
+    """Build one document listing every kind in ``kinds`` plus the model georeference."""
+    if not kinds:
+        raise ValueError("kinds must not be empty")
+    unknown = [k for k in kinds if k not in KIND_FIELDS]
+    if unknown:
+        raise ValueError(f"Unsupported kinds: {', '.join(unknown)}. Use {', '.join(KIND_FIELDS)}.")
+    selections = "\n".join(_selection(k, fields, resolution) for k in kinds)
+    return f"""
+query getExport($modelId: ID!) {{
+  model(id: $modelId) {{
+    id
+{selections}
+    geocoordinates {{
+      ...GeoCoordinateFragment
+    }}
+  }}
+}}
+""" + GEOCOORDINATE_FRAGMENT
@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class LimiterStats:
+    """Snapshot of a limiter's counters."""
+
+    acquired: int
+    waited: int
+    time_blocked: float
+
+    @property
+    def wait_ratio(self) -> float:
+        return self.waited / self.acquired if self.acquired else 0.0
+
+
+class TokenBucket:
+    """Thread-safe token bucket: ``rate`` tokens/second with up to ``burst`` banked.
+
+    Callers reserve a token under the lock and sleep outside it, so waiters are
+    served in arrival order and the aggregate rate never exceeds ``rate``
+    regardless of how many threads (or clients) share the bucket.
+    A ``rate`` of 0 or less disables limiting.
+    """
+
+    def __init__(self, rate: float, burst: float = 1.0) -> None:
+        self._lock = threading.Lock()
+        self._rate = float(rate)
+        self._burst = max(1.0, float(burst))
+        self._tokens = self._burst
+        self._updated = time.monotonic()
+        self._acquired = 0
+        self._waited = 0
+        self._time_blocked = 0.0
+
+    @property
+    def rate(self) -> float:
+        return self._rate
+
+    @rate.setter
+    def rate(self, value: float) -> None:
+        with self._lock:
+            self._refill(time.monotonic())
+            self._rate = float(value)
+
+    @property
+    def burst(self) -> float:
+        return self._burst
+
+    def _refill(self, now: float) -> None:
+        if self._rate > 0:
+            self._tokens = min(self._burst, self._tokens + (now - self._updated) * self._rate)
+        self._updated = now
+
+    def reserve(self, tokens: float = 1.0) -> float:
+        """Take ``tokens`` now and return how long the caller must wait before using them."""
+        with self._lock:
+            self._acquired += 1
+            if self._rate <= 0:
+                return 0.0
+            self._refill(time.monotonic())
+            self._tokens -= tokens
+            if self._tokens >= 0:
+                return 0.0
+            wait = -self._tokens / self._rate
+            self._waited += 1
+            self._time_blocked += wait
+            return wait
+
+    def defer(self, seconds: float) -> None:
+        """Hold back all callers for at least ``seconds`` (e.g. a server ``Retry-After``)."""
+        with self._lock:
+            if self._rate <= 0 or seconds <= 0:
+                return
+            self._refill(time.monotonic())
+            self._tokens = min(self._tokens, -seconds * self._rate)
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """Block until ``tokens`` are available; returns the time slept."""
+        wait = self.reserve(tokens)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def stats(self) -> LimiterStats:
+        with self._lock:
+            return LimiterStats(acquired=self._acquired, waited=self._waited, time_blocked=self._time_blocked)
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self._acquired = 0
+            self._waited = 0
+            self._time_blocked = 0.0
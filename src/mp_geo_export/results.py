@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+from dataclasses import asdict, dataclass
+from typing import Any
+
+ON_ERROR_POLICIES = ("fail", "skip", "null")
+
+
+@dataclass
+class PointResult:
+    """Outcome of geocoding one input point, kept at its input ``index``.
+
+    ``attempts`` counts the HTTP requests that included the point, retries
+    and alias-splitting rounds included (0 when served locally or from a
+    cache/journal).
+    """
+
+    index: int
+    geo: dict[str, Any] | None = None
+    error: str | None = None
+    attempts: int = 0
+
+    @property
+    def ok(self) -> bool:
+        return self.geo is not None
+
+    @property
+    def status(self) -> str:
+        return "ok" if self.ok else "failed"
+
+    def to_dict(self) -> dict[str, Any]:
+        return {**asdict(self), "status": self.status}
+
+
+class GeocodeFailedError(RuntimeError):
+    """Raised under the ``fail`` policy once a batch finishes with unresolved points."""
+
+    def __init__(self, failures: list[PointResult], total: int | None = None) -> None:
+        self.failures = failures
+        first = failures[0] if failures else None
+        detail = f" (first: point {first.index}: {first.error})" if first else ""
+        of = f"/{total}" if total is not None else ""
+        super().__init__(f"{len(failures)}{of} points failed to geocode{detail}")
+
+
+def check_on_error(policy: str) -> str:
+    policy = policy.lower()
+    if policy not in ON_ERROR_POLICIES:
+        raise ValueError(f"Unsupported on-error policy: {policy}. Use one of {', '.join(ON_ERROR_POLICIES)}.")
+    return policy
+
+
+def describe_error(exc: BaseException) -> str:
+    return f"{type(exc).__name__}: {exc}"
@@ -0,0 +1,353 @@
+from __future__ import annotations
+
+from collections.abc import Callable, Iterable, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any
+
+from .api import ApiClient
+from .auth import get_auth_header, refresh_auth_header
+from .config import api_url
+from .dedup import DEFAULT_TOLERANCE
+from .exports import (
+    KINDS, CombinedExport, build_model_export, combined_points, fetch_combined, fetch_objects, iter_objects,
+    object_points,
+)
+from .fields import parse_fields
+from .geocode import DEFAULT_VERIFY_TOLERANCE, GeocodeOutcome, fetch_georeference, geocode_points
+from .pipeline import PipelineResult, batched, run_pipeline
+from .queries import DEFAULT_RESOLUTION
+from .results import PointResult, check_on_error
+from .table import ExportTable
+
+if TYPE_CHECKING:
+    from .aio import BlockingAsyncClient
+    from .cache import GeocodeCache
+    from .models import NoteExport, PanoExport, TagExport
+    from .ratelimit import TokenBucket
+    from .writers import StreamWriter
+
+
+class Exporter:
+    """One API client, geocode worker pool, rate limiter and cache shared by many exports.
+
+    Each ``export_*`` function builds and tears down its own client, so a
+    loop over models reconnects and restarts the rate budget every call.
+    Used as a context manager, an ``Exporter`` keeps connections warm and
+    holds every export to one ``max_rps`` budget::
+
+        with Exporter(max_rps=10, concurrency=16) as exporter:
+            for model_id in model_ids:
+                tables[model_id] = exporter.export_table("tags", model_id)
+
+    Pass ``client`` to reuse an existing ``ApiClient``/``BlockingAsyncClient``
+    (it is not closed on exit). ``cache`` takes a ``GeocodeCache``, or True
+    to open the default one, which is then closed with the exporter. With
+    ``geocode_mode="verify"`` an export fails with ``VerifyToleranceError``
+    when the spot-check's max error exceeds ``verify_tolerance`` meters.
+    """
+
+    def __init__(
+        self,
+        api_key: str | None = None,
+        api_secret: str | None = None,
+        url: str | None = None,
+        timeout: float = 30.0,
+        max_rps: float = 5.0,
+        retries: int = 3,
+        burst: float = 1.0,
+        limiter: TokenBucket | None = None,
+        concurrency: int = 8,
+        adaptive: bool = False,
+        max_concurrency: int = 32,
+        max_rps_ceiling: float = 20.0,
+        geocode_mode: str = "remote",
+        verify_tolerance: float = DEFAULT_VERIFY_TOLERANCE,
+        points_per_request: int = 1,
+        dedup_tolerance: float = DEFAULT_TOLERANCE,
+        on_error: str = "fail",
+        cache: GeocodeCache | bool | None = None,
+        save_to_keyring: bool = False,
+        client: ApiClient | BlockingAsyncClient | None = None,
+    ) -> None:
+        self.geocode_mode = geocode_mode
+        self.verify_tolerance = float(verify_tolerance)
+        self.points_per_request = int(points_per_request)
+        self.dedup_tolerance = float(dedup_tolerance)
+        self.on_error = check_on_error(on_error)
+        self.concurrency = int(concurrency)
+        # Adaptive mode sizes the pool to the ceiling and lets the controller's gate throttle it
+        workers = int(max_concurrency) if adaptive else self.concurrency
+        self._owns_client = client is None
+        if client is None:
+            auth = get_auth_header(api_key=api_key, api_secret=api_secret, save_to_keyring=save_to_keyring)
+            client = ApiClient(
+                api_url(url),
+                auth,
+                timeout=float(timeout),
+                max_rps=float(max_rps),
+                retries=int(retries),
+                limiter=limiter,
+                burst=float(burst),
+                pool_size=workers,
+                on_unauthorized=refresh_auth_header,
+            )
+            if adaptive:
+                client.enable_adaptive(
+                    concurrency=self.concurrency, max_rps=float(max_rps_ceiling), max_concurrency=int(max_concurrency)
+                )
+        self.client = client
+        self._owns_cache = cache is True
+        if cache is True:
+            from .cache import GeocodeCache
+
+            cache = GeocodeCache()
+        self.cache: GeocodeCache | None = None if cache is None or cache is False else cache
+        self._workers = workers
+        self._executor: ThreadPoolExecutor | None = None
+
+    def __enter__(self) -> "Exporter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:  # type: ignore[no-untyped-def]
+        self.close()
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        if self._owns_client:
+            self.client.close()
+        if self._owns_cache and self.cache is not None:
+            self.cache.close()
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        """The geocode worker pool, started on first use and shared by every export."""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self._workers, thread_name_prefix="mp-geo-export")
+        return self._executor
+
+    def geocode(
+        self, model_id: str, points: list[dict[str, float]], geocoordinates: dict[str, Any] | None = None
+    ) -> list[PointResult]:
+        """Geocode ``points`` and apply the ``on_error`` policy (fail, skip or null).
+
+        Returns the results to export: all of them, or under ``skip`` only the resolved ones.
+        """
+        outcome = geocode_points(
+            self.client,
+            model_id,
+            points,
+            mode=self.geocode_mode,
+            concurrency=self.concurrency,
+            points_per_request=self.points_per_request,
+            cache=self.cache,
+            executor=self.executor,
+            dedup_tolerance=self.dedup_tolerance,
+            geocoordinates=geocoordinates,
+        )
+        outcome.raise_for_verify(self.verify_tolerance)
+        if self.on_error == "fail":
+            outcome.raise_for_failures()
+        if self.on_error == "skip":
+            return [r for r in outcome.results if r.ok]
+        return outcome.results
+
+    def export_table(
+        self,
+        kind: str,
+        model_id: str,
+        include_skybox: bool = False,
+        resolution: str = DEFAULT_RESOLUTION,
+        fields: str | Iterable[str] | None = None,
+    ) -> ExportTable:
+        """Export one kind (sweeps, tags or notes) as a columnar ``ExportTable``.
+
+        The fast path for large models: rows are never turned into pydantic
+        models unless ``table.models()`` is read. ``fields`` picks the optional
+        output fields (label, text, local, skybox); only those are requested
+        from the API.
+        """
+        selected = parse_fields(fields, include_skybox)
+        objects = fetch_objects(self.client, kind, model_id, resolution, fields=selected)
+        results = self.geocode(model_id, object_points(kind, objects))
+        return ExportTable.from_objects(
+            kind,
+            [objects[r.index] for r in results],
+            [r.geo for r in results],
+            include_skybox="skybox" in selected,
+            fields=selected,
+        )
+
+    def stream(
+        self,
+        kind: str,
+        model_id: str,
+        writer: StreamWriter,
+        include_skybox: bool = False,
+        resolution: str = DEFAULT_RESOLUTION,
+        fields: str | Iterable[str] | None = None,
+    ) -> PipelineResult:
+        """Export one kind into an opened ``writer`` as the listing and geocodes arrive.
+
+        Listing, geocoding and writing overlap (see ``run_pipeline``), so the
+        first rows are written long before a large model finishes. Under the
+        ``fail`` policy failed points are left out and
+        ``GeocodeFailedError`` is raised once the rest have been written.
+        A failed verify spot-check raises as soon as the first batch is in,
+        before any of its rows are written.
+        """
+        selected = parse_fields(fields, include_skybox)
+        table = ExportTable(selected)
+        mode = self.geocode_mode.lower()
+        georef: dict[str, Any] | None = None
+
+        def add(kind: str, batch: list[dict[str, Any]]) -> None:
+            table.add_objects(kind, batch, include_skybox="skybox" in selected)
+
+        def emit(index: int, geo: dict[str, Any] | None) -> None:
+            if geo is None and self.on_error != "null":
+                writer.put(index, [])
+                return
+            table.set_geo(index, geo)
+            writer.put_rows(index, table, table.rows(index))
+
+        def geocode(points: list[dict[str, float]], offset: int, emit: Callable[..., None]) -> GeocodeOutcome:
+            nonlocal georef
+            if georef is None and (mode != "remote" or self.cache is not None):
+                # Fetch the georeference once for the whole export, not once per batch
+                georef = fetch_georeference(self.client, model_id)
+            checked = mode == "verify" and offset == 0
+            held: list[tuple[int, dict[str, Any] | None]] = []
+            outcome = geocode_points(
+                self.client,
+                model_id,
+                points,
+                # The verify sample is drawn from the first batch; later ones only need the transform
+                mode="local" if mode == "verify" and offset > 0 else mode,
+                concurrency=self.concurrency,
+                points_per_request=self.points_per_request,
+                cache=self.cache,
+                executor=self.executor,
+                # Rows of the checked batch wait for the spot-check so a failed one writes nothing
+                on_result=(lambda index, geo: held.append((index, geo))) if checked else emit,
+                dedup_tolerance=self.dedup_tolerance,
+                geocoordinates=georef,
+            )
+            outcome.raise_for_verify(self.verify_tolerance)
+            for index, geo in held:
+                emit(index, geo)
+            return outcome
+
+        objects = iter_objects(self.client, kind, model_id, fields=selected, resolution=resolution)
+        result = run_pipeline(batched(kind, objects), geocode, add, emit)
+        if self.on_error == "fail":
+            result.outcome.raise_for_failures()
+        return result
+
+    def export_all(
+        self,
+        model_id: str,
+        kinds: Sequence[str] = KINDS,
+        include_skybox: bool = False,
+        resolution: str = DEFAULT_RESOLUTION,
+        fields: str | Iterable[str] | None = None,
+    ) -> CombinedExport:
+        """Export several kinds and the model georeference from one GraphQL request.
+
+        Every kind's points go through a single geocode pass, so dedup and the
+        rate budget span kinds. Returns one ``ExportTable`` per kind plus the
+        ``ModelExport``.
+        """
+        kinds = list(kinds)
+        selected = parse_fields(fields, include_skybox)
+        model, objects = fetch_combined(self.client, model_id, kinds, fields=selected, resolution=resolution)
+        points, spans = combined_points(kinds, objects)
+        results = self.geocode(model_id, points, geocoordinates=model.get("geocoordinates") or {})
+        tables = {}
+        for kind in kinds:
+            span = spans[kind]
+            mine = [r for r in results if r.index in span]
+            tables[kind] = ExportTable.from_objects(
+                kind,
+                [objects[kind][r.index - span.start] for r in mine],
+                [r.geo for r in mine],
+                include_skybox="skybox" in selected,
+                fields=selected,
+            )
+        return CombinedExport(model=build_model_export(model, model_id), tables=tables)
+
+    def export_panos(
+        self,
+        model_id: str,
+        include_skybox: bool = False,
+        resolution: str = DEFAULT_RESOLUTION,
+        fields: str | Iterable[str] | None = None,
+    ) -> Sequence[PanoExport]:
+        return self.export_table("sweeps", model_id, include_skybox, resolution, fields).models()
+
+    # Alias for consistency with CLI command name
+    export_sweeps = export_panos
+
+    def export_tags(self, model_id: str, fields: str | Iterable[str] | None = None) -> Sequence[TagExport]:
+        return self.export_table("tags", model_id, fields=fields).models()
+
+    def export_notes(self, model_id: str, fields: str | Iterable[str] | None = None) -> Sequence[NoteExport]:
+        return self.export_table("notes", model_id, fields=fields).models()
+
+
+# The functions below run one export on a short-lived Exporter; keyword
+# arguments are split between the export itself and ``Exporter(...)``.
+
+def export_table(
+    kind: str,
+    model_id: str,
+    include_skybox: bool = False,
+    resolution: str = DEFAULT_RESOLUTION,
+    fields: str | Iterable[str] | None = None,
+    **kwargs: Any,
+) -> ExportTable:
+    """Export one kind (sweeps, tags or notes) as a columnar ``ExportTable``; see ``Exporter.export_table``."""
+    with Exporter(**kwargs) as exporter:
+        return exporter.export_table(kind, model_id, include_skybox, resolution, fields)
+
+
+def export_all(
+    model_id: str,
+    kinds: Sequence[str] = KINDS,
+    include_skybox: bool = False,
+    resolution: str = DEFAULT_RESOLUTION,
+    fields: str | Iterable[str] | None = None,
+    **kwargs: Any,
+) -> CombinedExport:
+    """Export several kinds and the model georeference from one GraphQL request; see ``Exporter.export_all``."""
+    with Exporter(**kwargs) as exporter:
+        return exporter.export_all(model_id, kinds, include_skybox, resolution, fields)
+
+
+def export_panos(
+    model_id: str,
+    include_skybox: bool = False,
+    resolution: str = DEFAULT_RESOLUTION,
+    **kwargs: Any,
+) -> Sequence[PanoExport]:
+    return export_table("sweeps", model_id, include_skybox=include_skybox, resolution=resolution, **kwargs).models()
+
+
+def export_tags(model_id: str, **kwargs: Any) -> Sequence[TagExport]:
+    return export_table("tags", model_id, **kwargs).models()
+
+
+def export_notes(model_id: str, **kwargs: Any) -> Sequence[NoteExport]:
+    return export_table("notes", model_id, **kwargs).models()
+
+
+# Alias for consistency with CLI command name
+def export_sweeps(
+    model_id: str,
+    include_skybox: bool = False,
+    resolution: str = DEFAULT_RESOLUTION,
+    **kwargs: Any,
+) -> Sequence[PanoExport]:
+    """Alias for export_panos to match CLI command name."""
+    return export_panos(model_id, include_skybox=include_skybox, resolution=resolution, **kwargs)
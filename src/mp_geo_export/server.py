@@ -0,0 +1,347 @@
+from __future__ import annotations
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import TYPE_CHECKING, Any, Callable, Iterator
+from urllib.parse import parse_qs, urlsplit
+
+from .exports import KINDS
+from .fields import parse_fields
+from .queries import DEFAULT_RESOLUTION
+from .utils import OUTPUT_FORMATS
+
+if TYPE_CHECKING:
+    from .instrument import MetricsRecorder
+    from .sdk import Exporter
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+CONTENT_TYPES = {
+    "json": "application/json",
+    "geojson": "application/geo+json",
+    "ndjson": "application/x-ndjson",
+    "geojsonseq": "application/geo+json-seq",
+}
+
+# (kind, model_id, format, fields, resolution): requests with equal keys share one job
+JobKey = tuple[str, str, str, frozenset[str], str]
+
+# Output bytes a job keeps so requests joining late can start from the first byte
+REPLAY_LIMIT = 8 * 1024 * 1024
+
+
+class JobAbandoned(Exception):
+    """Raised into a job's writer once every request following it has gone away."""
+
+
+class ExportJob:
+    """One running export whose output is replayed to every request that asked for it.
+
+    The writer's output is kept as a list of chunks (one per writer flush),
+    so a request joining late starts from the first byte and then follows
+    along live. Up to ``replay_limit`` bytes are kept for that. Past it,
+    chunks every follower has sent are dropped, the job takes no new
+    followers (their requests start a job of their own), and the writer
+    waits for the slowest follower rather than buffer more.
+    """
+
+    def __init__(self, key: JobKey, replay_limit: int = REPLAY_LIMIT) -> None:
+        self.key = key
+        self.replay_limit = replay_limit
+        self.chunks: list[bytes] = []
+        # Position of ``chunks[0]`` in the job's output, and the bytes ``chunks`` holds
+        self.base = 0
+        self.held = 0
+        self.done = False
+        self.error: BaseException | None = None
+        self.abandoned = False
+        self._buffer: list[str] = []
+        # Next chunk position per follower
+        self._cursors: dict[int, int] = {}
+        self._next_reader = 0
+        self._cond = threading.Condition()
+
+    @property
+    def followers(self) -> int:
+        return len(self._cursors)
+
+    # Text sink for the StreamWriter
+    def write(self, text: str) -> int:
+        if self.abandoned:
+            raise JobAbandoned()
+        self._buffer.append(text)
+        return len(text)
+
+    def flush(self) -> None:
+        if not self._buffer:
+            return
+        data = "".join(self._buffer).encode()
+        self._buffer.clear()
+        with self._cond:
+            self.chunks.append(data)
+            self.held += len(data)
+            self._trim()
+            self._cond.notify_all()
+            self._cond.wait_for(lambda: self.abandoned or self.held <= self.replay_limit)
+            if self.abandoned:
+                raise JobAbandoned()
+
+    def finish(self, error: BaseException | None = None) -> None:
+        with self._cond:
+            self.done = True
+            self.error = error
+            self._cond.notify_all()
+
+    def _trim(self) -> None:
+        # Caller holds the lock. Nothing is dropped while a late request could still replay it all.
+        if not self._cursors or (self.base == 0 and self.held <= self.replay_limit):
+            return
+        drop = min(self._cursors.values()) - self.base
+        if drop > 0:
+            self.held -= sum(len(chunk) for chunk in self.chunks[:drop])
+            del self.chunks[:drop]
+            self.base += drop
+
+    def _add_reader(self) -> int:
+        reader = self._next_reader
+        self._next_reader += 1
+        self._cursors[reader] = 0
+        return reader
+
+    def attach(self) -> int | None:
+        """Add a request following the job and return its reader id.
+
+        None once the job was abandoned or has dropped its first chunks.
+        """
+        with self._cond:
+            if self.abandoned or self.base:
+                return None
+            return self._add_reader()
+
+    def detach(self, reader: int) -> None:
+        with self._cond:
+            self._cursors.pop(reader, None)
+            if not self._cursors and not self.done:
+                self.abandoned = True
+            self._trim()
+            self._cond.notify_all()
+
+    def wait_started(self) -> None:
+        """Block until the first bytes are out or the job ended, whichever is first."""
+        with self._cond:
+            self._cond.wait_for(lambda: self.chunks or self.base or self.done)
+
+    def follow(self, reader: int) -> Iterator[bytes]:
+        """Every chunk from the first, waiting for new ones until the job finishes.
+
+        Raises the job's error after the last chunk if it failed. Detaches
+        ``reader`` (see ``JobRegistry.join``) when done or closed early.
+        """
+        try:
+            while True:
+                with self._cond:
+                    self._cond.wait_for(lambda: self._cursors[reader] < self.base + len(self.chunks) or self.done)
+                    new = self.chunks[self._cursors[reader] - self.base:]
+                    finished = self.done
+                for chunk in new:
+                    yield chunk
+                with self._cond:
+                    self._cursors[reader] += len(new)
+                    self._trim()
+                    self._cond.notify_all()
+                    if finished and self._cursors[reader] == self.base + len(self.chunks):
+                        break
+            if self.error is not None:
+                raise self.error
+        finally:
+            self.detach(reader)
+
+
+class JobRegistry:
+    """Runs each export once however many requests ask for it at the same time.
+
+    ``join`` hands back the job already running under ``key`` or starts a new
+    one on its own thread. Finished jobs are forgotten, so the next request
+    gets fresh data (repeated geocodes still come from the exporter's cache).
+    """
+
+    def __init__(self, replay_limit: int = REPLAY_LIMIT) -> None:
+        self.replay_limit = replay_limit
+        self._jobs: dict[JobKey, ExportJob] = {}
+        self._lock = threading.Lock()
+        self.started = 0
+        self.coalesced = 0
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._jobs)
+
+    def join(self, key: JobKey, run: Callable[[ExportJob], None]) -> tuple[ExportJob, int, bool]:
+        """The job for ``key``, the caller's reader id on it, and whether the job was already running.
+
+        The caller must ``follow`` the job (or ``detach`` from it); a job left
+        with no followers is abandoned and stops at its next write.
+        """
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is not None:
+                reader = job.attach()
+                if reader is not None:
+                    self.coalesced += 1
+                    return job, reader, True
+            job = ExportJob(key, self.replay_limit)
+            reader = job._add_reader()
+            self._jobs[key] = job
+            self.started += 1
+        threading.Thread(target=self._run, args=(job, run), name=f"export-{key[0]}-{key[1]}", daemon=True).start()
+        return job, reader, False
+
+    def _run(self, job: ExportJob, run: Callable[[ExportJob], None]) -> None:
+        error: BaseException | None = None
+        try:
+            run(job)
+        except BaseException as exc:  # handed to the requests following the job
+            error = exc
+        finally:
+            with self._lock:
+                if self._jobs.get(job.key) is job:
+                    del self._jobs[job.key]
+            job.finish(error)
+
+
+class ExportServer(ThreadingHTTPServer):
+    """HTTP front end streaming exports from one shared ``Exporter``.
+
+    Every request goes through the exporter's client, rate limiter, geocode
+    pool and cache, so concurrent exports share one ``max_rps`` budget and
+    one set of warm connections. Routes:
+
+    - ``GET /export/{sweeps|tags|notes}?model_id=...`` streams the export,
+      as a GeoJSON FeatureCollection unless ``format`` says otherwise;
+      ``fields``, ``include_skybox`` and ``resolution`` work as on the CLI.
+      Concurrent requests for the same export are served by one job.
+    - ``GET /healthz`` reports running jobs.
+    - ``GET /metrics`` gives request metrics in Prometheus text format.
+
+    An export failing before its first row (including a verify spot-check
+    over the exporter's ``verify_tolerance``) answers 502 with the error.
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        exporter: Exporter,
+        host: str = DEFAULT_HOST,
+        port: int = DEFAULT_PORT,
+        metrics: MetricsRecorder | None = None,
+        quiet: bool = False,
+        replay_limit: int = REPLAY_LIMIT,
+    ) -> None:
+        self.exporter = exporter
+        self.metrics = metrics
+        self.quiet = quiet
+        self.jobs = JobRegistry(replay_limit)
+        super().__init__((host, port), ExportRequestHandler)
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        if isinstance(host, bytes):
+            host = host.decode()
+        return f"http://{host}:{port}"
+
+    def run_export(self, job: ExportJob) -> None:
+        from .writers import open_writer
+
+        kind, model_id, fmt, fields, resolution = job.key
+        with open_writer(fmt, None, stream=job) as writer:
+            self.exporter.stream(kind, model_id, writer, resolution=resolution, fields=fields)
+
+
+def _flag(value: str) -> bool:
+    if value.lower() in ("1", "true", "yes", "on"):
+        return True
+    if value.lower() in ("", "0", "false", "no", "off"):
+        return False
+    raise ValueError(f"Expected a boolean, got {value!r}")
+
+
+class ExportRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: ExportServer
+
+    def log_message(self, format: str, *args: Any) -> None:
+        if not self.server.quiet:
+            super().log_message(format, *args)
+
+    def do_GET(self) -> None:
+        parts = urlsplit(self.path)
+        path = parts.path.rstrip("/")
+        params = {k: v[-1] for k, v in parse_qs(parts.query, keep_blank_values=True).items()}
+        if path == "/healthz":
+            jobs = self.server.jobs
+            self._send_json(200, {"status": "ok", "jobs": len(jobs), "started": jobs.started, "coalesced": jobs.coalesced})
+        elif path == "/metrics":
+            text = self.server.metrics.prometheus() if self.server.metrics is not None else ""
+            self._send(200, "text/plain; version=0.0.4", text.encode())
+        elif path.startswith("/export/"):
+            self._export(path[len("/export/"):], params)
+        else:
+            self._send_json(404, {"error": f"Not found: {parts.path}"})
+
+    def _export(self, kind: str, params: dict[str, str]) -> None:
+        try:
+            key = self._job_key(kind, params)
+        except ValueError as exc:
+            self._send_json(400 if kind in KINDS else 404, {"error": str(exc)})
+            return
+        job, reader, coalesced = self.server.jobs.join(key, self.server.run_export)
+        job.wait_started()
+        if not job.chunks and job.error is not None:
+            # Failed before writing anything, so there is still a status line to report it with
+            job.detach(reader)
+            self._send_json(502, {"error": str(job.error)})
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPES[key[2]])
+        self.send_header("Transfer-Encoding", "chunked")
+        self.send_header("X-Coalesced", "true" if coalesced else "false")
+        self.end_headers()
+        try:
+            for chunk in job.follow(reader):
+                self.wfile.write(b"%x\r\n%s\r\n" % (len(chunk), chunk))
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            self.close_connection = True
+            return
+        except Exception as exc:
+            # Too late for an error status: end without the final chunk so the client sees a truncated body
+            self.log_error("export %s/%s failed: %s", key[0], key[1], exc)
+            self.close_connection = True
+            return
+        self.wfile.write(b"0\r\n\r\n")
+
+    def _job_key(self, kind: str, params: dict[str, str]) -> JobKey:
+        if kind not in KINDS:
+            raise ValueError(f"Unsupported kind: {kind}. Use one of {', '.join(KINDS)}.")
+        model_id = params.get("model_id", "").strip()
+        if not model_id:
+            raise ValueError("model_id is required")
+        fmt = params.get("format", "geojson").lower()
+        if fmt not in OUTPUT_FORMATS:
+            raise ValueError(f"Unsupported format: {fmt}. Use one of {', '.join(OUTPUT_FORMATS)}.")
+        selected = parse_fields(params.get("fields"), _flag(params.get("include_skybox", "")))
+        return kind, model_id, fmt, selected, params.get("resolution") or DEFAULT_RESOLUTION
+
+    def _send(self, status: int, content_type: str, body: bytes) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_json(self, status: int, payload: dict[str, Any]) -> None:
+        self._send(status, "application/json", json.dumps(payload).encode())
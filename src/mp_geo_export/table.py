@@ -0,0 +1,225 @@
+from __future__ import annotations
+
+import math
+from array import array
+from collections.abc import Sequence
+from typing import TYPE_CHECKING, Any, Iterator, overload
+
+from .fields import ALL_FIELDS
+
+if TYPE_CHECKING:
+    from .models import NoteExport, PanoExport, TagExport
+
+# Row kinds, as written to GeoJSON ``properties.type``
+ROW_KINDS = {"sweeps": "sweep", "tags": "tag", "notes": "note"}
+
+_NAN = float("nan")
+
+
+def pano_id(location_id: str, index: int) -> str:
+    """Row id of the ``index``-th pano of a sweep location."""
+    return f"{location_id}_pano{index + 1}"
+
+
+class ExportTable:
+    """Export rows held column-wise: one list/array per field instead of a model per row.
+
+    Built straight from trusted API payloads without validation. Sweep
+    locations expand to one row per pano, so ``offsets`` maps each source
+    object to its row range; geos start unset (NaN) and are filled per object
+    with ``set_geo`` as geocodes land. ``record``/``feature`` render a row
+    exactly as ``model_dump``/``to_geojson_feature`` would for the matching
+    pydantic model, and ``models()`` gives those models as a lazy view.
+    ``fields`` trims what ``record``/``feature`` write: without ``local``,
+    ``label`` or ``text`` those keys are left out (skyboxes are governed by
+    ``include_skybox`` when rows are added).
+    """
+
+    def __init__(self, fields: frozenset[str] | None = None) -> None:
+        self.fields = ALL_FIELDS if fields is None else frozenset(fields)
+        self.kinds: list[str] = []
+        self.ids: list[str] = []
+        self.x = array("d")
+        self.y = array("d")
+        self.z = array("d")
+        self.lat = array("d")
+        self.long = array("d")
+        self.alt = array("d")
+        # Tag label / note text
+        self.labels: list[str | None] = []
+        self.skybox: list[list[str] | None] = []
+        self.offsets = array("q", [0])
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def objects(self) -> int:
+        return len(self.offsets) - 1
+
+    @classmethod
+    def from_objects(
+        cls,
+        kind: str,
+        objects: list[dict[str, Any]],
+        geos: list[dict[str, Any] | None] | None = None,
+        include_skybox: bool = False,
+        fields: frozenset[str] | None = None,
+    ) -> "ExportTable":
+        table = cls(fields)
+        table.add_objects(kind, objects, include_skybox)
+        if geos is not None:
+            for i, geo in enumerate(geos):
+                table.set_geo(i, geo)
+        return table
+
+    def add_objects(self, kind: str, objects: list[dict[str, Any]], include_skybox: bool = False) -> None:
+        """Append rows for raw ``fetch_objects`` payloads of one kind."""
+        row_kind = ROW_KINDS.get(kind)
+        if row_kind is None:
+            raise ValueError(f"Unsupported kind: {kind}. Use one of {', '.join(ROW_KINDS)}.")
+        for obj in objects:
+            if row_kind == "sweep":
+                pos = obj["position"]
+                for idx, pano in enumerate(obj.get("panos") or []):
+                    sky = (pano.get("skybox") or {}).get("children") if include_skybox else None
+                    if include_skybox and (not sky or len(sky) != 6):
+                        continue
+                    self._append(row_kind, pano_id(obj["id"], idx), pos, None, sky)
+            else:
+                self._append(row_kind, obj["id"], obj["anchorPosition"], obj.get("label"), None)
+            self.offsets.append(len(self.ids))
+
+    def _append(
+        self, kind: str, id: str, pos: dict[str, float], label: str | None, skybox: list[str] | None
+    ) -> None:
+        self.kinds.append(kind)
+        self.ids.append(id)
+        self.x.append(pos["x"])
+        self.y.append(pos["y"])
+        self.z.append(pos["z"])
+        self.lat.append(_NAN)
+        self.long.append(_NAN)
+        self.alt.append(_NAN)
+        self.labels.append(label)
+        self.skybox.append(skybox)
+
+    def rows(self, index: int) -> range:
+        """Rows produced by source object ``index``."""
+        return range(self.offsets[index], self.offsets[index + 1])
+
+    def set_geo(self, index: int, geo: dict[str, Any] | None) -> None:
+        """Store the geocode of source object ``index`` on all of its rows (None clears it)."""
+        lat = _NAN if geo is None else geo["lat"]
+        long = _NAN if geo is None else geo["long"]
+        alt = geo.get("alt") if geo is not None else None
+        for row in self.rows(index):
+            self.lat[row] = lat
+            self.long[row] = long
+            self.alt[row] = _NAN if alt is None else alt
+
+    def geo(self, row: int) -> dict[str, Any] | None:
+        lat = self.lat[row]
+        if math.isnan(lat):
+            return None
+        alt = self.alt[row]
+        return {"lat": lat, "long": self.long[row], "alt": None if math.isnan(alt) else alt}
+
+    def record(self, row: int) -> dict[str, Any]:
+        """The row as ``model_dump()`` of its export model, less any fields not selected."""
+        fields = self.fields
+        out: dict[str, Any] = {"id": self.ids[row]}
+        kind = self.kinds[row]
+        if kind != "sweep":
+            key = "label" if kind == "tag" else "text"
+            if key in fields:
+                out[key] = self.labels[row]
+        if "local" in fields:
+            out["local"] = {"x": self.x[row], "y": self.y[row], "z": self.z[row]}
+        out["geo"] = self.geo(row)
+        if kind == "sweep":
+            out["skyboxImages"] = self.skybox[row]
+        return out
+
+    def feature(self, row: int) -> dict[str, Any]:
+        """The row as a GeoJSON Feature, matching ``to_geojson_feature`` less any fields not selected."""
+        geometry = None
+        lat = self.lat[row]
+        if not math.isnan(lat):
+            coordinates = [self.long[row], lat]
+            alt = self.alt[row]
+            if not math.isnan(alt):
+                coordinates.append(alt)
+            geometry = {"type": "Point", "coordinates": coordinates}
+        fields = self.fields
+        properties: dict[str, Any] = {"id": self.ids[row]}
+        if "local" in fields:
+            properties["local_coordinates"] = {"x": self.x[row], "y": self.y[row], "z": self.z[row]}
+        kind = self.kinds[row]
+        if kind == "sweep":
+            properties["type"] = "sweep"
+            if self.skybox[row]:
+                properties["skybox_images"] = self.skybox[row]
+        elif kind == "note":
+            if "text" in fields:
+                properties["text"] = self.labels[row]
+            properties["type"] = "note"
+        else:
+            if "label" in fields:
+                properties["label"] = self.labels[row]
+            properties["type"] = "tag"
+        return {"type": "Feature", "geometry": geometry, "properties": properties}
+
+    def model(self, row: int) -> PanoExport | TagExport | NoteExport:
+        """Build the pydantic model for one row (unvalidated; the table is trusted)."""
+        from .models import GeoPoint, LatLng, NoteExport, PanoExport, TagExport
+
+        local = GeoPoint.model_construct(x=self.x[row], y=self.y[row], z=self.z[row])
+        geo_dict = self.geo(row)
+        geo = LatLng.model_construct(**geo_dict) if geo_dict is not None else None
+        kind = self.kinds[row]
+        if kind == "sweep":
+            return PanoExport.model_construct(id=self.ids[row], local=local, geo=geo, skyboxImages=self.skybox[row])
+        if kind == "tag":
+            return TagExport.model_construct(id=self.ids[row], label=self.labels[row], local=local, geo=geo)
+        return NoteExport.model_construct(id=self.ids[row], text=self.labels[row], local=local, geo=geo)
+
+    def models(self) -> "ModelView":
+        return ModelView(self)
+
+
+class ModelView(Sequence):  # type: ignore[type-arg]
+    """Read-only sequence of export models over an ``ExportTable``, built on access."""
+
+    def __init__(self, table: ExportTable) -> None:
+        self.table = table
+
+    def __len__(self) -> int:
+        return len(self.table)
+
+    @overload
+    def __getitem__(self, index: int) -> Any: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[Any]: ...
+
+    def __getitem__(self, index: int | slice) -> Any:
+        if isinstance(index, slice):
+            return [self.table.model(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("ModelView index out of range")
+        return self.table.model(index)
+
+    def __iter__(self) -> Iterator[Any]:
+        for i in range(len(self)):
+            yield self.table.model(i)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, (list, tuple, ModelView)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"ModelView({len(self)} rows)"
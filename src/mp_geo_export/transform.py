@@ -0,0 +1,219 @@
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from functools import cached_property
+from importlib.util import find_spec
+from typing import Any, Sequence
+
+# Optional: pip install 'mp-geo-export[fast]'. NumPy is only imported when a
+# vectorized transform runs, so plain imports of this module stay cheap.
+HAVE_NUMPY = find_spec("numpy") is not None
+
+# WGS84 ellipsoid
+WGS84_A = 6378137.0
+WGS84_F = 1 / 298.257223563
+WGS84_E2 = WGS84_F * (2 - WGS84_F)
+
+
+class GeoreferenceError(ValueError):
+    """Raised when a model has no usable georeference for local transforms."""
+
+
+def _rotate(q: tuple[float, float, float, float], v: tuple[float, float, float]) -> tuple[float, float, float]:
+    """Rotate vector ``v`` by unit quaternion ``q`` given as (x, y, z, w)."""
+    qx, qy, qz, qw = q
+    vx, vy, vz = v
+    # t = 2 * cross(q.xyz, v); v' = v + w * t + cross(q.xyz, t)
+    tx = 2 * (qy * vz - qz * vy)
+    ty = 2 * (qz * vx - qx * vz)
+    tz = 2 * (qx * vy - qy * vx)
+    return (
+        vx + qw * tx + (qy * tz - qz * ty),
+        vy + qw * ty + (qz * tx - qx * tz),
+        vz + qw * tz + (qx * ty - qy * tx),
+    )
+
+
+def geodetic_to_ecef(lat: float, lon: float, alt: float) -> tuple[float, float, float]:
+    phi = math.radians(lat)
+    lam = math.radians(lon)
+    sin_phi = math.sin(phi)
+    n = WGS84_A / math.sqrt(1 - WGS84_E2 * sin_phi * sin_phi)
+    return (
+        (n + alt) * math.cos(phi) * math.cos(lam),
+        (n + alt) * math.cos(phi) * math.sin(lam),
+        (n * (1 - WGS84_E2) + alt) * sin_phi,
+    )
+
+
+def ecef_to_geodetic(x: float, y: float, z: float, iterations: int = 5) -> tuple[float, float, float]:
+    """Convert ECEF meters to (lat, lon, alt) using fixed-point iteration on latitude."""
+    lon = math.atan2(y, x)
+    p = math.hypot(x, y)
+    lat = math.atan2(z, p * (1 - WGS84_E2))
+    alt = 0.0
+    for _ in range(iterations):
+        sin_lat = math.sin(lat)
+        n = WGS84_A / math.sqrt(1 - WGS84_E2 * sin_lat * sin_lat)
+        cos_lat = math.cos(lat)
+        alt = p / cos_lat - n if abs(cos_lat) > 1e-12 else abs(z) - n * (1 - WGS84_E2)
+        lat = math.atan2(z, p * (1 - WGS84_E2 * n / (n + alt)))
+    return math.degrees(lat), math.degrees(lon), alt
+
+
+def _ecef_to_geodetic_array(xyz: Any, iterations: int = 5) -> Any:
+    """Vectorized ``ecef_to_geodetic`` over an (N, 3) array; returns (N, 3) lon/lat/alt."""
+    import numpy as np
+
+    x, y, z = xyz[:, 0], xyz[:, 1], xyz[:, 2]
+    lon = np.arctan2(y, x)
+    p = np.hypot(x, y)
+    lat = np.arctan2(z, p * (1 - WGS84_E2))
+    alt = np.zeros_like(p)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for _ in range(iterations):
+            sin_lat = np.sin(lat)
+            n = WGS84_A / np.sqrt(1 - WGS84_E2 * sin_lat * sin_lat)
+            cos_lat = np.cos(lat)
+            alt = np.where(np.abs(cos_lat) > 1e-12, p / cos_lat - n, np.abs(z) - n * (1 - WGS84_E2))
+            lat = np.arctan2(z, p * (1 - WGS84_E2 * n / (n + alt)))
+    return np.column_stack((np.degrees(lon), np.degrees(lat), alt))
+
+
+def haversine_m(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance in meters between two lat/long pairs."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlam = math.radians(lon2 - lon1)
+    h = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlam / 2) ** 2
+    return 2 * WGS84_A * math.asin(min(1.0, math.sqrt(h)))
+
+
+@dataclass(frozen=True)
+class GeoTransform:
+    """Local model space -> WGS84 transform derived from a model's georeference.
+
+    A model point ``p`` is mapped into the anchor's east/north/up frame as
+    ``rotation * p + translation`` (meters), then through ECEF to geodetic
+    lat/long/alt around the anchor ``latitude``/``longitude``/``altitude``.
+    """
+
+    latitude: float
+    longitude: float
+    altitude: float = 0.0
+    translation: tuple[float, float, float] = (0.0, 0.0, 0.0)
+    rotation: tuple[float, float, float, float] = (0.0, 0.0, 0.0, 1.0)
+
+    @classmethod
+    def from_geocoordinates(cls, geocoordinates: dict[str, Any]) -> "GeoTransform":
+        """Build a transform from the ``geocoordinates`` block of ``GET_MODEL_GEOCOORDINATES``."""
+        lat = geocoordinates.get("latitude")
+        lon = geocoordinates.get("longitude")
+        if lat is None or lon is None:
+            raise GeoreferenceError("Model has no latitude/longitude georeference")
+        t = geocoordinates.get("translation") or {}
+        r = geocoordinates.get("rotation") or {}
+        rotation = (
+            float(r.get("x", 0.0)),
+            float(r.get("y", 0.0)),
+            float(r.get("z", 0.0)),
+            float(r.get("w", 1.0)),
+        )
+        norm = math.sqrt(sum(c * c for c in rotation))
+        if norm == 0:
+            raise GeoreferenceError("Model georeference has a zero rotation quaternion")
+        return cls(
+            latitude=float(lat),
+            longitude=float(lon),
+            altitude=float(geocoordinates.get("altitude") or 0.0),
+            translation=(float(t.get("x", 0.0)), float(t.get("y", 0.0)), float(t.get("z", 0.0))),
+            rotation=tuple(c / norm for c in rotation),  # type: ignore[arg-type]
+        )
+
+    def to_enu(self, point: dict[str, float]) -> tuple[float, float, float]:
+        e, n, u = _rotate(self.rotation, (float(point["x"]), float(point["y"]), float(point["z"])))
+        tx, ty, tz = self.translation
+        return e + tx, n + ty, u + tz
+
+    def to_geo(self, point: dict[str, float]) -> dict[str, float]:
+        """Convert one local point to ``{"lat", "long", "alt"}``."""
+        e, n, u = self.to_enu(point)
+        phi = math.radians(self.latitude)
+        lam = math.radians(self.longitude)
+        sin_phi, cos_phi = math.sin(phi), math.cos(phi)
+        sin_lam, cos_lam = math.sin(lam), math.cos(lam)
+        x0, y0, z0 = geodetic_to_ecef(self.latitude, self.longitude, self.altitude)
+        x = x0 - sin_lam * e - sin_phi * cos_lam * n + cos_phi * cos_lam * u
+        y = y0 + cos_lam * e - sin_phi * sin_lam * n + cos_phi * sin_lam * u
+        z = z0 + cos_phi * n + sin_phi * u
+        lat, lon, alt = ecef_to_geodetic(x, y, z)
+        return {"lat": lat, "long": lon, "alt": alt}
+
+    @cached_property
+    def _affine(self) -> tuple[tuple[tuple[float, ...], ...], tuple[float, float, float]]:
+        """Local point -> ECEF as one 3x3 matrix and offset: ``ecef = M @ p + b``.
+
+        Folds the quaternion rotation, the translation and the anchor's
+        ENU-to-ECEF rotation together so a batch costs one matrix product.
+        """
+        qx, qy, qz, qw = self.rotation
+        rot = (
+            (1 - 2 * (qy * qy + qz * qz), 2 * (qx * qy - qz * qw), 2 * (qx * qz + qy * qw)),
+            (2 * (qx * qy + qz * qw), 1 - 2 * (qx * qx + qz * qz), 2 * (qy * qz - qx * qw)),
+            (2 * (qx * qz - qy * qw), 2 * (qy * qz + qx * qw), 1 - 2 * (qx * qx + qy * qy)),
+        )
+        phi = math.radians(self.latitude)
+        lam = math.radians(self.longitude)
+        sin_phi, cos_phi = math.sin(phi), math.cos(phi)
+        sin_lam, cos_lam = math.sin(lam), math.cos(lam)
+        # Columns are the east, north and up unit vectors in ECEF
+        enu = (
+            (-sin_lam, -sin_phi * cos_lam, cos_phi * cos_lam),
+            (cos_lam, -sin_phi * sin_lam, cos_phi * sin_lam),
+            (0.0, cos_phi, sin_phi),
+        )
+        m = tuple(tuple(sum(enu[i][k] * rot[k][j] for k in range(3)) for j in range(3)) for i in range(3))
+        origin = geodetic_to_ecef(self.latitude, self.longitude, self.altitude)
+        b = tuple(origin[i] + sum(enu[i][k] * self.translation[k] for k in range(3)) for i in range(3))
+        return m, b  # type: ignore[return-value]
+
+    def transform_array(self, xyz: Any, use_numpy: bool | None = None) -> Any:
+        """Convert an (N, 3) array of local x/y/z to an (N, 3) array of lon/lat/alt.
+
+        Uses NumPy when available (``use_numpy=None``); otherwise, or with
+        ``use_numpy=False``, runs the same math per point in pure Python on
+        any sequence of xyz triples and returns a list of (lon, lat, alt) tuples.
+        """
+        m, b = self._affine
+        if use_numpy is None:
+            use_numpy = HAVE_NUMPY
+        if use_numpy:
+            try:
+                import numpy as np
+            except ImportError as exc:
+                raise ImportError("NumPy is not installed: pip install 'mp-geo-export[fast]'") from exc
+            pts = np.asarray(xyz, dtype=np.float64).reshape(-1, 3)
+            ecef = pts @ np.asarray(m).T + np.asarray(b)
+            return _ecef_to_geodetic_array(ecef)
+        (m00, m01, m02), (m10, m11, m12), (m20, m21, m22) = m
+        bx, by, bz = b
+        out: list[tuple[float, float, float]] = []
+        for px, py, pz in xyz:
+            lat, lon, alt = ecef_to_geodetic(
+                bx + m00 * px + m01 * py + m02 * pz,
+                by + m10 * px + m11 * py + m12 * pz,
+                bz + m20 * px + m21 * py + m22 * pz,
+            )
+            out.append((lon, lat, alt))
+        return out
+
+    def batch(self, points: Sequence[dict[str, float]]) -> list[dict[str, float]]:
+        """``to_geo`` for many points, vectorized when NumPy is installed."""
+        xyz = [(float(p["x"]), float(p["y"]), float(p["z"])) for p in points]
+        if not xyz:
+            return []
+        rows = self.transform_array(xyz)
+        if HAVE_NUMPY:
+            rows = rows.tolist()
+        return [{"lat": lat, "long": lon, "alt": alt} for lon, lat, alt in rows]
@@ -4,9 +4,12 @@ import json
 import sys
 import time
 from pathlib import Path
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
-from rich.console import Console
+if TYPE_CHECKING:
+    from rich.console import Console
+
+OUTPUT_FORMATS = ("json", "geojson", "ndjson", "geojsonseq")
 
 
 def write_json(data: object, out_path: Path | None, pretty: bool) -> None:
@@ -29,9 +32,12 @@ def write_geojson(features: list[dict[str, Any]], out_path: Path | None, pretty:
 def to_geojson_feature(item: Any) -> dict[str, Any]:
     """Convert a PanoExport, TagExport, or NoteExport to a GeoJSON Feature."""
     # Extract coordinates [longitude, latitude] - note the order!
-    coordinates = [item.geo.long, item.geo.lat]
-    if item.geo.alt is not None:
-        coordinates.append(item.geo.alt)
+    geometry = None
+    if item.geo is not None:
+        coordinates = [item.geo.long, item.geo.lat]
+        if item.geo.alt is not None:
+            coordinates.append(item.geo.alt)
+        geometry = {"type": "Point", "coordinates": coordinates}
     
     properties = {
         "id": item.id,
@@ -47,7 +53,7 @@ def to_geojson_feature(item: Any) -> dict[str, Any]:
         properties["type"] = "sweep"
         if item.skyboxImages:
             properties["skybox_images"] = item.skyboxImages
-    elif hasattr(item, 'text') and hasattr(item, 'label'):  # NoteExport has both
+    elif hasattr(item, 'text'):  # NoteExport
         properties["text"] = item.text
         properties["type"] = "note"
     elif hasattr(item, 'label'):  # TagExport
@@ -56,15 +62,14 @@ def to_geojson_feature(item: Any) -> dict[str, Any]:
     
     return {
         "type": "Feature",
-        "geometry": {
-            "type": "Point",
-            "coordinates": coordinates
-        },
+        "geometry": geometry,
         "properties": properties
     }
 
 
 def console() -> Console:
+    from rich.console import Console
+
     return Console()
 
 
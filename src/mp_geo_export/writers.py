@@ -0,0 +1,229 @@
+from __future__ import annotations
+
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Protocol, TextIO
+
+from .utils import to_geojson_feature
+
+if TYPE_CHECKING:
+    from .table import ExportTable
+
+
+class TextSink(Protocol):
+    """What a writer without a file writes to: stdout, or any object with ``write`` and ``flush``."""
+
+    def write(self, text: str, /) -> int: ...
+
+    def flush(self) -> None: ...
+
+
+def _umask() -> int:
+    mask = os.umask(0)
+    os.umask(mask)
+    return mask
+
+
+class StreamWriter:
+    """Incrementally writes export items as they are produced.
+
+    Items arrive in groups tagged with the index of the source object (one
+    sweep location can yield several panos), either as export models via
+    ``put``, as row ranges of an ``ExportTable`` via ``put_rows`` or as
+    ready-made records via ``put_records``. ``ordered`` writers hold early
+    groups until every lower index has been written, so output order matches
+    the input; unordered writers emit each group immediately. When
+    ``out_path`` is a file the document is written to a temp file in the same
+    directory and renamed into place on close, so readers never see a
+    half-written file at the final path; ``abort`` discards it instead.
+    Without a file, output goes to ``stream`` (stdout by default), which is
+    left open.
+    """
+
+    def __init__(
+        self, out_path: Path | None, pretty: bool = False, ordered: bool = True, stream: TextSink | None = None
+    ) -> None:
+        self.out_path = None if out_path is None or str(out_path) == "-" else Path(out_path)
+        self.pretty = pretty
+        self.ordered = ordered
+        self.stream = stream
+        self.count = 0
+        self._pending: dict[int, list[dict[str, Any]]] = {}
+        self._next = 0
+        self._tmp_path: Path | None = None
+        self._tmp_file: TextIO | None = None
+        self._fh: TextSink | None = None
+
+    def __enter__(self) -> "StreamWriter":
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, *exc_info) -> None:  # type: ignore[no-untyped-def]
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def open(self) -> None:
+        if self.out_path is None:
+            self._fh = self.stream if self.stream is not None else sys.stdout
+        else:
+            fd, tmp = tempfile.mkstemp(dir=self.out_path.parent, prefix=f".{self.out_path.name}.", suffix=".tmp")
+            self._tmp_path = Path(tmp)
+            # mkstemp creates 0600; match the permissions a plain write would give
+            os.chmod(tmp, 0o666 & ~_umask())
+            self._fh = self._tmp_file = os.fdopen(fd, "w")
+        self._fh.write(self.header())
+
+    def put(self, index: int, items: list[Any]) -> None:
+        """Hand over the export models produced for input ``index`` (possibly none)."""
+        self._put(index, [self.render(item) for item in items])
+
+    def put_rows(self, index: int, table: ExportTable, rows: range) -> None:
+        """Hand over ``rows`` of ``table`` as the output for input ``index``."""
+        self._put(index, [self.render_row(table, row) for row in rows])
+
+    def put_records(self, index: int, records: list[dict[str, Any]]) -> None:
+        """Hand over records already rendered for this writer (Features for ``features`` writers)."""
+        self._put(index, records)
+
+    def _put(self, index: int, records: list[dict[str, Any]]) -> None:
+        if not self.ordered:
+            self._emit(records)
+            return
+        self._pending[index] = records
+        while self._next in self._pending:
+            self._emit(self._pending.pop(self._next))
+            self._next += 1
+
+    def _emit(self, records: list[dict[str, Any]]) -> None:
+        assert self._fh is not None
+        for record in records:
+            self._fh.write(self.separator(self.count) + self.encode(record))
+            self.count += 1
+        if records:
+            self._fh.flush()
+
+    def close(self) -> None:
+        """Write anything still held back (in index order) plus the footer, then publish the file."""
+        if self._fh is None:
+            return
+        for index in sorted(self._pending):
+            self._emit(self._pending.pop(index))
+        self._fh.write(self.footer())
+        self._fh.flush()
+        if self._tmp_file is not None and self._tmp_path is not None and self.out_path is not None:
+            os.fsync(self._tmp_file.fileno())
+            self._tmp_file.close()
+            os.replace(self._tmp_path, self.out_path)
+        self._fh = self._tmp_file = None
+
+    def abort(self) -> None:
+        if self._fh is None:
+            return
+        if self._tmp_file is not None and self._tmp_path is not None:
+            self._tmp_file.close()
+            self._tmp_path.unlink(missing_ok=True)
+        self._fh = self._tmp_file = None
+
+    # Framing hooks; ``features`` writers render GeoJSON Features instead of records
+    features = False
+
+    def render(self, item: Any) -> dict[str, Any]:
+        return to_geojson_feature(item) if self.features else item.model_dump()
+
+    def render_row(self, table: ExportTable, row: int) -> dict[str, Any]:
+        return table.feature(row) if self.features else table.record(row)
+
+    def encode(self, record: dict[str, Any]) -> str:
+        return json.dumps(record)
+
+    def header(self) -> str:
+        return ""
+
+    def separator(self, count: int) -> str:
+        return ""
+
+    def footer(self) -> str:
+        return ""
+
+
+class JsonArrayWriter(StreamWriter):
+    """A JSON array, byte-for-byte what ``write_json`` would produce for the same items."""
+
+    indent = "  "
+
+    def header(self) -> str:
+        return "["
+
+    def encode(self, record: dict[str, Any]) -> str:
+        if not self.pretty:
+            return json.dumps(record)
+        return json.dumps(record, indent=2).replace("\n", "\n" + self.indent)
+
+    def separator(self, count: int) -> str:
+        if self.pretty:
+            return ("," if count else "") + "\n" + self.indent
+        return ", " if count else ""
+
+    def footer(self) -> str:
+        return ("\n]" if self.pretty and self.count else "]") + self._trailer()
+
+    def _trailer(self) -> str:
+        # write_json ends pretty stdout output with a newline
+        return "\n" if self.pretty and self.out_path is None else ""
+
+
+class GeoJsonWriter(JsonArrayWriter):
+    """A GeoJSON FeatureCollection whose ``features`` array is streamed."""
+
+    indent = "    "
+    features = True
+
+    def header(self) -> str:
+        if self.pretty:
+            return '{\n  "type": "FeatureCollection",\n  "features": ['
+        return '{"type": "FeatureCollection", "features": ['
+
+    def footer(self) -> str:
+        close = "\n  ]" if self.pretty and self.count else "]"
+        return close + ("\n}" if self.pretty else "}") + self._trailer()
+
+
+class NdjsonWriter(StreamWriter):
+    """JSON Lines: one compact export record per line (``pretty`` is ignored)."""
+
+    def encode(self, record: dict[str, Any]) -> str:
+        return json.dumps(record, separators=(",", ":")) + "\n"
+
+
+class GeoJsonSeqWriter(NdjsonWriter):
+    """GeoJSON text sequence (RFC 8142): each Feature prefixed by RS and ended by LF."""
+
+    RS = "\x1e"
+    features = True
+
+    def encode(self, record: dict[str, Any]) -> str:
+        return self.RS + super().encode(record)
+
+
+WRITERS: dict[str, type[StreamWriter]] = {
+    "json": JsonArrayWriter,
+    "geojson": GeoJsonWriter,
+    "ndjson": NdjsonWriter,
+    "geojsonseq": GeoJsonSeqWriter,
+}
+
+
+def open_writer(
+    format: str, out_path: Path | None, pretty: bool = False, ordered: bool = True, stream: TextSink | None = None
+) -> StreamWriter:
+    """Create (but do not open) the streaming writer for ``format``."""
+    try:
+        cls = WRITERS[format.lower()]
+    except KeyError:
+        raise ValueError(f"Unsupported format: {format}. Use one of {', '.join(WRITERS)}.") from None
+    return cls(out_path, pretty=pretty, ordered=ordered, stream=stream)
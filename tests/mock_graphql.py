@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+
+
+class MockGraphQLServer:
+    """Local stand-in for the Matterport GraphQL endpoint.
+
+    Sweeps/tags/notes come from the lists passed in; ``geoLocationOf`` maps a
+    point to ``{"lat": x, "long": y}`` so results are easy to check.
+    """
+
+    def __init__(
+        self,
+        locations: list[dict[str, Any]] | None = None,
+        tags: list[dict[str, Any]] | None = None,
+        notes: list[dict[str, Any]] | None = None,
+        geocoordinates: dict[str, Any] | None = None,
+    ) -> None:
+        self.locations = locations or []
+        self.tags = tags or []
+        self.notes = notes or []
+        self.geocoordinates = geocoordinates
+        self.requests: list[dict[str, Any]] = []
+        self.throttle_next = 0
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args: Any) -> None:
+                pass
+
+            def do_POST(self) -> None:
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                status, payload = server.handle(body)
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                if status == 429:
+                    self.send_header("Retry-After", "0")
+                self.end_headers()
+                self.wfile.write(data)
+
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/graphql"
+
+    def __enter__(self) -> "MockGraphQLServer":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    @staticmethod
+    def _geo(point: dict[str, float]) -> dict[str, float]:
+        return {"lat": float(point["x"]), "long": float(point["y"])}
+
+    def handle(self, body: dict[str, Any]) -> tuple[int, dict[str, Any]]:
+        self.requests.append(body)
+        if self.throttle_next > 0:
+            self.throttle_next -= 1
+            return 429, {"errors": [{"message": "rate limited"}]}
+        query: str = body["query"]
+        variables: dict[str, Any] = body["variables"]
+        if "getExport" in query:
+            model: dict[str, Any] = {"id": variables["modelId"], "geocoordinates": self.geocoordinates}
+            for field, objects in (("locations", self.locations), ("mattertags", self.tags), ("notes", self.notes)):
+                if f"    {field} {{" in query:
+                    model[field] = objects
+            return 200, {"data": {"model": model}}
+        if "getGeoCoordinates" in query and self.geocoordinates is not None:
+            return 200, {"data": {"model": {"id": variables["modelId"], "geocoordinates": self.geocoordinates}}}
+        if "getSweeps" in query:
+            return 200, {"data": {"model": {"locations": self.locations}}}
+        if "getTags" in query:
+            return 200, {"data": {"model": {"mattertags": self.tags}}}
+        if "getNotes" in query:
+            return 200, {"data": {"model": {"notes": self.notes}}}
+        if "getLatLongOfModelPoints" in query:
+            aliases = {k: self._geo(v) for k, v in variables.items() if k != "modelId"}
+            return 200, {"data": {"model": {"geocoordinates": aliases}}}
+        if "getLatLongOfModelPoint" in query:
+            geo = self._geo(variables["point"])
+            return 200, {"data": {"model": {"geocoordinates": {"geoLocationOf": geo}}}}
+        return 200, {"errors": [{"message": "unknown query"}]}
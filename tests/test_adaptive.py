@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import pytest
+import requests
+import responses
+
+from mp_geo_export.adaptive import AdaptiveController
+from mp_geo_export.api import ApiClient, GraphQLError, ThrottledError
+from mp_geo_export.ratelimit import TokenBucket
+
+
+API_URL = "https://example.test/graphql"
+
+
+def test_additive_increase_multiplicative_decrease() -> None:
+    bucket = TokenBucket(rate=4.0)
+    ctl = AdaptiveController(bucket, concurrency=4, max_rps=5.0, max_concurrency=5, window=2, cooldown=0)
+    for _ in range(6):
+        ctl.on_success(0.1)
+    state = ctl.state()
+    assert state.rps == 5.0  # capped at the ceiling
+    assert state.concurrency == 5
+    ctl.on_throttle()
+    state = ctl.state()
+    assert state.rps == 2.5
+    assert state.concurrency == 2
+    assert state.decreases == 1
+
+
+def test_latency_growth_stops_increases() -> None:
+    ctl = AdaptiveController(TokenBucket(rate=2.0), window=1, cooldown=0)
+    ctl.on_success(0.1)
+    ctl.on_success(1.0)
+    ctl.on_success(1.0)
+    assert ctl.state().increases == 1
+
+
+def test_retry_after_defers_limiter() -> None:
+    bucket = TokenBucket(rate=10.0, burst=5)
+    ctl = AdaptiveController(bucket, max_rps=10.0, cooldown=0, backoff=1.0)
+    ctl.on_throttle(retry_after=2.0)
+    assert bucket.reserve() >= 2.0
+
+
+@responses.activate
+def test_429_reports_retry_after_to_controller() -> None:
+    client = ApiClient(API_URL, auth_header="Basic test", max_rps=0, retries=0)
+    ctl = client.enable_adaptive(concurrency=4, max_rps=10.0)
+    responses.add(responses.POST, API_URL, status=429, headers={"Retry-After": "3"})
+    with pytest.raises(ThrottledError) as info:
+        client.fetch_tags("M")
+    assert info.value.retry_after == 3.0
+    assert ctl.state().decreases == 1
+
+
+@responses.activate
+@pytest.mark.parametrize("status", [401, 403])
+def test_rejected_listing_is_not_a_success_signal(status: int) -> None:
+    client = ApiClient(API_URL, auth_header="Basic test", max_rps=0, retries=0)
+    ctl = client.enable_adaptive(concurrency=4, max_rps=10.0)
+    ctl.window = 1
+    responses.add(responses.POST, API_URL, status=status, json={"errors": [{"message": "no"}]})
+    with pytest.raises(requests.HTTPError):
+        client.fetch_tags("M")
+    assert ctl.state().latency_ewma is None and ctl.state().increases == 0
+
+
+@responses.activate
+@pytest.mark.parametrize(
+    "status, body",
+    [(403, '{"errors": [{"message": "forbidden"}]}'), (200, '{"errors": [{"message": "boom"}]}'), (200, "<html>")],
+)
+def test_rejected_request_is_not_a_success_signal(status: int, body: str) -> None:
+    client = ApiClient(API_URL, auth_header="Basic test", max_rps=0, retries=0)
+    ctl = client.enable_adaptive(concurrency=4, max_rps=10.0)
+    ctl.window = 1
+    responses.add(responses.POST, API_URL, status=status, body=body)
+    with pytest.raises((requests.RequestException, GraphQLError)):
+        client.fetch_model_geocoordinates("M")
+    assert ctl.state().latency_ewma is None and ctl.state().increases == 0
+
+
+def test_geocode_batches_keep_the_tuned_rate() -> None:
+    client = ApiClient(API_URL, auth_header="Basic test", max_rps=5.0)
+    ctl = client.enable_adaptive(concurrency=4, max_rps=10.0)
+    ctl.window, ctl.cooldown = 1, 0
+    client.limiter.rate = 5.0
+    for _ in range(5):
+        ctl.on_success(0.1)
+    tuned = client.max_rps
+    assert tuned > 5.0
+    client.geocode_results("M", [], concurrency=4, max_rps=5.0)
+    assert client.max_rps == tuned
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+pytest.importorskip("aiohttp")
+
+from mock_graphql import MockGraphQLServer
+
+from mp_geo_export.aio import AsyncApiClient, BlockingAsyncClient
+from mp_geo_export.api import GraphQLError
+from mp_geo_export.results import PointResult
+
+
+def test_async_fetch_and_batch_geocode() -> None:
+    locations = [{"id": f"loc{i}", "position": {"x": i, "y": -i, "z": 0}, "panos": []} for i in range(50)]
+    with MockGraphQLServer(locations=locations) as server:
+
+        async def run() -> tuple[list[dict[str, object]], list[dict[str, object]]]:
+            async with AsyncApiClient(server.url, "Basic test", max_rps=0, pool_size=20) as client:
+                locs = await client.fetch_locations("M", "2k")
+                geos = await client.batch_geocode("M", [loc["position"] for loc in locs], concurrency=100)
+                return locs, geos
+
+        locs, geos = asyncio.run(run())
+    assert len(locs) == 50
+    assert [g["lat"] for g in geos] == [float(i) for i in range(50)]
+    assert [g["long"] for g in geos] == [float(-i) for i in range(50)]
+
+
+def test_async_multi_point_and_throttle_retry() -> None:
+    with MockGraphQLServer() as server:
+        server.throttle_next = 1
+
+        async def run() -> list[dict[str, object]]:
+            async with AsyncApiClient(server.url, "Basic test", max_rps=0, retries=1) as client:
+                points = [{"x": i, "y": 0, "z": 0} for i in range(10)]
+                return await client.batch_geocode("M", points, concurrency=4, points_per_request=5)
+
+        geos = asyncio.run(run())
+        # one throttled reply, then two aliased requests
+        assert len(server.requests) == 3
+    assert [g["lat"] for g in geos] == [float(i) for i in range(10)]
+
+
+def test_blocking_facade_matches_sync_surface() -> None:
+    with MockGraphQLServer(tags=[{"id": "t1", "label": "A", "anchorPosition": {"x": 1, "y": 2, "z": 3}}]) as server:
+        with BlockingAsyncClient(AsyncApiClient(server.url, "Basic test", max_rps=0, retries=0)) as client:
+            tags = client.fetch_tags("M")
+            assert tags[0]["id"] == "t1"
+            assert client.batch_geocode("M", [tags[0]["anchorPosition"]], concurrency=2) == [{"lat": 1.0, "long": 2.0}]
+            with pytest.raises(GraphQLError):
+                client.fetch_model_geocoordinates("M")
+
+
+def test_blocking_facade_shares_one_concurrency_cap() -> None:
+    with MockGraphQLServer() as server:
+        with BlockingAsyncClient(AsyncApiClient(server.url, "Basic test", max_rps=0, retries=0)) as client:
+            chunk = client.client._geocode_chunk
+            in_flight = peak = 0
+
+            async def slow_chunk(model_id: str, points: list[dict[str, float]]) -> list[PointResult]:
+                nonlocal in_flight, peak
+                in_flight += 1
+                peak = max(peak, in_flight)
+                await asyncio.sleep(0.02)
+                try:
+                    return await chunk(model_id, points)
+                finally:
+                    in_flight -= 1
+
+            client.client._geocode_chunk = slow_chunk  # type: ignore[method-assign]
+            points = [{"x": i, "y": 0, "z": 0} for i in range(6)]
+            with ThreadPoolExecutor(max_workers=2) as jobs:
+                batches = list(jobs.map(lambda _: client.batch_geocode("M", points, concurrency=2), range(2)))
+    assert peak == 2
+    assert [[g["lat"] for g in geos] for geos in batches] == [[float(i) for i in range(6)]] * 2
+
+
+def test_blocking_facade_runs_callbacks_on_the_calling_thread() -> None:
+    with MockGraphQLServer() as server:
+        with BlockingAsyncClient(AsyncApiClient(server.url, "Basic test", max_rps=0, retries=0)) as client:
+            threads: set[int] = set()
+            seen: list[int] = []
+
+            def on_result(index: int, geo: dict[str, object] | None) -> None:
+                threads.add(threading.get_ident())
+                seen.append(index)
+
+            points = [{"x": i, "y": 0, "z": 0} for i in range(5)]
+            results = client.geocode_results(
+                "M", points, concurrency=2, on_result=on_result, on_progress=lambda done, rate: threads.add(threading.get_ident())
+            )
+    assert threads == {threading.get_ident()}
+    assert sorted(seen) == [0, 1, 2, 3, 4]
+    assert [r.geo["lat"] for r in results if r.geo] == [0.0, 1.0, 2.0, 3.0, 4.0]
@@ -6,7 +6,8 @@ from typing import Any
 import pytest
 import responses
 
-from mp_geo_export.api import ApiClient, GraphQLError
+from mp_geo_export.api import ApiClient, AuthenticationError, GraphQLError
+from mp_geo_export.queries import build_batch_geo_query, build_listing_query
 
 
 API_URL = "https://example.test/graphql"
@@ -76,3 +77,123 @@ def test_graphql_error_bubbles_up() -> None:
         client.fetch_tags("M")
 
 
+@responses.activate
+def test_401_swaps_in_refreshed_credentials_once() -> None:
+    rejected: list[str] = []
+
+    def refresh(header: str) -> str | None:
+        rejected.append(header)
+        return "Basic fresh" if header == "Basic stale" else None
+
+    client = ApiClient(API_URL, auth_header="Basic stale", retries=3, on_unauthorized=refresh)
+    responses.add(responses.POST, API_URL, status=401)
+    responses.add(responses.POST, API_URL, json={"data": {"model": {"geocoordinates": {}}}}, status=200)
+    assert client.fetch_model_geocoordinates("M") == {"geocoordinates": {}}
+    assert rejected == ["Basic stale"]
+    assert [c.request.headers["Authorization"] for c in responses.calls] == ["Basic stale", "Basic fresh"]
+
+    # Rejected again with nothing new to try: fail at once instead of backing off through the retries
+    responses.add(responses.POST, API_URL, status=401)
+    with pytest.raises(AuthenticationError):
+        client.geocode_results("M", [{"x": 0.0, "y": 0.0, "z": 0.0}], concurrency=1)
+    assert len(responses.calls) == 3
+
+
+
+
+def test_build_batch_geo_query_aliases() -> None:
+    q = build_batch_geo_query(3)
+    assert "$p2: IPoint3D!" in q
+    assert "p0: geoLocationOf(modelLocation: $p0)" in q
+    assert "$p3" not in q
+
+
+def test_listing_query_selects_only_requested_fields() -> None:
+    q = build_listing_query("sweeps", frozenset({"local"}))
+    assert "skybox" not in q and "panos { id }" in q
+    q = build_listing_query("sweeps", frozenset({"skybox"}), "4k")
+    assert 'skybox(resolution: "4k") { children }' in q
+    assert "label" not in build_listing_query("tags", frozenset({"local"}))
+    assert "label" in build_listing_query("notes", frozenset({"text"}))
+
+
+@responses.activate
+def test_batch_geocode_multi_point_retries_only_failed_aliases() -> None:
+    client = ApiClient(API_URL, auth_header="Basic test", max_rps=0, retries=0)
+
+    def reply(request: Any) -> tuple[int, dict[str, str], str]:
+        body = json.loads(request.body)
+        variables = body["variables"]
+        if "point" in variables:
+            pt = variables["point"]
+            geo = {"lat": float(pt["x"]), "long": 0.0}
+            return 200, {}, json.dumps({"data": {"model": {"geocoordinates": {"geoLocationOf": geo}}}})
+        aliases: dict[str, Any] = {}
+        errors = []
+        for key, pt in variables.items():
+            if key == "modelId":
+                continue
+            if pt["x"] == 2 and len(variables) > 2:
+                aliases[key] = None
+                errors.append({"message": "boom", "path": ["model", "geocoordinates", key]})
+            else:
+                aliases[key] = {"lat": float(pt["x"]), "long": 0.0}
+        payload: dict[str, Any] = {"data": {"model": {"geocoordinates": aliases}}}
+        if errors:
+            payload["errors"] = errors
+        return 200, {}, json.dumps(payload)
+
+    responses.add_callback(responses.POST, API_URL, callback=reply)
+    points = [{"x": i, "y": 0, "z": 0} for i in range(5)]
+    out = client.batch_geocode("M", points, concurrency=1, points_per_request=4)
+    assert [g["lat"] for g in out] == [0.0, 1.0, 2.0, 3.0, 4.0]
+    # chunk of 4 + chunk of 1, then the failed alias alone
+    assert len(responses.calls) == 3
+
+
+@responses.activate
+def test_failed_multi_point_request_is_not_split() -> None:
+    client = ApiClient(API_URL, auth_header="Basic test", max_rps=0, retries=0)
+    responses.add(responses.POST, API_URL, status=429)
+    points = [{"x": i, "y": 0, "z": 0} for i in range(8)]
+    results = client.geocode_results("M", points, concurrency=1, points_per_request=8)
+    # one request, not one per half-chunk down to single points
+    assert len(responses.calls) == 1
+    assert all(r.status == "failed" and "429" in (r.error or "") for r in results)
+    assert [r.attempts for r in results] == [1] * 8
+
+
+@responses.activate
+def test_geocode_results_keep_alignment_and_record_failures() -> None:
+    client = ApiClient(API_URL, auth_header="Basic test", max_rps=0, retries=1)
+
+    def reply(request: Any) -> tuple[int, dict[str, str], str]:
+        pt = json.loads(request.body)["variables"]["point"]
+        if pt["x"] == 1:
+            return 200, {}, json.dumps({"errors": [{"message": "no geolocation"}]})
+        geo = {"lat": float(pt["x"]), "long": 0.0}
+        return 200, {}, json.dumps({"data": {"model": {"geocoordinates": {"geoLocationOf": geo}}}})
+
+    responses.add_callback(responses.POST, API_URL, callback=reply)
+    points = [{"x": i, "y": 0, "z": 0} for i in range(3)]
+    results = client.geocode_results("M", points, concurrency=1)
+    assert [r.status for r in results] == ["ok", "failed", "ok"]
+    assert [r.attempts for r in results] == [1, 2, 1]
+    assert "no geolocation" in (results[1].error or "")
+    assert client.batch_geocode("M", points, concurrency=1) == [{"lat": 0.0, "long": 0.0}, None, {"lat": 2.0, "long": 0.0}]
+
+
+@responses.activate
+def test_listing_streams_and_retry_skips_yielded_elements(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr("mp_geo_export.api.time.sleep", lambda s: None)
+    client = ApiClient(API_URL, auth_header="Basic test", retries=1)
+    tags = [{"id": f"t{i}", "label": "", "anchorPosition": {"x": i, "y": 0, "z": 0}} for i in range(3)]
+    full = json.dumps({"data": {"model": {"mattertags": tags}}})
+    # The first response is cut off mid-way through the second tag
+    responses.add(responses.POST, API_URL, body=full[: full.index('"t1"') + 6], status=200)
+    responses.add(responses.POST, API_URL, body=full, status=200)
+
+    stream = client.iter_tags("M")
+    assert next(stream)["id"] == "t0"
+    assert [t["id"] for t in stream] == ["t1", "t2"]
+    assert len(responses.calls) == 2
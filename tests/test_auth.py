@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from mp_geo_export.auth import FILE_ENV, PROVIDERS_ENV, CredentialResolver, _b64, providers_from_env
+
+
+def _basic(key: str, secret: str) -> str:
+    return f"Basic {_b64(f'{key}:{secret}')}"
+
+
+def test_resolves_once_until_invalidated() -> None:
+    calls: list[int] = []
+
+    def slow_keyring() -> tuple[str, str] | None:
+        calls.append(1)
+        return ("k", "s")
+
+    resolver = CredentialResolver([slow_keyring])
+    assert resolver.header() == resolver.header() == _basic("k", "s")
+    assert len(calls) == 1
+    resolver.invalidate()
+    resolver.header()
+    assert len(calls) == 2
+
+
+def test_providers_tried_in_order_before_explicit_args() -> None:
+    resolver = CredentialResolver([lambda: None, lambda: ("first", "s"), lambda: ("second", "s")])
+    assert resolver.header("arg", "s") == _basic("first", "s")
+    assert CredentialResolver([lambda: None]).header("arg", "s") == _basic("arg", "s")
+
+
+def test_refresh_after_401_picks_up_rotated_credentials() -> None:
+    stored = {"value": ("old", "s")}
+    resolver = CredentialResolver([lambda: stored["value"]])
+    old = resolver.header()
+    assert resolver.refresh(old) is None  # the store still has the rejected key
+    stored["value"] = ("new", "s")
+    assert resolver.refresh(old) == _basic("new", "s")
+    # A second thread reporting the same 401 gets the replacement without resolving again
+    stored["value"] = ("newer", "s")
+    assert resolver.refresh(old) == _basic("new", "s")
+    assert resolver.header() == _basic("new", "s")
+
+
+def test_provider_order_from_env(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    creds = tmp_path / "credentials"
+    creds.write_text("filek:files\n")
+    monkeypatch.setenv(FILE_ENV, str(creds))
+    monkeypatch.setenv("MATTERPORT_API_KEY", "envk")
+    monkeypatch.setenv("MATTERPORT_API_SECRET", "envs")
+    monkeypatch.setenv(PROVIDERS_ENV, "file,env")
+    assert CredentialResolver().header() == _basic("filek", "files")
+    monkeypatch.setenv(PROVIDERS_ENV, "env")
+    assert CredentialResolver().header() == _basic("envk", "envs")
+    monkeypatch.setenv(PROVIDERS_ENV, "env,vault")
+    with pytest.raises(ValueError, match="Unknown credential providers: vault"):
+        providers_from_env()
@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+from mock_graphql import MockGraphQLServer
+
+from mp_geo_export.api import ApiClient
+from mp_geo_export.bulk import parse_kinds, read_model_ids, run_bulk
+
+
+def test_read_model_ids_and_kinds(tmp_path: Path) -> None:
+    path = tmp_path / "models.txt"
+    path.write_text("A\n\n# comment\nB  # trailing\nA\n")
+    assert read_model_ids(path) == ["A", "B"]
+    assert parse_kinds("sweeps, tags") == ["sweeps", "tags"]
+    with pytest.raises(ValueError):
+        parse_kinds("sweeps,panos")
+
+
+def test_run_bulk_isolates_failures(tmp_path: Path) -> None:
+    tags = [{"id": f"t{i}", "label": None, "anchorPosition": {"x": i, "y": 1, "z": 0}} for i in range(3)]
+    with MockGraphQLServer(tags=tags, geocoordinates={"latitude": 0.0, "longitude": 0.0}) as server:
+        original = server.handle
+
+        def handle(body: dict[str, object]) -> tuple[int, dict[str, object]]:
+            if body["variables"] == {"modelId": "BAD"}:  # type: ignore[comparison-overlap]
+                return 200, {"errors": [{"message": "model not found"}]}
+            return original(body)
+
+        server.handle = handle  # type: ignore[method-assign]
+        client = ApiClient(server.url, "Basic test", max_rps=0, retries=0)
+        summary = run_bulk(client, ["M1", "BAD", "M2"], ["tags", "notes"], tmp_path, concurrency=4, parallel_jobs=2)
+
+    assert [(j.model_id, j.status) for j in summary.failed] == [("BAD", "failed"), ("BAD", "failed")]
+    data = json.loads((tmp_path / "M1_tags.geojson").read_text())
+    assert [f["properties"]["id"] for f in data["features"]] == ["t0", "t1", "t2"]
+    assert json.loads((tmp_path / "M2_notes.geojson").read_text())["features"] == []
+    manifest = json.loads((tmp_path / "manifest.json").read_text())
+    assert manifest["models"] == 3
+    assert manifest["jobs_failed"] == 2
+    assert "model not found" in manifest["jobs"][2]["error"]
+
+
+def test_run_bulk_verify_fails_jobs_over_tolerance(tmp_path: Path) -> None:
+    tags = [{"id": f"t{i}", "label": None, "anchorPosition": {"x": i, "y": 1, "z": 0}} for i in range(3)]
+    with MockGraphQLServer(tags=tags, geocoordinates={"latitude": 0.0, "longitude": 0.0}) as server:
+        client = ApiClient(server.url, "Basic test", max_rps=0, retries=0)
+        strict = run_bulk(client, ["M"], ["tags"], tmp_path / "strict", geocode_mode="verify")
+        loose = run_bulk(client, ["M"], ["tags"], tmp_path / "loose", geocode_mode="verify", verify_tolerance=1e9)
+
+    job = strict.jobs[0]
+    assert job.status == "failed" and "exceeds tolerance" in (job.error or "")
+    assert job.verify_max_error_m is not None and job.verify_max_error_m > 1.0
+    assert loose.jobs[0].status == "ok"
+    manifest = json.loads((tmp_path / "loose" / "manifest.json").read_text())
+    assert manifest["jobs"][0]["verify_max_error_m"] == job.verify_max_error_m
@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import json
+import time
+from pathlib import Path
+from typing import Any
+
+import responses
+
+from mp_geo_export.api import ApiClient
+from mp_geo_export.cache import GeocodeCache, georeference_fingerprint
+from mp_geo_export.geocode import geocode_points
+
+
+API_URL = "https://example.test/graphql"
+
+
+def test_round_trip_and_rounding(tmp_path: Path) -> None:
+    with GeocodeCache(tmp_path) as cache:
+        cache.put_many("M", "fp", [{"x": 1.00001, "y": 2, "z": 3}], [{"lat": 1.0, "long": 2.0}])
+        hits = cache.get_many("M", "fp", [{"x": 1.00002, "y": 2, "z": 3}, {"x": 9, "y": 9, "z": 9}])
+        assert hits == [{"lat": 1.0, "long": 2.0}, None]
+        assert cache.get_many("M", "other", [{"x": 1, "y": 2, "z": 3}]) == [None]
+        assert cache.stats().entries == 1
+
+
+def test_eviction_by_size_and_age(tmp_path: Path) -> None:
+    with GeocodeCache(tmp_path, max_entries=2) as cache:
+        for i in range(3):
+            cache.put_many("M", "fp", [{"x": i, "y": 0, "z": 0}], [{"lat": float(i), "long": 0.0}])
+        assert cache.stats().entries == 2
+        assert cache.get_many("M", "fp", [{"x": 0, "y": 0, "z": 0}]) == [None]
+        time.sleep(0.01)
+        assert cache.prune(max_age=0.001) == 2
+        cache.put_many("M", "fp", [{"x": 0, "y": 0, "z": 0}], [{"lat": 0.0, "long": 0.0}])
+        assert cache.clear("M") == 1
+
+
+def test_fingerprint_changes_with_georeference() -> None:
+    a = georeference_fingerprint({"latitude": 1.0, "longitude": 2.0})
+    assert a == georeference_fingerprint({"longitude": 2.0, "latitude": 1.0})
+    assert a != georeference_fingerprint({"latitude": 1.0, "longitude": 2.5})
+
+
+@responses.activate
+def test_remote_geocode_only_requests_uncached_points(tmp_path: Path) -> None:
+    client = ApiClient(API_URL, auth_header="Basic test", max_rps=0)
+    geo_requests: list[dict[str, Any]] = []
+
+    def reply(request: Any) -> tuple[int, dict[str, str], str]:
+        body = json.loads(request.body)
+        if "point" not in body["variables"]:
+            return 200, {}, json.dumps({"data": {"model": {"id": "M", "geocoordinates": {"latitude": 1.0}}}})
+        geo_requests.append(body["variables"]["point"])
+        x = float(body["variables"]["point"]["x"])
+        return 200, {}, json.dumps({"data": {"model": {"geocoordinates": {"geoLocationOf": {"lat": x, "long": 0.0}}}}})
+
+    responses.add_callback(responses.POST, API_URL, callback=reply)
+    with GeocodeCache(tmp_path) as cache:
+        first = geocode_points(client, "M", [{"x": 1, "y": 0, "z": 0}, {"x": 2, "y": 0, "z": 0}], cache=cache)
+        assert first.cache_hits == 0
+        second = geocode_points(
+            client, "M", [{"x": 1, "y": 0, "z": 0}, {"x": 2, "y": 0, "z": 0}, {"x": 3, "y": 0, "z": 0}], cache=cache
+        )
+    assert second.cache_hits == 2
+    assert [g["lat"] for g in second.geos] == [1.0, 2.0, 3.0]
+    assert len(geo_requests) == 3
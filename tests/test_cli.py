@@ -16,8 +16,7 @@ from mp_geo_export.auth import SERVICE, ACCOUNT
 runner = CliRunner()
 
 
-def _mock_graphql_success(api_url: str) -> None:
-    # sweeps
+def _mock_sweeps(api_url: str) -> None:
     responses.add(
         responses.POST,
         api_url,
@@ -38,6 +37,19 @@ def _mock_graphql_success(api_url: str) -> None:
         },
         status=200,
     )
+
+
+def _mock_georeference(api_url: str) -> None:
+    responses.add(
+        responses.POST,
+        api_url,
+        json={"data": {"model": {"id": "MODEL", "geocoordinates": {"latitude": 10.0, "longitude": 20.0}}}},
+        status=200,
+    )
+
+
+def _mock_graphql_success(api_url: str) -> None:
+    _mock_sweeps(api_url)
     # geocode
     responses.add(
         responses.POST,
@@ -68,6 +80,8 @@ def test_cli_export_sweeps_json(monkeypatch: pytest.MonkeyPatch) -> None:
 @responses.activate
 def test_cli_export_sweeps_geojson(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
     api_url = "https://example.test/graphql"
+    # A file output records the georeference it was geocoded with, fetched first
+    _mock_georeference(api_url)
     _mock_graphql_success(api_url)
     monkeypatch.setenv("MATTERPORT_API_URL", api_url)
     monkeypatch.setenv("MATTERPORT_API_KEY", "k")
@@ -86,6 +100,20 @@ def test_cli_export_sweeps_geojson(monkeypatch: pytest.MonkeyPatch, tmp_path: Pa
     assert feature["properties"]["type"] == "sweep"
 
 
+@responses.activate
+def test_cli_export_sweeps_geojsonseq(monkeypatch: pytest.MonkeyPatch) -> None:
+    api_url = "https://example.test/graphql"
+    _mock_graphql_success(api_url)
+    monkeypatch.setenv("MATTERPORT_API_URL", api_url)
+    monkeypatch.setenv("MATTERPORT_API_KEY", "k")
+    monkeypatch.setenv("MATTERPORT_API_SECRET", "s")
+    result = runner.invoke(app, ["export", "sweeps", "-m", "MODEL", "--format", "geojsonseq", "--out", "-"])
+    assert result.exit_code == 0, result.output
+    assert result.stdout.startswith("\x1e")
+    feature = json.loads(result.stdout[1:])
+    assert feature["geometry"]["coordinates"] == [20.0, 10.0, 30.0]
+
+
 @responses.activate
 def test_cli_export_sweeps_with_skybox(monkeypatch: pytest.MonkeyPatch) -> None:
     api_url = "https://example.test/graphql"
@@ -101,6 +129,123 @@ def test_cli_export_sweeps_with_skybox(monkeypatch: pytest.MonkeyPatch) -> None:
     assert len(data[0]["skyboxImages"]) == 6
 
 
+@responses.activate
+def test_cli_export_sweeps_fields_and_resolution(monkeypatch: pytest.MonkeyPatch) -> None:
+    api_url = "https://example.test/graphql"
+    _mock_graphql_success(api_url)
+    monkeypatch.setenv("MATTERPORT_API_URL", api_url)
+    monkeypatch.setenv("MATTERPORT_API_KEY", "k")
+    monkeypatch.setenv("MATTERPORT_API_SECRET", "s")
+    args = ["export", "sweeps", "-m", "MODEL", "--fields", "id,skybox", "--resolution", "4k", "--format", "json", "--no-pretty"]
+    result = runner.invoke(app, args)
+    assert result.exit_code == 0, result.output
+    listing = json.loads(responses.calls[0].request.body)["query"]
+    assert 'skybox(resolution: "4k")' in listing
+    data = json.loads(result.stdout)
+    assert "local" not in data[0] and len(data[0]["skyboxImages"]) == 6
+
+
+@responses.activate
+def test_cli_export_sweeps_local_geocode(monkeypatch: pytest.MonkeyPatch) -> None:
+    api_url = "https://example.test/graphql"
+    _mock_sweeps(api_url)
+    responses.add(
+        responses.POST,
+        api_url,
+        json={
+            "data": {
+                "model": {
+                    "id": "MODEL",
+                    "geocoordinates": {
+                        "source": "GPS",
+                        "latitude": 10.0,
+                        "longitude": 20.0,
+                        "altitude": 30.0,
+                        "translation": {"x": -1, "y": -2, "z": -3},
+                        "rotation": {"x": 0, "y": 0, "z": 0, "w": 1},
+                    },
+                }
+            }
+        },
+        status=200,
+    )
+    monkeypatch.setenv("MATTERPORT_API_URL", api_url)
+    monkeypatch.setenv("MATTERPORT_API_KEY", "k")
+    monkeypatch.setenv("MATTERPORT_API_SECRET", "s")
+    result = runner.invoke(app, ["export", "sweeps", "-m", "MODEL", "--geocode-mode", "local", "--format", "json", "--no-pretty"])
+    assert result.exit_code == 0, result.output
+    data = json.loads(result.stdout)
+    # translation cancels the sweep position, so the point sits on the anchor
+    assert data[0]["geo"]["lat"] == pytest.approx(10.0)
+    assert data[0]["geo"]["long"] == pytest.approx(20.0)
+    assert len(responses.calls) == 2
+
+
+def _mock_tags(api_url: str, count: int) -> None:
+    tags = [{"id": f"t{i}", "label": f"T{i}", "anchorPosition": {"x": i, "y": 0, "z": 0}} for i in range(count)]
+    responses.add(responses.POST, api_url, json={"data": {"model": {"mattertags": tags}}}, status=200)
+
+
+def _geo_response(lat: float) -> dict[str, object]:
+    return {"data": {"model": {"geocoordinates": {"geoLocationOf": {"lat": lat, "long": 0.0}}}}}
+
+
+@responses.activate
+def test_cli_resume_from_journal(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    api_url = "https://example.test/graphql"
+    monkeypatch.setenv("MATTERPORT_API_URL", api_url)
+    monkeypatch.setenv("MATTERPORT_API_KEY", "k")
+    monkeypatch.setenv("MATTERPORT_API_SECRET", "s")
+    out = tmp_path / "tags.json"
+    args = ["export", "tags", "-m", "MODEL", "--out", str(out), "--concurrency", "1", "--retries", "0"]
+
+    _mock_georeference(api_url)
+    _mock_tags(api_url, 2)
+    responses.add(responses.POST, api_url, json=_geo_response(1.0), status=200)
+    responses.add(responses.POST, api_url, json={"errors": [{"message": "boom"}]}, status=200)
+    result = runner.invoke(app, args)
+    assert result.exit_code != 0
+    assert not out.exists()
+    journal = tmp_path / "tags.json.journal"
+    assert len(journal.read_text().splitlines()) == 2  # header + one point
+
+    responses.reset()
+    _mock_georeference(api_url)
+    _mock_tags(api_url, 2)
+    responses.add(responses.POST, api_url, json=_geo_response(2.0), status=200)
+    result = runner.invoke(app, args + ["--resume"])
+    assert result.exit_code == 0, result.output
+    assert len(responses.calls) == 3  # georeference + tag listing + only the missing point
+    assert [t["geo"]["lat"] for t in json.loads(out.read_text())] == [1.0, 2.0]
+    assert not journal.exists()
+
+
+@responses.activate
+@pytest.mark.parametrize("policy", ["skip", "null"])
+def test_cli_on_error_policies(monkeypatch: pytest.MonkeyPatch, policy: str) -> None:
+    api_url = "https://example.test/graphql"
+    monkeypatch.setenv("MATTERPORT_API_URL", api_url)
+    monkeypatch.setenv("MATTERPORT_API_KEY", "k")
+    monkeypatch.setenv("MATTERPORT_API_SECRET", "s")
+    _mock_tags(api_url, 3)
+    responses.add(responses.POST, api_url, json=_geo_response(1.0), status=200)
+    responses.add(responses.POST, api_url, json={"errors": [{"message": "boom"}]}, status=200)
+    responses.add(responses.POST, api_url, json=_geo_response(3.0), status=200)
+    result = runner.invoke(
+        app,
+        ["export", "tags", "-m", "MODEL", "--out", "-", "--concurrency", "1", "--retries", "0",
+         "--on-error", policy, "--no-pretty"],
+    )
+    assert result.exit_code == 0, result.output
+    data = json.loads(result.stdout)
+    if policy == "skip":
+        assert [t["id"] for t in data] == ["t0", "t2"]
+    else:
+        assert [t["geo"] and t["geo"]["lat"] for t in data] == [1.0, None, 3.0]
+    assert "1 of 3 points failed" in result.stderr
+    assert "t1: GraphQLError" in result.stderr
+
+
 @responses.activate
 def test_cli_graphql_error(monkeypatch: pytest.MonkeyPatch) -> None:
     api_url = "https://example.test/graphql"
@@ -127,3 +272,27 @@ def test_auth_priority_env_over_flags(monkeypatch: pytest.MonkeyPatch) -> None:
     assert result.exit_code == 0
 
 
+
+
+@responses.activate
+def test_cli_trace_and_metrics_files(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    api_url = "https://example.test/graphql"
+    monkeypatch.setenv("MATTERPORT_API_URL", api_url)
+    monkeypatch.setenv("MATTERPORT_API_KEY", "k")
+    monkeypatch.setenv("MATTERPORT_API_SECRET", "s")
+    _mock_tags(api_url, 1)
+    responses.add(responses.POST, api_url, json=_geo_response(1.0), status=200)
+    trace, metrics = tmp_path / "trace.jsonl", tmp_path / "metrics.prom"
+    result = runner.invoke(
+        app,
+        ["export", "tags", "-m", "MODEL", "--out", "-", "--trace-file", str(trace), "--metrics-file", str(metrics)],
+    )
+    assert result.exit_code == 0, result.output
+    events = [json.loads(line) for line in trace.read_text().splitlines()]
+    assert [(e["type"], e["operation"]) for e in events if e["type"] != "throttle_wait"] == [
+        ("request_start", "getTags"),
+        ("request_end", "getTags"),
+        ("request_start", "getLatLongOfModelPoint"),
+        ("request_end", "getLatLongOfModelPoint"),
+    ]
+    assert 'mp_geo_export_requests_total{operation="getTags",status="200"} 1' in metrics.read_text()
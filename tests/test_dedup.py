@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import json
+import threading
+import time
+from typing import Any
+
+import responses
+
+from mp_geo_export.api import ApiClient
+from mp_geo_export.dedup import INFLIGHT, DedupPlan, point_key
+from mp_geo_export.geocode import geocode_points
+
+
+API_URL = "https://example.test/graphql"
+
+
+def _reply(geo_requests: list[dict[str, Any]]) -> Any:
+    def reply(request: Any) -> tuple[int, dict[str, str], str]:
+        point = json.loads(request.body)["variables"]["point"]
+        geo_requests.append(point)
+        geo = {"lat": float(point["x"]), "long": float(point["y"])}
+        return 200, {}, json.dumps({"data": {"model": {"geocoordinates": {"geoLocationOf": geo}}}})
+
+    return reply
+
+
+def test_plan_groups_points_within_tolerance() -> None:
+    points = [{"x": 1.0, "y": 0, "z": 0}, {"x": 2.0, "y": 0, "z": 0}, {"x": 1.00001, "y": 0, "z": 0}]
+    plan = DedupPlan.build(points, tolerance=1e-4)
+    assert plan.groups == [[0, 2], [1]]
+    assert plan.expand(["a", "b"]) == ["a", "b", "a"]
+    assert len(DedupPlan.build(points, tolerance=0).groups) == 3
+    assert point_key({"x": 0.5, "y": 0, "z": 0}, 0.25) == (0.25, 2.0, 0.0, 0.0)
+
+
+def test_inflight_keys_do_not_mix_tolerances() -> None:
+    # Grid cell 2 at 0.25 m and the exact point x=2 must not share a geocode
+    snapped = point_key({"x": 0.5, "y": 0, "z": 0}, 0.25)
+    exact = point_key({"x": 2, "y": 0, "z": 0}, 0)
+    _, _, registered = INFLIGHT.claim("M", [snapped])
+    try:
+        assert INFLIGHT.claim("M", [exact])[0] == [0]
+    finally:
+        INFLIGHT.release("M", [snapped, exact], registered, RuntimeError("test done"))
+        INFLIGHT.resolve("M", exact, None)
+
+
+@responses.activate
+def test_duplicates_are_geocoded_once_and_fanned_out() -> None:
+    geo_requests: list[dict[str, Any]] = []
+    responses.add_callback(responses.POST, API_URL, callback=_reply(geo_requests))
+    client = ApiClient(API_URL, auth_header="Basic test", max_rps=0)
+    points = [{"x": 1, "y": 0, "z": 0}, {"x": 2, "y": 0, "z": 0}, {"x": 1, "y": 0, "z": 0}, {"x": 1, "y": 0, "z": 0}]
+    seen: dict[int, Any] = {}
+    outcome = geocode_points(client, "M", points, on_result=seen.__setitem__)
+    assert len(geo_requests) == 2
+    assert [g["lat"] for g in outcome.geos] == [1.0, 2.0, 1.0, 1.0]
+    assert sorted(seen) == [0, 1, 2, 3]
+    assert outcome.dedup is not None
+    assert (outcome.dedup.unique, outcome.dedup.requests_saved) == (2, 2)
+    assert outcome.dedup.duplicate_ratio == 0.5
+
+
+@responses.activate
+def test_inflight_points_are_shared_between_exports() -> None:
+    geo_requests: list[dict[str, Any]] = []
+    responses.add_callback(responses.POST, API_URL, callback=_reply(geo_requests))
+    client = ApiClient(API_URL, auth_header="Basic test", max_rps=0)
+    shared = {"x": 7, "y": 0, "z": 0}
+    # Another export has already claimed the shared point
+    _, _, registered = INFLIGHT.claim("M", [point_key(shared)])
+    outcome: list[Any] = []
+    worker = threading.Thread(
+        target=lambda: outcome.append(geocode_points(client, "M", [shared, {"x": 8, "y": 0, "z": 0}]))
+    )
+    worker.start()
+    time.sleep(0.2)
+    assert worker.is_alive()  # waiting on the other export's result
+    INFLIGHT.resolve("M", point_key(shared), {"lat": 70.0, "long": 0.0})
+    worker.join(timeout=5)
+    assert registered[0].result() == {"lat": 70.0, "long": 0.0}
+    assert [p["x"] for p in geo_requests] == [8]
+    assert [g["lat"] for g in outcome[0].geos] == [70.0, 8.0]
+    assert outcome[0].dedup.coalesced == 1
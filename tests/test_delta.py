@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+from mock_graphql import MockGraphQLServer
+from typer.testing import CliRunner
+
+from mp_geo_export.api import ApiClient
+from mp_geo_export.bulk import run_bulk
+from mp_geo_export.cli import app
+from mp_geo_export.delta import PreviousExport
+
+
+GEOCOORDINATES = {"latitude": 10.0, "longitude": 20.0}
+
+
+def _tag(i: int, x: float) -> dict[str, object]:
+    return {"id": f"t{i}", "label": f"T{i}", "anchorPosition": {"x": x, "y": 5, "z": 0}}
+
+
+def _env(monkeypatch: pytest.MonkeyPatch, url: str) -> None:
+    monkeypatch.setenv("MATTERPORT_API_URL", url)
+    monkeypatch.setenv("MATTERPORT_API_KEY", "k")
+    monkeypatch.setenv("MATTERPORT_API_SECRET", "s")
+
+
+def _geocodes(server: MockGraphQLServer) -> list[dict[str, object]]:
+    return [r["variables"]["point"] for r in server.requests if "geoLocationOf" in r["query"]]
+
+
+def test_since_geocodes_only_added_and_moved(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    before = tmp_path / "before.geojson"
+    runner = CliRunner()
+    with MockGraphQLServer(tags=[_tag(0, 0), _tag(1, 1), _tag(2, 2)], geocoordinates=GEOCOORDINATES) as server:
+        _env(monkeypatch, server.url)
+        result = runner.invoke(app, ["export", "tags", "-m", "M", "-f", "geojson", "--no-pretty", "-o", str(before)])
+        assert result.exit_code == 0, result.output
+
+        # Republished: t1 moved, t2 removed, t3 added
+        server.tags = [_tag(0, 0), _tag(1, 7), _tag(3, 3)]
+        server.requests.clear()
+        merged = tmp_path / "after.ndjson"
+        result = runner.invoke(app, ["export", "tags", "-m", "M", "-f", "ndjson", "--since", str(before), "-o", str(merged)])
+        assert result.exit_code == 0, result.output
+        assert sorted(p["x"] for p in _geocodes(server)) == [3, 7]
+
+        result = runner.invoke(
+            app, ["export", "tags", "-m", "M", "-f", "ndjson", "--since", str(before), "--changes", "-o", "-"]
+        )
+        assert result.exit_code == 0, result.output
+
+    rows = [json.loads(line) for line in merged.read_text().splitlines()]
+    assert [(r["id"], r["geo"]["lat"]) for r in rows] == [("t0", 0.0), ("t1", 7.0), ("t3", 3.0)]
+    changes = [json.loads(line) for line in result.stdout.splitlines()]
+    assert [(r["id"], r["change"]) for r in changes] == [("t1", "moved"), ("t3", "added"), ("t2", "removed")]
+    assert changes[2]["geo"]["lat"] == 2.0
+    # A merged output is itself a valid --since for the next run
+    assert set(PreviousExport.load(merged, "tags").rows) == {"t0", "t1", "t3"}
+
+
+def test_previous_export_needs_local_coordinates(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    out = tmp_path / "labels.geojsonseq"
+    with MockGraphQLServer(tags=[_tag(0, 0)], geocoordinates=GEOCOORDINATES) as server:
+        _env(monkeypatch, server.url)
+        result = CliRunner().invoke(app, ["export", "tags", "-m", "M", "-f", "geojsonseq", "--fields", "label", "-o", str(out)])
+    assert result.exit_code == 0, result.output
+    with pytest.raises(ValueError, match="no local coordinates"):
+        PreviousExport.load(out, "tags")
+    result = CliRunner().invoke(app, ["export", "tags", "-m", "M", "--changes"])
+    assert result.exit_code != 0 and "--since" in result.output
+
+
+def test_bulk_since_reuses_previous_run(tmp_path: Path) -> None:
+    with MockGraphQLServer(tags=[_tag(0, 0), _tag(1, 1)], geocoordinates=GEOCOORDINATES) as server:
+        client = ApiClient(server.url, "Basic test", max_rps=0)
+        run_bulk(client, ["M"], ["tags"], tmp_path)
+        server.tags.append(_tag(2, 2))
+        server.requests.clear()
+        summary = run_bulk(client, ["M"], ["tags"], tmp_path, since=tmp_path)
+        client.close()
+
+    assert [p["x"] for p in _geocodes(server)] == [2]
+    job = summary.jobs[0]
+    assert (job.status, job.reused, job.added, job.moved, job.removed) == ("ok", 2, 1, 0, 0)
+    features = json.loads((tmp_path / "M_tags.geojson").read_text())["features"]
+    assert [f["properties"]["id"] for f in features] == ["t0", "t1", "t2"]
+
+
+def test_since_regeocodes_after_a_georeference_change(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    before = tmp_path / "before.ndjson"
+    runner = CliRunner()
+    with MockGraphQLServer(tags=[_tag(0, 0), _tag(1, 1)], geocoordinates=GEOCOORDINATES) as server:
+        _env(monkeypatch, server.url)
+        result = runner.invoke(app, ["export", "tags", "-m", "M", "-f", "ndjson", "-o", str(before)])
+        assert result.exit_code == 0, result.output
+        assert (tmp_path / "before.ndjson.georef").exists()
+
+        # Re-anchored: nothing moved locally, but every previous geocode is stale
+        server.geocoordinates = {**GEOCOORDINATES, "latitude": 11.0}
+        server.requests.clear()
+        result = runner.invoke(app, ["export", "tags", "-m", "M", "-f", "ndjson", "--since", str(before), "-o", "-"])
+        assert result.exit_code == 0, result.output
+        assert sorted(p["x"] for p in _geocodes(server)) == [0, 1]
+
+        # Nor is a file without a georeference record trusted
+        (tmp_path / "before.ndjson.georef").unlink()
+        previous = PreviousExport.load(before, "tags")
+        assert previous.fingerprint is None and previous.known([_tag(0, 0)], server.geocoordinates) == {}
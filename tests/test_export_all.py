@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+from mock_graphql import MockGraphQLServer
+from typer.testing import CliRunner
+
+from mp_geo_export import Exporter, VerifyToleranceError, export_all
+from mp_geo_export.cli import app
+from mp_geo_export.queries import build_combined_query
+from mp_geo_export.writers import open_writer
+
+GEOCOORDINATES = {
+    "source": "GPS",
+    "latitude": 10.0,
+    "longitude": 20.0,
+    "altitude": 30.0,
+    "translation": {"x": 0, "y": 0, "z": 0},
+    "rotation": {"x": 0, "y": 0, "z": 0, "w": 1},
+}
+LOCATIONS = [{"id": "loc0", "position": {"x": 1, "y": 2, "z": 0}, "panos": [{"skybox": {"children": []}}]}]
+TAGS = [{"id": f"t{i}", "label": f"T{i}", "anchorPosition": {"x": i, "y": 5, "z": 0}} for i in range(2)]
+# The note sits on the same anchor as tag t1, so it is geocoded once
+NOTES = [{"id": "n0", "label": "N0", "anchorPosition": {"x": 1, "y": 5, "z": 0}}]
+
+
+def _server() -> MockGraphQLServer:
+    return MockGraphQLServer(locations=LOCATIONS, tags=TAGS, notes=NOTES, geocoordinates=GEOCOORDINATES)
+
+
+def _env(monkeypatch: pytest.MonkeyPatch, url: str) -> None:
+    monkeypatch.setenv("MATTERPORT_API_URL", url)
+    monkeypatch.setenv("MATTERPORT_API_KEY", "k")
+    monkeypatch.setenv("MATTERPORT_API_SECRET", "s")
+
+
+def test_combined_query_lists_only_requested_kinds() -> None:
+    query = build_combined_query(("tags", "notes"))
+    assert "mattertags {" in query and "notes {" in query
+    assert "locations {" not in query
+    assert "...GeoCoordinateFragment" in query and "fragment GeoCoordinateFragment" in query
+    with pytest.raises(ValueError):
+        build_combined_query(("panos",))
+
+
+def test_export_all_sdk_one_listing_request(monkeypatch: pytest.MonkeyPatch) -> None:
+    with _server() as server:
+        _env(monkeypatch, server.url)
+        result = export_all("M", concurrency=2)
+        queries = [r["query"] for r in server.requests]
+
+    assert sum("getExport" in q for q in queries) == 1
+    assert not any("getSweeps" in q or "getTags" in q or "getGeoCoordinates" in q for q in queries)
+    assert len(queries) == 1 + 3  # one listing, three unique points
+    assert result.model.geocoordinates.latitude == 10.0
+    assert [row["geo"]["lat"] for row in map(result["tags"].record, range(2))] == [0.0, 1.0]
+    assert result["notes"].record(0)["geo"]["lat"] == 1.0
+    assert result["sweeps"].record(0)["id"] == "loc0_pano1"
+
+
+def test_exporter_shares_client_pool_and_rate_budget(monkeypatch: pytest.MonkeyPatch) -> None:
+    with _server() as server:
+        _env(monkeypatch, server.url)
+        with Exporter(concurrency=2, max_rps=0, on_error="null") as exporter:
+            tags = exporter.export_table("tags", "M")
+            pool = exporter.executor
+            notes = exporter.export_notes("M2")
+            combined = exporter.export_all("M3", kinds=["sweeps"])
+            assert exporter.executor is pool
+            # Every request of all three exports went through the one limiter
+            assert exporter.client.limiter.stats().acquired == len(server.requests)
+        assert exporter._executor is None
+    assert [tags.record(i)["id"] for i in range(len(tags))] == ["t0", "t1"]
+    assert notes[0].text == "N0"
+    assert combined["sweeps"].record(0)["id"] == "loc0_pano1"
+    with pytest.raises(ValueError, match="on-error policy"):
+        Exporter(on_error="ignore", api_key="k", api_secret="s")
+
+
+def test_cli_export_all_layered_geojson(monkeypatch: pytest.MonkeyPatch) -> None:
+    with _server() as server:
+        _env(monkeypatch, server.url)
+        result = CliRunner().invoke(app, ["export", "all", "-m", "M", "--out", "-", "--no-pretty"])
+    assert result.exit_code == 0, result.output
+    features = json.loads(result.stdout)["features"]
+    assert features[0]["properties"]["geocoordinates"]["source"] == "GPS"
+    assert features[0]["geometry"]["coordinates"] == [20.0, 10.0, 30.0]
+    assert [f["properties"]["type"] for f in features[1:]] == ["sweep", "tag", "tag", "note"]
+
+
+def test_cli_export_all_layered_json_and_out_dir(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    with _server() as server:
+        _env(monkeypatch, server.url)
+        runner = CliRunner()
+        result = runner.invoke(app, ["export", "all", "-m", "M", "--kinds", "tags,notes", "-f", "json", "--out", "-"])
+        assert result.exit_code == 0, result.output
+        document = json.loads(result.stdout)
+        assert set(document) == {"model", "tags", "notes"}
+        assert [t["id"] for t in document["tags"]] == ["t0", "t1"]
+        assert document["notes"][0]["text"] == "N0"
+
+        result = runner.invoke(app, ["export", "all", "-m", "M", "-f", "ndjson", "--out-dir", str(tmp_path)])
+        assert result.exit_code == 0, result.output
+    assert [json.loads(line)["id"] for line in (tmp_path / "M_tags.ndjson").read_text().splitlines()] == ["t0", "t1"]
+    assert len((tmp_path / "M_sweeps.ndjson").read_text().splitlines()) == 1
+    assert json.loads((tmp_path / "M_model.json").read_text())["id"] == "M"
+    assert not (tmp_path / "M_all.ndjson.journal").exists()
+
+
+def test_exporter_enforces_verify_tolerance(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    # The mock geocodes x/y as lat/long degrees, far from the local transform of the anchor
+    with _server() as server:
+        _env(monkeypatch, server.url)
+        with Exporter(max_rps=0, geocode_mode="verify") as exporter:
+            with pytest.raises(VerifyToleranceError) as info:
+                exporter.export_table("tags", "M")
+            assert info.value.report.max_error_m > exporter.verify_tolerance
+            with pytest.raises(VerifyToleranceError):
+                with open_writer("ndjson", tmp_path / "tags.ndjson") as writer:
+                    exporter.stream("tags", "M", writer)
+        with Exporter(max_rps=0, geocode_mode="verify", verify_tolerance=1e9) as exporter:
+            assert len(exporter.export_table("tags", "M")) == 2
+    assert not (tmp_path / "tags.ndjson").exists()
@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+import responses
+
+from mp_geo_export.api import ApiClient, GraphQLError
+from mp_geo_export.instrument import MetricsRecorder, RequestEvent, TraceWriter, operation_name
+
+
+API_URL = "https://example.test/graphql"
+
+
+def test_operation_name() -> None:
+    assert operation_name("\nquery getTags($modelId: ID!) { model { id } }") == "getTags"
+    assert operation_name("{ model { id } }") == "anonymous"
+
+
+@responses.activate
+def test_client_emits_request_retry_and_error_events(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr("mp_geo_export.api.time.sleep", lambda s: None)
+    events: list[RequestEvent] = []
+    client = ApiClient(API_URL, "Basic test", max_rps=0, retries=1, observers=[events.append])
+    responses.add(responses.POST, API_URL, json={"errors": [{"message": "slow down"}]}, status=429)
+    responses.add(responses.POST, API_URL, json={"errors": [{"message": "boom"}]}, status=200)
+    with pytest.raises(GraphQLError):
+        client.fetch_tags("M")
+
+    assert [(e.type, e.attempt) for e in events] == [
+        ("request_start", 1),
+        ("request_end", 1),
+        ("retry", 1),
+        ("request_start", 2),
+        ("request_end", 2),
+        ("graphql_error", 2),
+    ]
+    assert {e.operation for e in events} == {"getTags"}
+    assert events[1].status == 429 and events[1].latency is not None and events[1].bytes
+    assert events[2].wait == 1.0
+    assert "boom" in (events[5].error or "")
+
+
+def test_metrics_summary_and_prometheus(tmp_path: Path) -> None:
+    metrics = MetricsRecorder()
+    for latency in (0.003, 0.02, 0.02, 0.3):
+        metrics(RequestEvent("request_end", "getLatLongOfModelPoint", 1, status=200, latency=latency, bytes=100))
+    metrics(RequestEvent("request_end", "getTags", 1, status=429, latency=0.01, bytes=10))
+    metrics(RequestEvent("retry", "getTags", 1, wait=1.0))
+    metrics(RequestEvent("throttle_wait", "getLatLongOfModelPoint", 1, wait=0.25))
+
+    summary = metrics.summary()
+    assert summary[0].startswith("Requests: 5 (200: 4, 429: 1), 1 retries")
+    assert "p50 <= 25 ms" in summary[1]
+    assert "rate limiter wait 0.25s" in summary[1]
+
+    text = metrics.prometheus()
+    assert "# TYPE mp_geo_export_request_duration_seconds histogram" in text
+    assert 'mp_geo_export_request_duration_seconds_bucket{operation="getLatLongOfModelPoint",le="0.025"} 3' in text
+    assert 'mp_geo_export_request_duration_seconds_bucket{operation="getLatLongOfModelPoint",le="+Inf"} 4' in text
+    assert 'mp_geo_export_requests_total{operation="getTags",status="429"} 1' in text
+    assert 'mp_geo_export_retries_total{operation="getTags"} 1' in text
+
+
+def test_trace_writer_writes_json_lines(tmp_path: Path) -> None:
+    path = tmp_path / "trace.jsonl"
+    with TraceWriter(path) as trace:
+        trace(RequestEvent("request_start", "getTags", 1, time=1.0))
+        trace(RequestEvent("request_end", "getTags", 1, time=2.0, status=200, latency=0.5))
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    assert lines == [
+        {"type": "request_start", "operation": "getTags", "attempt": 1, "time": 1.0},
+        {"type": "request_end", "operation": "getTags", "attempt": 1, "time": 2.0, "status": 200, "latency": 0.5},
+    ]
@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from mp_geo_export.journal import CheckpointJournal, JournalMismatchError, journal_path
+
+
+def test_resume_skips_torn_line_and_changed_points(tmp_path: Path) -> None:
+    path = journal_path(tmp_path / "out.geojson")
+    assert path.name == "out.geojson.journal"
+    points = [{"x": 0.0, "y": 0.0, "z": 0.0}, {"x": 1.5, "y": 0.0, "z": 0.0}]
+    with CheckpointJournal(path, "M", "tags") as journal:
+        journal.record(0, points[0], {"lat": 1.0, "long": 2.0})
+        journal.record(1, points[1], {"lat": 3.0, "long": 4.0})
+    with path.open("a") as fh:
+        fh.write('{"i": 2, "p": [')  # crash mid-write
+
+    with CheckpointJournal(path, "M", "tags", resume=True) as journal:
+        moved = [points[0], {"x": 9.0, "y": 0.0, "z": 0.0}]
+        assert journal.resolved(moved) == {0: {"lat": 1.0, "long": 2.0}}
+        journal.record(1, moved[1], {"lat": 5.0, "long": 6.0})
+    with CheckpointJournal(path, "M", "tags", resume=True) as journal:
+        assert journal.resolved([points[0], {"x": 9.0, "y": 0.0, "z": 0.0}])[1] == {"lat": 5.0, "long": 6.0}
+
+    with pytest.raises(JournalMismatchError):
+        CheckpointJournal(path, "OTHER", "tags", resume=True)
+    CheckpointJournal(path, "OTHER", "tags").discard()
+    assert not path.exists()
+
+
+def test_slice_maps_batch_indexes_to_export_indexes(tmp_path: Path) -> None:
+    path = journal_path(tmp_path / "out.geojson")
+    batch = [{"x": 7.0, "y": 0.0, "z": 0.0}, {"x": 8.0, "y": 0.0, "z": 0.0}]
+    with CheckpointJournal(path, "M", "tags") as journal:
+        journal.slice(5).record(1, batch[1], {"lat": 1.0, "long": 2.0})
+    with CheckpointJournal(path, "M", "tags", resume=True) as journal:
+        assert journal.slice(5).resolved(batch) == {1: {"lat": 1.0, "long": 2.0}}
+        assert journal.slice(4).resolved(batch) == {}
+        assert journal.resolved([{}] * 6 + [batch[1]])[6] == {"lat": 1.0, "long": 2.0}
@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from mp_geo_export.jsonstream import ArrayParser
+
+PATH = ("data", "model", "locations")
+DOC = {
+    "errors": [{"message": "partial"}],
+    "data": {
+        "model": {
+            "id": "M",
+            "locations": [{"id": f"l{i}", "v": [1.5, -2e3, True, None, 'é"}]']} for i in range(20)],
+            "count": 12345,
+        }
+    },
+}
+
+
+def _parse(raw: bytes, size: int) -> tuple[list, ArrayParser]:
+    parser = ArrayParser(PATH)
+    items = []
+    for i in range(0, len(raw), size):
+        items += parser.feed(raw[i:i + size])
+    return items + parser.close(), parser
+
+
+@pytest.mark.parametrize("size", [1, 3, 17, 1 << 20])
+def test_elements_and_members_survive_any_chunking(size: int) -> None:
+    items, parser = _parse(json.dumps(DOC).encode(), size)
+    assert items == DOC["data"]["model"]["locations"]
+    assert parser.members == {
+        ("errors",): [{"message": "partial"}], ("data", "model", "id"): "M", ("data", "model", "count"): 12345,
+    }
+    assert parser.depth == 2
+
+
+def test_numbers_split_at_any_offset() -> None:
+    raw = b'{"data": {"model": {"locations": [1.25, 2, 3.5e1, -0.5E-2, 10], "count": 1.5e+3}}}'
+    for cut in range(len(raw) + 1):
+        parser = ArrayParser(PATH)
+        items = parser.feed(raw[:cut]) + parser.feed(raw[cut:]) + parser.close()
+        assert items == [1.25, 2, 35.0, -0.005, 10], cut
+        assert parser.members == {("data", "model", "count"): 1500.0}, cut
+
+
+def test_elements_arrive_before_the_document_ends() -> None:
+    parser = ArrayParser(PATH)
+    assert parser.feed(b'{"data": {"model": {"locations": [{"id": "a"}, {"id": ') == [{"id": "a"}]
+    assert parser.feed(b'"b"}]}}}') == [{"id": "b"}]
+    assert parser.close() == []
+
+
+def test_null_data_and_truncation() -> None:
+    items, parser = _parse(b'{"data": null, "errors": [1]}', 4)
+    assert items == [] and parser.depth == 0 and parser.members[("data",)] is None
+    parser = ArrayParser(PATH)
+    parser.feed(b'{"data": {"model": {"locations": [1, 2')
+    with pytest.raises(ValueError, match="Truncated"):
+        parser.close()
@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any
+
+import pytest
+
+from mp_geo_export.geocode import GeocodeOutcome
+from mp_geo_export.pipeline import batched, run_pipeline
+from mp_geo_export.results import PointResult
+
+
+def _tags(*xs: int) -> list[dict[str, Any]]:
+    return [{"id": f"t{x}", "anchorPosition": {"x": x, "y": 0, "z": 0}} for x in xs]
+
+
+def _geocode(points: list[dict[str, float]], offset: int, emit: Any) -> GeocodeOutcome:
+    for i, p in enumerate(points):
+        emit(i, {"lat": p["x"], "long": 0.0})
+    return GeocodeOutcome(results=[PointResult(index=i, geo={"lat": p["x"]}) for i, p in enumerate(points)], mode="remote")
+
+
+def test_batches_are_geocoded_as_they_are_listed() -> None:
+    listed_second = threading.Event()
+    geocoded_first = threading.Event()
+    events: list[tuple[str, Any]] = []
+
+    def source() -> Any:
+        yield [("tags", _tags(0, 1))]
+        # Geocoding of the first batch must not wait for the listing to finish
+        assert geocoded_first.wait(5)
+        listed_second.set()
+        yield [("tags", _tags(2)), ("notes", _tags(3))]
+
+    def geocode(points: list[dict[str, float]], offset: int, emit: Any) -> GeocodeOutcome:
+        outcome = _geocode(points, offset, emit)
+        geocoded_first.set()
+        return outcome
+
+    result = run_pipeline(
+        source(), geocode, lambda kind, objs: events.append((kind, len(objs))), lambda i, geo: events.append((i, geo["lat"]))
+    )
+    assert listed_second.is_set()
+    assert events == [("tags", 2), (0, 0), (1, 1), ("tags", 1), ("notes", 1), (2, 2), (3, 3)]
+    assert result.points == 4 and result.times.batches == 2
+    assert [r.index for r in result.outcome.results] == [0, 1, 2, 3]
+
+
+def test_slow_writer_applies_backpressure() -> None:
+    seen: list[int] = []
+
+    def write(index: int, geo: Any) -> None:
+        time.sleep(0.01)
+        seen.append(index)
+
+    result = run_pipeline(iter([[("tags", _tags(*range(20)))]]), _geocode, lambda *_: None, write, max_pending=2)
+    assert seen == list(range(20))
+    assert result.times.geocode_blocked > 0.05
+
+
+@pytest.mark.parametrize("stage", ["source", "geocode", "writer"])
+def test_failure_in_any_stage_is_raised(stage: str) -> None:
+    def source() -> Any:
+        yield [("tags", _tags(0, 1))]
+        if stage == "source":
+            raise RuntimeError("boom")
+
+    def geocode(points: list[dict[str, float]], offset: int, emit: Any) -> GeocodeOutcome:
+        if stage == "geocode":
+            raise RuntimeError("boom")
+        return _geocode(points, offset, emit)
+
+    def write(index: int, geo: Any) -> None:
+        if stage == "writer":
+            raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError, match="boom"):
+        run_pipeline(source(), geocode, lambda *_: None, write)
+    assert [t for t in threading.enumerate() if t.name.startswith("export-")] == []
+
+
+def test_batched_cuts_a_streamed_listing() -> None:
+    chunks = list(batched("tags", iter(_tags(*range(5))), size=2))
+    assert [[len(objs) for _, objs in batch] for batch in chunks] == [[2], [2], [1]]
+    assert list(batched("tags", iter([]))) == []
@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from mp_geo_export.api import ApiClient
+from mp_geo_export.ratelimit import TokenBucket
+
+
+def test_burst_then_steady_rate() -> None:
+    bucket = TokenBucket(rate=100.0, burst=5)
+    waits = [bucket.reserve() for _ in range(10)]
+    assert waits[:5] == [0.0] * 5
+    # each extra token is scheduled one interval after the previous one
+    assert waits[5] > 0
+    assert waits[9] > waits[5]
+    assert abs(waits[9] - 0.05) < 0.01
+    stats = bucket.stats()
+    assert stats.acquired == 10
+    assert stats.waited == 5
+
+
+def test_concurrent_acquire_respects_rate() -> None:
+    bucket = TokenBucket(rate=50.0, burst=1)
+    start = time.monotonic()
+    with ThreadPoolExecutor(max_workers=16) as ex:
+        list(ex.map(lambda _: bucket.acquire(), range(26)))
+    # first token is free, the remaining 25 need 0.5s at 50/s
+    assert time.monotonic() - start >= 0.45
+
+
+def test_unlimited_and_shared_between_clients() -> None:
+    assert TokenBucket(rate=0).reserve() == 0.0
+    shared = TokenBucket(rate=10.0, burst=3)
+    a = ApiClient("https://example.test", "Basic x", limiter=shared)
+    b = ApiClient("https://example.test", "Basic x", limiter=shared)
+    assert a.limiter is b.limiter
+    a.max_rps = 20.0
+    assert b.max_rps == 20.0
@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections.abc import Iterator
+from typing import Any
+
+import pytest
+from mock_graphql import MockGraphQLServer
+
+from mp_geo_export.api import ApiClient
+from mp_geo_export.instrument import MetricsRecorder
+from mp_geo_export.sdk import Exporter
+from mp_geo_export.server import ExportJob, ExportServer
+
+TAGS = [{"id": f"t{i}", "label": f"T{i}", "anchorPosition": {"x": i, "y": 5, "z": 0}} for i in range(3)]
+
+
+@pytest.fixture
+def served() -> Iterator[tuple[ExportServer, MockGraphQLServer]]:
+    with MockGraphQLServer(tags=TAGS) as upstream:
+        client = ApiClient(upstream.url, "Basic test", max_rps=0)
+        metrics = MetricsRecorder()
+        client.add_observer(metrics)
+        with Exporter(client=client, concurrency=2) as exporter:
+            server = ExportServer(exporter, port=0, metrics=metrics, quiet=True)
+            thread = threading.Thread(target=server.serve_forever, daemon=True)
+            thread.start()
+            try:
+                yield server, upstream
+            finally:
+                server.shutdown()
+                server.server_close()
+        client.close()
+
+
+def _get(url: str) -> tuple[int, dict[str, str], bytes]:
+    try:
+        with urllib.request.urlopen(url, timeout=10) as resp:
+            return resp.status, dict(resp.headers), resp.read()
+    except urllib.error.HTTPError as exc:
+        return exc.code, dict(exc.headers), exc.read()
+
+
+def test_export_streams_geojson(served: tuple[ExportServer, MockGraphQLServer]) -> None:
+    server, _ = served
+    status, headers, body = _get(f"{server.url}/export/tags?model_id=M&fields=label")
+    assert status == 200
+    assert headers["Content-Type"] == "application/geo+json"
+    assert headers["Transfer-Encoding"] == "chunked"
+    document = json.loads(body)
+    assert document["type"] == "FeatureCollection"
+    assert [f["properties"]["id"] for f in document["features"]] == ["t0", "t1", "t2"]
+    assert document["features"][2]["geometry"]["coordinates"][:2] == [5.0, 2.0]
+
+    status, _, body = _get(f"{server.url}/export/tags?model_id=M&format=ndjson")
+    assert status == 200
+    assert [json.loads(line)["id"] for line in body.decode().splitlines()] == ["t0", "t1", "t2"]
+
+    status, _, body = _get(f"{server.url}/metrics")
+    assert status == 200 and b"mp_geo_export_requests_total" in body
+
+
+def test_bad_requests_get_json_errors(served: tuple[ExportServer, MockGraphQLServer]) -> None:
+    server, _ = served
+    assert _get(f"{server.url}/export/tags")[0] == 400
+    assert _get(f"{server.url}/export/tags?model_id=M&format=csv")[0] == 400
+    assert _get(f"{server.url}/export/tags?model_id=M&fields=colour")[0] == 400
+    status, _, body = _get(f"{server.url}/export/rooms?model_id=M")
+    assert status == 404 and "Unsupported kind" in json.loads(body)["error"]
+    assert _get(f"{server.url}/nope")[0] == 404
+
+
+def test_concurrent_requests_for_one_export_share_a_job(
+    served: tuple[ExportServer, MockGraphQLServer], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    server, upstream = served
+    release = threading.Event()
+    stream = server.exporter.stream
+
+    def gated(*args: Any, **kwargs: Any) -> Any:
+        release.wait(10)
+        return stream(*args, **kwargs)
+
+    monkeypatch.setattr(server.exporter, "stream", gated)
+    results: list[tuple[int, dict[str, str], bytes]] = []
+    clients = [
+        threading.Thread(target=lambda: results.append(_get(f"{server.url}/export/tags?model_id=M")))
+        for _ in range(3)
+    ]
+    for t in clients:
+        t.start()
+    deadline = time.monotonic() + 10
+    while server.jobs.coalesced < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    release.set()
+    for t in clients:
+        t.join(10)
+
+    assert len(results) == 3
+    assert len({body for _, _, body in results}) == 1
+    assert sorted(h["X-Coalesced"] for _, h, _ in results) == ["false", "true", "true"]
+    assert sum("getTags" in r["query"] for r in upstream.requests) == 1
+    assert server.jobs.started == 1 and len(server.jobs) == 0
+
+    status, _, body = _get(f"{server.url}/healthz")
+    assert status == 200 and json.loads(body) == {"status": "ok", "jobs": 0, "started": 1, "coalesced": 2}
+
+
+def test_failed_verify_answers_502_without_rows() -> None:
+    # The mock geocodes x/y as lat/long degrees, far from the local transform of the anchor
+    geocoordinates = {"latitude": 10.0, "longitude": 20.0, "altitude": 30.0}
+    with MockGraphQLServer(tags=TAGS, geocoordinates=geocoordinates) as upstream:
+        client = ApiClient(upstream.url, "Basic test", max_rps=0)
+        with Exporter(client=client, geocode_mode="verify") as exporter:
+            server = ExportServer(exporter, port=0, quiet=True)
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+            try:
+                status, _, body = _get(f"{server.url}/export/tags?model_id=M&format=ndjson")
+            finally:
+                server.shutdown()
+                server.server_close()
+        client.close()
+    assert status == 502
+    assert "exceeds tolerance" in json.loads(body)["error"]
+
+
+def test_job_drops_chunks_every_follower_has_sent() -> None:
+    job = ExportJob(("tags", "M", "ndjson", frozenset(), "2k"), replay_limit=8)
+    reader = job.attach()
+    assert reader is not None
+    lines = [f"line{i}\n" for i in range(5)]
+
+    def produce() -> None:
+        for line in lines:
+            job.write(line)
+            job.flush()
+        job.finish()
+
+    producer = threading.Thread(target=produce)
+    producer.start()
+    body, held = b"", []
+    for chunk in job.follow(reader):
+        body += chunk
+        held.append(job.held)
+    producer.join(10)
+
+    assert body == "".join(lines).encode()
+    # The writer waits for the follower instead of buffering past the limit
+    assert max(held) <= 12
+    assert job.chunks == [] and job.base == 5
+    # Too late to replay from the first byte, so a new request gets a job of its own
+    assert job.attach() is None
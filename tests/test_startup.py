@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import subprocess
+import sys
+
+import pytest
+
+# Generous enough for a slow CI box; the eager imports this guards against
+# cost about 700 ms on a laptop, the lazy entry point about 120 ms
+STARTUP_BUDGET_MS = 350
+
+# Only imported once a command actually needs them
+HEAVY = ("requests", "pydantic", "keyring", "dotenv", "numpy", "rich.progress", "rich.console", "aiohttp", "sqlite3")
+
+
+def _importtime(statement: str) -> dict[str, int]:
+    """Cumulative import time in microseconds per module, from ``python -X importtime``."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement], capture_output=True, text=True, check=True
+    )
+    times: dict[str, int] = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+@pytest.mark.parametrize("module", ["mp_geo_export", "mp_geo_export.cli"])
+def test_entry_point_defers_heavy_imports(module: str) -> None:
+    loaded = _importtime(f"import {module}")
+    assert module in loaded
+    assert [m for m in loaded if m.split(".")[0] in HEAVY or m in HEAVY] == []
+
+
+def test_cli_import_within_startup_budget() -> None:
+    # Best of three, so one slow run on a busy machine doesn't fail the build
+    best = min(_importtime("import mp_geo_export.cli")["mp_geo_export.cli"] for _ in range(3))
+    assert best / 1000 < STARTUP_BUDGET_MS
+
+
+def test_lazy_package_attributes() -> None:
+    import mp_geo_export
+
+    assert mp_geo_export.export_table.__module__ == "mp_geo_export.sdk"
+    from mp_geo_export import ApiClient, api_url, get_auth_header
+
+    assert (ApiClient.__module__, get_auth_header.__module__, api_url.__module__) == (
+        "mp_geo_export.api", "mp_geo_export.auth", "mp_geo_export.config"
+    )
+    assert set(mp_geo_export.__all__) <= set(dir(mp_geo_export))
+    with pytest.raises(AttributeError):
+        mp_geo_export.not_a_name  # noqa: B018
@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+from typing import Any
+
+import pytest
+
+from mp_geo_export.fields import parse_fields
+from mp_geo_export.models import GeoPoint, LatLng, NoteExport, PanoExport, TagExport
+from mp_geo_export.table import ExportTable, pano_id
+from mp_geo_export.utils import to_geojson_feature
+
+SKY = [f"s{i}" for i in range(6)]
+
+OBJECTS: dict[str, list[dict[str, Any]]] = {
+    "sweeps": [
+        {"id": "L1", "position": {"x": 1, "y": 2, "z": 3}, "panos": [{"skybox": {"children": SKY}}, {"skybox": None}]},
+        {"id": "L2", "position": {"x": 4.5, "y": 0, "z": -1}, "panos": []},
+        {"id": "L3", "position": {"x": 0, "y": 0, "z": 0}, "panos": [{"skybox": {"children": SKY}}]},
+    ],
+    "tags": [
+        {"id": "t1", "label": "Door", "anchorPosition": {"x": 1, "y": 1, "z": 1}},
+        {"id": "t2", "label": None, "anchorPosition": {"x": 2, "y": 2, "z": 2}},
+    ],
+    "notes": [{"id": "n1", "label": "Check leak", "anchorPosition": {"x": 3, "y": 3, "z": 3}}],
+}
+GEOS = [{"lat": 10, "long": 20.5, "alt": 3.0}, None, {"lat": -1.25, "long": 2.0}]
+
+
+def _build_models(
+    kind: str, objects: list[dict[str, Any]], geos: list[dict[str, Any] | None], include_skybox: bool = False
+) -> list[Any]:
+    """The pydantic export models, built object by object, that ``ExportTable`` rows must match."""
+    if kind == "tags":
+        return [
+            TagExport(id=t["id"], label=t.get("label"), local=GeoPoint(**t["anchorPosition"]), geo=LatLng(**g) if g else None)
+            for t, g in zip(objects, geos)
+        ]
+    if kind == "notes":
+        return [
+            NoteExport(id=n["id"], text=n.get("label"), local=GeoPoint(**n["anchorPosition"]), geo=LatLng(**g) if g else None)
+            for n, g in zip(objects, geos)
+        ]
+    models: list[Any] = []
+    for loc, geo in zip(objects, geos):
+        for idx, pano in enumerate(loc.get("panos") or []):
+            sky = (pano.get("skybox") or {}).get("children") if include_skybox else None
+            if include_skybox and (not sky or len(sky) != 6):
+                continue
+            models.append(
+                PanoExport(
+                    id=pano_id(loc["id"], idx),
+                    local=GeoPoint(**loc["position"]),
+                    geo=LatLng(**geo) if geo else None,
+                    skyboxImages=sky if include_skybox else None,
+                )
+            )
+    return models
+
+
+@pytest.mark.parametrize("kind", ["sweeps", "tags", "notes"])
+@pytest.mark.parametrize("include_skybox", [False, True])
+def test_rows_match_pydantic_models(kind: str, include_skybox: bool) -> None:
+    objects = OBJECTS[kind]
+    geos = GEOS[: len(objects)]
+    models = _build_models(kind, objects, geos, include_skybox=include_skybox)
+    table = ExportTable.from_objects(kind, objects, geos, include_skybox=include_skybox)
+    assert len(table) == len(models)
+    assert [table.record(i) for i in range(len(table))] == [m.model_dump() for m in models]
+    assert [table.feature(i) for i in range(len(table))] == [to_geojson_feature(m) for m in models]
+    assert table.models() == models
+    assert [m.model_dump() for m in table.models()[::-1]] == [m.model_dump() for m in models[::-1]]
+
+
+def test_geos_fill_per_object_rows() -> None:
+    table = ExportTable.from_objects("sweeps", OBJECTS["sweeps"])
+    assert list(table.rows(0)) == [0, 1] and list(table.rows(1)) == [] and list(table.rows(2)) == [2]
+    assert table.geo(0) is None
+    table.set_geo(0, {"lat": 1.0, "long": 2.0})
+    assert [table.geo(r) for r in table.rows(0)] == [{"lat": 1.0, "long": 2.0, "alt": None}] * 2
+    with pytest.raises(IndexError):
+        table.models()[3]
+
+
+def test_unselected_fields_are_left_out() -> None:
+    table = ExportTable.from_objects("tags", OBJECTS["tags"], GEOS[:2], fields=parse_fields("label"))
+    assert table.record(0) == {"id": "t1", "label": "Door", "geo": {"lat": 10, "long": 20.5, "alt": 3.0}}
+    assert "local" not in table.feature(0)["properties"]
+    with pytest.raises(ValueError, match="Unknown fields: bogus"):
+        parse_fields("label,bogus")
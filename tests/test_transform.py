@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import math
+
+import pytest
+
+from mp_geo_export.transform import (
+    HAVE_NUMPY,
+    GeoTransform,
+    GeoreferenceError,
+    ecef_to_geodetic,
+    geodetic_to_ecef,
+    haversine_m,
+)
+
+
+def test_ecef_round_trip() -> None:
+    for lat, lon, alt in [(37.7749, -122.4194, 12.0), (-33.86, 151.21, 0.0), (64.1, -21.9, 250.0)]:
+        got = ecef_to_geodetic(*geodetic_to_ecef(lat, lon, alt))
+        assert got[0] == pytest.approx(lat, abs=1e-9)
+        assert got[1] == pytest.approx(lon, abs=1e-9)
+        assert got[2] == pytest.approx(alt, abs=1e-6)
+
+
+def test_origin_maps_to_anchor() -> None:
+    tf = GeoTransform(latitude=37.0, longitude=-122.0, altitude=10.0)
+    geo = tf.to_geo({"x": 0, "y": 0, "z": 0})
+    assert geo["lat"] == pytest.approx(37.0, abs=1e-9)
+    assert geo["long"] == pytest.approx(-122.0, abs=1e-9)
+    assert geo["alt"] == pytest.approx(10.0, abs=1e-6)
+
+
+def test_translation_and_rotation() -> None:
+    # 90 degrees about up: model +x points north
+    half = math.sqrt(0.5)
+    tf = GeoTransform.from_geocoordinates(
+        {
+            "latitude": 37.0,
+            "longitude": -122.0,
+            "altitude": None,
+            "translation": {"x": 100.0, "y": 0.0, "z": 0.0},
+            "rotation": {"x": 0.0, "y": 0.0, "z": half, "w": half},
+        }
+    )
+    east, north, up = tf.to_enu({"x": 50.0, "y": 0.0, "z": 0.0})
+    assert (east, north, up) == pytest.approx((100.0, 50.0, 0.0))
+    geo = tf.to_geo({"x": 50.0, "y": 0.0, "z": 0.0})
+    assert geo["long"] > -122.0 and geo["lat"] > 37.0
+    assert haversine_m(37.0, -122.0, geo["lat"], geo["long"]) == pytest.approx(math.hypot(100, 50), rel=1e-3)
+
+
+def test_missing_georeference() -> None:
+    with pytest.raises(GeoreferenceError):
+        GeoTransform.from_geocoordinates({"latitude": None, "longitude": 1.0})
+
+
+@pytest.mark.parametrize("use_numpy", [False, pytest.param(True, marks=pytest.mark.skipif(not HAVE_NUMPY, reason="numpy not installed"))])
+def test_batched_paths_match_per_point(use_numpy: bool) -> None:
+    t = GeoTransform.from_geocoordinates(
+        {
+            "latitude": 37.7749,
+            "longitude": -122.4194,
+            "altitude": 16.0,
+            "translation": {"x": 12.5, "y": -3.0, "z": 1.2},
+            "rotation": {"x": 0.1, "y": 0.2, "z": 0.3, "w": 0.9},
+        }
+    )
+    xyz = [(float(i * 37 % 900 - 450), float(i * 53 % 700 - 350), float(i % 40 - 20)) for i in range(200)]
+    rows = t.transform_array(xyz, use_numpy=use_numpy)
+    if use_numpy:
+        assert rows.shape == (200, 3)
+        rows = rows.tolist()
+    for (x, y, z), (lon, lat, alt) in zip(xyz, rows):
+        ref = t.to_geo({"x": x, "y": y, "z": z})
+        assert lat == pytest.approx(ref["lat"], abs=1e-11)
+        assert lon == pytest.approx(ref["long"], abs=1e-11)
+        assert alt == pytest.approx(ref["alt"], abs=1e-6)
+    assert t.batch([]) == []
@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+
+from mp_geo_export.models import GeoPoint, LatLng, TagExport
+from mp_geo_export.utils import to_geojson_feature, write_geojson, write_json
+from mp_geo_export.writers import open_writer
+
+
+def _tags(n: int) -> list[TagExport]:
+    return [
+        TagExport(id=f"t{i}", label=f"Tag {i}", local=GeoPoint(x=i, y=0, z=0), geo=LatLng(lat=float(i), long=0.0))
+        for i in range(n)
+    ]
+
+
+def _write_buffered(exports: list[TagExport], out_path: Path, format: str, pretty: bool) -> None:
+    """The whole-document writers the streaming writer has to match byte for byte."""
+    if format == "json":
+        write_json([e.model_dump() for e in exports], out_path, pretty)
+    else:
+        write_geojson([to_geojson_feature(e) for e in exports], out_path, pretty)
+
+
+@pytest.mark.parametrize("format", ["json", "geojson"])
+@pytest.mark.parametrize("pretty", [False, True])
+@pytest.mark.parametrize("n", [0, 1, 3])
+def test_stream_matches_buffered_output(tmp_path: Path, format: str, pretty: bool, n: int) -> None:
+    tags = _tags(n)
+    _write_buffered(tags, tmp_path / "buffered", format, pretty)
+    with open_writer(format, tmp_path / "streamed", pretty) as writer:
+        for i in reversed(range(n)):
+            writer.put(i, [tags[i]])
+    assert (tmp_path / "streamed").read_text() == (tmp_path / "buffered").read_text()
+    assert writer.count == n
+
+
+def test_ordered_holds_back_and_unordered_does_not(tmp_path: Path) -> None:
+    tags = _tags(3)
+    for ordered, expected in ((True, ["t0", "t1", "t2"]), (False, ["t2", "t0", "t1"])):
+        out = tmp_path / f"{ordered}.json"
+        with open_writer("json", out, ordered=ordered) as writer:
+            writer.put(2, [tags[2]])
+            writer.put(0, [tags[0]])
+            writer.put(1, [tags[1]])
+        assert [t["id"] for t in json.loads(out.read_text())] == expected
+
+
+def test_partial_file_is_never_published(tmp_path: Path) -> None:
+    out = tmp_path / "out.geojson"
+    out.write_text("previous")
+    with pytest.raises(RuntimeError):
+        with open_writer("geojson", out) as writer:
+            writer.put(0, _tags(1))
+            raise RuntimeError("geocode failed")
+    assert out.read_text() == "previous"
+    assert list(tmp_path.iterdir()) == [out]
+
+
+def test_unknown_format() -> None:
+    with pytest.raises(ValueError):
+        open_writer("csv", None)
+
+
+def test_line_formats_write_one_record_per_line(tmp_path: Path) -> None:
+    tags = _tags(3)
+    with open_writer("ndjson", tmp_path / "out.ndjson", pretty=True) as writer:
+        writer.put(0, tags)
+    lines = (tmp_path / "out.ndjson").read_text().splitlines()
+    assert [json.loads(line)["id"] for line in lines] == ["t0", "t1", "t2"]
+
+    with open_writer("geojsonseq", tmp_path / "out.geojsonseq") as writer:
+        writer.put(0, tags)
+    raw = (tmp_path / "out.geojsonseq").read_bytes()
+    records = raw.split(b"\x1e")[1:]
+    assert raw.startswith(b"\x1e") and len(records) == 3
+    assert all(r.endswith(b"\n") and r.count(b"\n") == 1 for r in records)
+    assert json.loads(records[2])["properties"]["label"] == "Tag 2"